@@ -1,4 +1,6 @@
 import os
+import hmac
+import hashlib
 import secrets
 import logging
 from datetime import datetime, timedelta
@@ -7,8 +9,11 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 import models, schemas, database
+from services.cache import LocalCache
 
 logger = logging.getLogger(__name__)
 
@@ -18,8 +23,25 @@ if not SECRET_KEY:
     logger.warning("SECRET_KEY not set; generated a temporary key (tokens reset on restart).")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# 인증 사용자 캐시 — 워커 프로세스마다 따로 두므로 TTL을 짧게 유지한다
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "60"))  # seconds
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+user_cache = LocalCache(ttl=USER_CACHE_TTL, max_entries=USER_CACHE_MAX_ENTRIES)
+_USER_COLUMNS = [attr.key for attr in inspect(models.User).column_attrs]
+
+# bcrypt 비용 — 바꾸면 기존 해시는 다음 로그인 때 새 비용으로 다시 해시된다
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    # 현재 설정과 다른 비용의 해시는 올리든 내리든 needs_update로 본다
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/token")
 
 def verify_password(plain_password, hashed_password):
@@ -28,6 +50,10 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+def verify_and_update_password(plain_password, hashed_password) -> tuple[bool, Optional[str]]:
+    """검증 결과와, 해시 설정이 바뀌었으면 새 해시를 돌려준다 (아니면 None)."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -38,21 +64,162 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)):
-    credentials_exception = HTTPException(
+def _hash_refresh_token(token: str) -> str:
+    # 토큰 자체가 충분히 무작위이므로 bcrypt 대신 HMAC 한 번으로 충분하다
+    return hmac.new(SECRET_KEY.encode(), token.encode(), hashlib.sha256).hexdigest()
+
+
+def issue_refresh_token(db: Session, user_id: int, family_id: Optional[str] = None) -> str:
+    """리프레시 토큰을 발급하고 원문을 돌려준다. 커밋은 호출한 쪽에 맡긴다.
+
+    family_id가 없으면 새 로그인이므로, 이때 사용자의 만료된 토큰 행을 정리한다.
+    """
+    token = secrets.token_urlsafe(32)
+    now = datetime.utcnow()
+    if family_id is None:
+        db.query(models.RefreshToken).filter(
+            models.RefreshToken.user_id == user_id,
+            models.RefreshToken.expires_at <= now,
+        ).delete(synchronize_session=False)
+    db.add(models.RefreshToken(
+        user_id=user_id,
+        token_hash=_hash_refresh_token(token),
+        family_id=family_id or secrets.token_hex(16),
+        expires_at=now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        created_at=now,
+    ))
+    return token
+
+
+def rotate_refresh_token(db: Session, token: str) -> tuple[str, str]:
+    """리프레시 토큰을 소비하고 (사용자 email, 새 리프레시 토큰)을 돌려준다.
+
+    이미 회전/폐기된 토큰이 다시 들어오면 같은 family를 모두 폐기하고 401을 낸다.
+    """
+    invalid = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    row = (
+        db.query(models.RefreshToken, models.User.email)
+        .join(models.User, models.User.id == models.RefreshToken.user_id)
+        .filter(models.RefreshToken.token_hash == _hash_refresh_token(token))
+        .with_for_update(of=models.RefreshToken)
+        .first()
+    )
+    if row is None:
+        raise invalid
+    refresh, email = row
+
+    now = datetime.utcnow()
+    if refresh.revoked_at is not None:
+        logger.warning("Refresh token reuse detected (user %d), revoking family", refresh.user_id)
+        db.query(models.RefreshToken).filter(
+            models.RefreshToken.family_id == refresh.family_id,
+            models.RefreshToken.revoked_at.is_(None),
+        ).update({models.RefreshToken.revoked_at: now}, synchronize_session=False)
+        db.commit()
+        raise invalid
+    if refresh.expires_at <= now:
+        raise invalid
+
+    refresh.revoked_at = now
+    new_token = issue_refresh_token(db, refresh.user_id, refresh.family_id)
+    db.commit()
+    return email, new_token
+
+
+def revoke_refresh_token_family(db: Session, token: str) -> None:
+    """로그아웃 — 토큰이 속한 family(그 로그인에서 회전된 토큰 전체)를 폐기한다.
+
+    모르는 토큰이면 아무것도 하지 않는다. 커밋은 호출한 쪽에 맡긴다.
+    """
+    family_id = db.query(models.RefreshToken.family_id).filter(
+        models.RefreshToken.token_hash == _hash_refresh_token(token)
+    ).scalar()
+    if family_id is None:
+        return
+    db.query(models.RefreshToken).filter(
+        models.RefreshToken.family_id == family_id,
+        models.RefreshToken.revoked_at.is_(None),
+    ).update({models.RefreshToken.revoked_at: datetime.utcnow()}, synchronize_session=False)
+
+
+def revoke_refresh_tokens(db: Session, user_id: int) -> None:
+    """사용자의 리프레시 토큰을 모두 폐기한다 (비밀번호 변경/재설정 시). 커밋은 호출한 쪽에 맡긴다."""
+    now = datetime.utcnow()
+    db.query(models.RefreshToken).filter(
+        models.RefreshToken.user_id == user_id,
+        models.RefreshToken.revoked_at.is_(None),
+    ).update({models.RefreshToken.revoked_at: now}, synchronize_session=False)
+
+
+def invalidate_user(email: str) -> None:
+    """사용자 행을 바꾼 요청이 커밋한 뒤 호출 — 캐시된 스냅샷을 버린다."""
+    user_cache.invalidate(email)
+
+
+def _detached_user(values: dict) -> models.User:
+    # 요청마다 새 인스턴스를 만들어 요청 간에 객체를 공유하지 않는다. 세션에 속하지
+    # 않으므로 수정하려면 db.get(models.User, user.id)로 다시 읽어야 한다
+    user = models.User(**values)
+    make_transient_to_detached(user)
+    return user
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _token_email(token: str) -> str:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
-            raise credentials_exception
+            raise _credentials_exception()
         token_data = schemas.TokenData(email=email)
     except JWTError:
-        raise credentials_exception
-    user = db.query(models.User).filter(models.User.email == token_data.email).first()
+        raise _credentials_exception()
+    return token_data.email
+
+
+def _cache_user(email: str, user: models.User | None, version) -> models.User:
     if user is None:
-        raise credentials_exception
-    return user
+        raise _credentials_exception()
+    values = {key: getattr(user, key) for key in _USER_COLUMNS}
+    user_cache.set(email, values, version)
+    return _detached_user(values)
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)):
+    """토큰의 사용자를 세션에서 분리된 스냅샷으로 반환한다 (USER_CACHE_TTL 동안 캐시)."""
+    # 동기 함수로 두어 threadpool에서 조회한다 — async로 두면 모든 인증 요청이 이벤트 루프를 막는다
+    email = _token_email(token)
+    values = user_cache.get(email)
+    if values is not None:
+        return _detached_user(values)
+    version = user_cache.version(email)
+    user = db.query(models.User).filter(models.User.email == email).first()
+    return _cache_user(email, user, version)
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(database.get_async_db),
+):
+    """async 라우트용 get_current_user.
+
+    라우트와 같은 get_async_db 세션을 함께 쓰므로 요청 하나가 커넥션을 하나만 잡는다
+    (동기 버전을 쓰면 동기 풀에서 하나를 더 빌린다).
+    """
+    email = _token_email(token)
+    values = user_cache.get(email)
+    if values is not None:
+        return _detached_user(values)
+    version = user_cache.version(email)
+    user = await db.scalar(select(models.User).where(models.User.email == email))
+    return _cache_user(email, user, version)
@@ -0,0 +1,129 @@
+"""동시 요청 처리량 벤치마크 — TCX 업로드와 인증 GET을 섞어 보낸다.
+
+사용법 (backend 디렉토리에서):
+    TCX_PARSE_WORKERS=0 python benchmarks/bench_async_db.py [--tree PATH] [--concurrency N]
+
+파일 SQLite DB에 앱을 in-process ASGI로 띄운다. 동기 세션(get_db)은 pysqlite,
+비동기 세션(get_async_db)이 있으면 aiosqlite로 연결한다. --tree로 이전 커밋의
+backend 체크아웃(git worktree)을 지정하면 같은 부하로 비교할 수 있다.
+로컬 SQLite라 MySQL 네트워크 왕복 비용은 반영되지 않는다.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tree", default=str(Path(__file__).resolve().parent.parent),
+                        help="벤치마크할 backend 디렉토리 (기본: 현재 트리)")
+    parser.add_argument("--uploads", type=int, default=100)
+    parser.add_argument("--gets", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=10)
+    return parser.parse_args()
+
+
+def _build_app(db_path: str):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    import auth
+    import database
+    import routers.activities
+    from tests.conftest import _create_test_app
+    from tests.fixtures.sample_data import make_user
+
+    engine = create_engine(
+        f"sqlite:///{db_path}", connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    database.Base.metadata.create_all(engine)
+    SyncSession = sessionmaker(bind=engine, autoflush=False)
+    with SyncSession() as db:
+        user = make_user(db)
+        token = auth.create_access_token(data={"sub": user.email})
+
+    app = _create_test_app()
+
+    def _get_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[database.get_db] = _get_db
+    if hasattr(database, "get_async_db"):
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", connect_args={"timeout": 30})
+        AsyncSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+        async def _get_async_db():
+            async with AsyncSession() as db:
+                yield db
+
+        app.dependency_overrides[database.get_async_db] = _get_async_db
+    if hasattr(routers.activities, "evaluate_activity"):
+        # LLM 작업 큐 이전 트리는 BackgroundTasks로 평가를 실행한다
+        routers.activities.evaluate_activity = lambda activity_id: None
+    return app, token
+
+
+async def _run(app, token: str, args: argparse.Namespace) -> None:
+    import httpx
+
+    from tests.fixtures.sample_tcx import make_tcx
+
+    base = datetime(2024, 1, 1, 6, 0)
+    payloads = [
+        make_tcx(start_time=(base + timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                 trackpoints_per_lap=600)
+        for i in range(args.uploads)
+    ]
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: list[float] = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120,
+                                 headers={"Authorization": f"Bearer {token}"}) as client:
+        async def upload(content: bytes) -> None:
+            async with semaphore:
+                resp = await client.post("/activities/upload",
+                                         files={"file": ("a.tcx", content, "application/xml")})
+                resp.raise_for_status()
+
+        async def get_me() -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                resp = await client.get("/users/me")
+                latencies.append(time.perf_counter() - started)
+                resp.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(upload(p) for p in payloads), *(get_me() for _ in range(args.gets)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    total = args.uploads + args.gets
+    print(f"{total / elapsed:.1f} req/s ({total} requests in {elapsed:.2f}s, concurrency {args.concurrency})")
+    print(f"/users/me p50 {statistics.median(latencies) * 1000:.1f} ms, "
+          f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:.1f} ms")
+
+
+def main() -> None:
+    args = _parse_args()
+    sys.path.insert(0, args.tree)
+    os.chdir(args.tree)
+    with tempfile.TemporaryDirectory() as tmp:
+        app, token = _build_app(os.path.join(tmp, "bench.db"))
+        asyncio.run(_run(app, token, args))
+
+
+if __name__ == "__main__":
+    main()
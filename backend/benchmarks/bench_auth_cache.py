@@ -0,0 +1,86 @@
+"""GET /users/me 지연 벤치마크 — 인증 사용자 캐시 사용/미사용 비교.
+
+사용법 (backend 디렉토리에서):
+    python benchmarks/bench_auth_cache.py [--requests N]
+
+파일 SQLite DB에 앱을 in-process ASGI로 띄우고 같은 토큰으로 /users/me를
+순차 호출한다. 캐시 미사용은 TTL 0인 캐시로 매 요청 users 조회를 하게 한다.
+로컬 SQLite라 MySQL 네트워크 왕복 비용은 반영되지 않으므로 실제 차이는 더 크다.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def _build_app(db_path: str):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    import auth
+    import database
+    from tests.conftest import _create_test_app
+    from tests.fixtures.sample_data import make_user
+
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    database.Base.metadata.create_all(engine)
+    SyncSession = sessionmaker(bind=engine, autoflush=False)
+    with SyncSession() as db:
+        user = make_user(db)
+        token = auth.create_access_token(data={"sub": user.email})
+
+    app = _create_test_app()
+
+    def _get_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[database.get_db] = _get_db
+    return app, token
+
+
+async def _measure(app, token: str, requests: int) -> list[float]:
+    import httpx
+
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                 headers={"Authorization": f"Bearer {token}"}) as client:
+        for _ in range(requests):
+            started = time.perf_counter()
+            resp = await client.get("/users/me")
+            latencies.append(time.perf_counter() - started)
+            resp.raise_for_status()
+    return sorted(latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    import auth
+    from services.cache import LocalCache
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app, token = _build_app(os.path.join(tmp, "bench.db"))
+        for label, ttl in (("no cache", 0), ("user cache", auth.USER_CACHE_TTL)):
+            auth.user_cache = LocalCache(ttl=ttl, max_entries=auth.USER_CACHE_MAX_ENTRIES)
+            asyncio.run(_measure(app, token, 100))  # 워밍업
+            latencies = asyncio.run(_measure(app, token, args.requests))
+            print(f"{label:12} p50 {statistics.median(latencies) * 1000:.3f} ms, "
+                  f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""LLM 클라이언트 재사용 벤치마크 — 로컬 mock Anthropic 엔드포인트 대상.
+
+사용법 (backend 디렉토리에서):
+    python benchmarks/bench_llm_clients.py [--calls N]
+
+호출마다 ChatAnthropic과 콜백 목록을 새로 만드는 방식(기존)과
+services.llm.models 레지스트리(get_llm/get_callbacks)를 비교한다. 생성 비용만
+따로 재고, 실제 invoke 왕복을 포함한 호출당 지연도 잰다. LANGFUSE_PUBLIC_KEY가
+설정돼 있으면 Langfuse 핸들러 생성 비용도 포함된다.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+_RESPONSE = json.dumps({
+    "id": "msg_bench",
+    "type": "message",
+    "role": "assistant",
+    "model": "claude-haiku-4-5-20251001",
+    "content": [{"type": "text", "text": "좋은 러닝이었습니다."}],
+    "stop_reason": "end_turn",
+    "stop_sequence": None,
+    "usage": {"input_tokens": 100, "output_tokens": 10},
+}).encode()
+
+
+class _MockAnthropic(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive — 커넥션 재사용이 측정에 반영되도록
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(_RESPONSE)))
+        self.end_headers()
+        self.wfile.write(_RESPONSE)
+
+    def log_message(self, *args):
+        pass
+
+
+def _per_call_ms(func, calls: int) -> tuple[float, float]:
+    samples = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=300)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _MockAnthropic)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["ANTHROPIC_API_URL"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ.setdefault("ANTHROPIC_API_KEY", "bench")
+
+    from services.llm import models as llm_models
+
+    model = llm_models.LLM_LOW_MODEL
+    prompt = "최근 러닝을 평가해 주세요."
+
+    def build_fresh():
+        return llm_models._create_llm(model, 500), llm_models._create_callbacks()
+
+    def build_registry():
+        return llm_models.get_llm("low"), llm_models.get_callbacks()
+
+    def call(build):
+        llm, callbacks = build()
+        llm.invoke(prompt, config={"callbacks": callbacks})
+
+    call(build_fresh)  # import/커넥션 워밍업
+    call(build_registry)
+
+    print(f"{'':24} {'fresh (before)':>18} {'registry (after)':>18}")
+    for label, before, after in (
+        ("construct only", lambda: build_fresh(), lambda: build_registry()),
+        ("construct + invoke", lambda: call(build_fresh), lambda: call(build_registry)),
+    ):
+        b50, b95 = _per_call_ms(before, args.calls)
+        a50, a95 = _per_call_ms(after, args.calls)
+        print(f"{label:24} p50 {b50:7.3f} p95 {b95:7.3f} p50 {a50:7.3f} p95 {a95:7.3f} ms")
+
+    llm_models.shutdown()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Trackpoint 시간 파싱 마이크로 벤치마크.
+
+사용법 (backend 디렉토리에서):
+    python benchmarks/bench_tcx_timestamps.py
+
+dateutil.parser.parse(기존)와 tcx_parser._tcx_time_us(고정 형식 디코더)의
+Trackpoint 1개당 비용, 그리고 1 Hz 샘플 파일 전체 경량화 시간을 비교한다.
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import dateutil.parser  # noqa: E402
+
+import tcx_parser  # noqa: E402
+
+SAMPLES = [
+    "2026-02-05T08:00:17.000Z",
+    "2026-02-05T08:00:17Z",
+    "2026-02-05T08:00:17.123456Z",
+]
+NUMBER = 100_000
+SAMPLE_FILE = Path(__file__).resolve().parents[2] / "test-data" / "Wednesday Afternoon Indoor Run.tcx"
+
+
+def _per_call_ns(func, text: str) -> float:
+    return min(timeit.repeat(lambda: func(text), number=NUMBER, repeat=3)) / NUMBER * 1e9
+
+
+def main() -> None:
+    print(f"{'input':32} {'dateutil':>12} {'_tcx_time_us':>14} {'speedup':>8}")
+    for text in SAMPLES:
+        before = _per_call_ns(dateutil.parser.parse, text)
+        after = _per_call_ns(tcx_parser._tcx_time_us, text)
+        print(f"{text:32} {before:>9.0f} ns {after:>11.0f} ns {before / after:>7.1f}x")
+
+    if SAMPLE_FILE.exists():
+        content = SAMPLE_FILE.read_bytes()
+        runs = 20
+        elapsed = min(timeit.repeat(lambda: tcx_parser.ingest_tcx(content), number=runs, repeat=3)) / runs
+        print(f"\ningest_tcx({SAMPLE_FILE.name}): {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import os
 from urllib.parse import quote_plus
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -11,10 +12,12 @@ DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_PORT = os.getenv("DB_PORT", "3306")
 DB_NAME = os.getenv("DB_NAME", "running_manager")
 
-DATABASE_URL = (
-    f"mysql+pymysql://{quote_plus(DB_USER)}:{quote_plus(DB_PASSWORD)}"
+_DATABASE_LOCATION = (
+    f"{quote_plus(DB_USER)}:{quote_plus(DB_PASSWORD)}"
     f"@{DB_HOST}:{DB_PORT}/{DB_NAME}?charset=utf8mb4"
 )
+DATABASE_URL = f"mysql+pymysql://{_DATABASE_LOCATION}"
+ASYNC_DATABASE_URL = f"mysql+asyncmy://{_DATABASE_LOCATION}"
 
 engine = create_engine(
     DATABASE_URL,
@@ -23,6 +26,19 @@ engine = create_engine(
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# async 라우트용 — 이벤트 루프를 막지 않고 DB 왕복을 기다린다.
+# 커밋 후 속성을 만료시키면 응답 직렬화에서 암묵적 I/O(lazy load)가 일어나므로 끈다.
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_pre_ping=True,
+    pool_recycle=3600,
+)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 Base = declarative_base()
 
 
@@ -32,3 +48,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
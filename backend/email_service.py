@@ -1,8 +1,23 @@
-"""OCI Email Delivery SMTP service for transactional emails."""
+"""OCI Email Delivery SMTP service for transactional emails.
 
+요청 경로에서는 메시지를 만들어 큐에 넣기만 하고, 백그라운드 스레드(MailSender)가
+SMTP 연결 하나를 유지하며 보낸다. 쌓인 메시지는 같은 연결로 몰아서 보내고,
+연결이 끊기면 다시 연결한다. 일시적 실패는 지수 백오프로 재시도하고, 유휴 상태가
+EMAIL_IDLE_CLOSE_SECONDS를 넘으면 서버가 끊기 전에 연결을 닫는다.
+
+큐는 프로세스 메모리에 있으므로 재시작 시 보내지 못한 메일은 사라진다 (비밀번호
+재설정은 사용자가 다시 요청하면 된다). 종료 시 stop_mail_sender()가 남은 메일을
+EMAIL_SHUTDOWN_TIMEOUT초까지 보낸다.
+"""
+
+import heapq
 import logging
 import os
+import queue
 import smtplib
+import threading
+import time
+from dataclasses import dataclass, field
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
@@ -13,15 +28,200 @@ SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
 SMTP_USERNAME = os.getenv("SMTP_USERNAME", "")
 SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
 SMTP_FROM_EMAIL = os.getenv("SMTP_FROM_EMAIL", "")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
 
+EMAIL_QUEUE_MAX = int(os.getenv("EMAIL_QUEUE_MAX", "1000"))
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "20"))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+EMAIL_RETRY_BASE_SECONDS = float(os.getenv("EMAIL_RETRY_BASE_SECONDS", "2"))
+EMAIL_RETRY_MAX_SECONDS = float(os.getenv("EMAIL_RETRY_MAX_SECONDS", "300"))
+EMAIL_IDLE_CLOSE_SECONDS = float(os.getenv("EMAIL_IDLE_CLOSE_SECONDS", "30"))
+EMAIL_SHUTDOWN_TIMEOUT = float(os.getenv("EMAIL_SHUTDOWN_TIMEOUT", "10"))
+
 
 def _is_smtp_configured() -> bool:
     return all([SMTP_HOST, SMTP_USERNAME, SMTP_PASSWORD, SMTP_FROM_EMAIL])
 
 
+@dataclass(order=True)
+class _Outgoing:
+    due: float
+    to_email: str = field(compare=False)
+    message: str = field(compare=False)
+    attempts: int = field(default=0, compare=False)
+
+
+class MailSender:
+    """SMTP 연결 하나를 유지하며 큐의 메일을 보내는 백그라운드 스레드."""
+
+    def __init__(self):
+        self._queue: queue.Queue[_Outgoing | None] = queue.Queue(maxsize=EMAIL_QUEUE_MAX)
+        self._retries: list[_Outgoing] = []  # due 순 힙 — 송신 스레드만 접근
+        self._smtp: smtplib.SMTP | None = None
+        self._outstanding = 0  # 큐 + 재시도 대기 + 전송 중
+        self._idle = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="mail-sender", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def enqueue(self, to_email: str, message: str) -> bool:
+        """메일을 큐에 넣는다. 큐가 가득 찼으면 False (버리고 오류 기록)."""
+        with self._idle:
+            self._outstanding += 1
+        try:
+            self._queue.put_nowait(_Outgoing(time.monotonic(), to_email, message))
+        except queue.Full:
+            self._done()
+            logger.error("메일 큐가 가득 차 전송하지 않습니다: %s", to_email)
+            return False
+        return True
+
+    def flush(self, timeout: float) -> bool:
+        """큐와 재시도 대기 중인 메일이 모두 처리될 때까지 기다린다."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._outstanding == 0, timeout)
+
+    def stop(self, timeout: float = EMAIL_SHUTDOWN_TIMEOUT) -> None:
+        """남은 메일을 timeout초까지 보낸 뒤 스레드와 연결을 정리한다."""
+        if not self.flush(timeout):
+            logger.warning("종료 시점에 보내지 못한 메일 %d통을 버립니다", self._outstanding)
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _done(self) -> None:
+        with self._idle:
+            self._outstanding -= 1
+            self._idle.notify_all()
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=10)
+        try:
+            smtp.ehlo()
+            if SMTP_STARTTLS:
+                smtp.starttls()
+                smtp.ehlo()
+            smtp.login(SMTP_USERNAME, SMTP_PASSWORD)
+        except BaseException:
+            smtp.close()
+            raise
+        return smtp
+
+    def _close(self) -> None:
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                self._smtp.close()
+            self._smtp = None
+
+    def _next_batch(self) -> list[_Outgoing]:
+        # 재시도 대기 중인 메일이 있으면 그 시각까지만, 없으면 유휴 한도까지 기다린다
+        timeout = EMAIL_IDLE_CLOSE_SECONDS
+        if self._retries:
+            timeout = min(timeout, max(self._retries[0].due - time.monotonic(), 0))
+        batch = []
+        try:
+            batch.append(self._queue.get(timeout=timeout))
+            while len(batch) < EMAIL_BATCH_SIZE:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        now = time.monotonic()
+        while self._retries and self._retries[0].due <= now and len(batch) < EMAIL_BATCH_SIZE:
+            batch.append(heapq.heappop(self._retries))
+        return batch
+
+    def _send(self, item: _Outgoing) -> None:
+        # 끊긴 연결은 한 번 다시 연결해 바로 재시도하고, 그래도 실패하면 백오프 재시도
+        for reconnect in (False, True):
+            try:
+                if self._smtp is None:
+                    self._smtp = self._connect()
+                self._smtp.sendmail(SMTP_FROM_EMAIL, [item.to_email], item.message)
+                logger.info("이메일 전송 완료: %s", item.to_email)
+                self._done()
+                return
+            except (smtplib.SMTPServerDisconnected, ConnectionError) as exc:
+                self._smtp = None
+                if reconnect:
+                    return self._retry(item, exc)
+            except smtplib.SMTPResponseException as exc:
+                if exc.smtp_code >= 500:
+                    return self._give_up(item, exc)
+                return self._retry(item, exc)
+            except smtplib.SMTPRecipientsRefused as exc:
+                return self._give_up(item, exc)
+            except (smtplib.SMTPException, OSError) as exc:
+                self._close()
+                return self._retry(item, exc)
+
+    def _retry(self, item: _Outgoing, exc: Exception) -> None:
+        item.attempts += 1
+        if item.attempts >= EMAIL_MAX_ATTEMPTS:
+            return self._give_up(item, exc)
+        delay = min(EMAIL_RETRY_BASE_SECONDS * 2 ** (item.attempts - 1), EMAIL_RETRY_MAX_SECONDS)
+        logger.warning("이메일 전송 실패 (%s), %.0f초 후 재시도: %s", item.to_email, delay, exc)
+        item.due = time.monotonic() + delay
+        heapq.heappush(self._retries, item)
+
+    def _give_up(self, item: _Outgoing, exc: Exception) -> None:
+        logger.error("이메일 전송 실패 (%s): %s", item.to_email, exc)
+        self._done()
+
+    def _run(self) -> None:
+        # 예상 못한 예외로 스레드가 죽으면 이후 메일이 모두 큐에 묶이므로, 기록만 하고 계속 돈다
+        while True:
+            try:
+                batch = self._next_batch()
+                if not batch:
+                    self._close()  # 유휴 — 서버 타임아웃 전에 연결을 닫는다
+                    continue
+            except Exception:
+                logger.exception("메일 송신 스레드 오류")
+                self._smtp = None
+                time.sleep(1)
+                continue
+            for item in batch:
+                if item is None:
+                    self._close()
+                    return
+                try:
+                    self._send(item)
+                except Exception:
+                    logger.exception("이메일 전송 중 예상치 못한 오류 (%s)", item.to_email)
+                    self._smtp = None  # 상태를 알 수 없는 연결은 버린다
+                    self._done()
+
+
+_sender: MailSender | None = None
+_sender_lock = threading.Lock()
+
+
+def get_mail_sender() -> MailSender:
+    global _sender
+    if _sender is None:
+        with _sender_lock:
+            if _sender is None:
+                sender = MailSender()
+                sender.start()
+                _sender = sender
+    return _sender
+
+
+def stop_mail_sender() -> None:
+    """앱 종료 시 남은 메일을 보내고 송신 스레드를 정리한다."""
+    global _sender
+    with _sender_lock:
+        sender, _sender = _sender, None
+    if sender is not None:
+        sender.stop()
+
+
 def send_password_reset_email(to_email: str, reset_token: str) -> None:
-    """비밀번호 재설정 이메일을 전송합니다.
+    """비밀번호 재설정 이메일을 전송 큐에 넣습니다 (전송은 MailSender 스레드가 한다).
 
     Args:
         to_email: 수신자 이메일 주소
@@ -71,13 +271,4 @@ def send_password_reset_email(to_email: str, reset_token: str) -> None:
     msg["To"] = to_email
     msg.attach(MIMEText(html_body, "html", "utf-8"))
 
-    try:
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=10) as server:
-            server.ehlo()
-            server.starttls()
-            server.ehlo()
-            server.login(SMTP_USERNAME, SMTP_PASSWORD)
-            server.sendmail(SMTP_FROM_EMAIL, [to_email], msg.as_string())
-        logger.info("비밀번호 재설정 이메일 전송 완료: %s", to_email)
-    except smtplib.SMTPException as exc:
-        logger.error("비밀번호 재설정 이메일 전송 실패 (%s): %s", to_email, exc)
+    get_mail_sender().enqueue(to_email, msg.as_string())
@@ -1,4 +1,5 @@
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 import logging
@@ -14,8 +15,11 @@ load_dotenv(_env_local, override=False)
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from database import engine, Base
+import email_service
+from database import async_engine, engine, Base
 from routers import users, activities, races, dashboard, plans
+from services import parse_pool, password_hashing
+from services.rate_limit import RateLimitMiddleware
 
 logger = logging.getLogger(__name__)
 
@@ -64,7 +68,7 @@ def _run_migrations() -> None:
 
     # password_reset_tokens 테이블은 create_all로 생성됨
 
-    # laps 테이블 삭제 (Activity.tcx_data 재파싱으로 대체)
+    # laps 테이블 삭제 (Activity.laps JSON 컬럼으로 대체)
     with engine.begin() as conn:
         conn.execute(text("DROP TABLE IF EXISTS laps"))
 
@@ -73,9 +77,16 @@ def _run_migrations() -> None:
         existing_act = {col["name"] for col in inspector.get_columns("activities")}
         act_stmts: list[str] = []
 
-        if "tcx_data" not in existing_act:
+        # 경량 TCX는 압축 컬럼에 저장 — 기존 tcx_data(MEDIUMTEXT)는
+        # `python -m services.backfills compress_legacy_tcx`가 옮긴 뒤 삭제한다
+        if "tcx_data" in existing_act:
+            logger.warning(
+                "activities.tcx_data가 남아 있습니다. 옮기기 전에는 해당 활동의 TCX를 읽을 수 없으니 "
+                "`python -m services.backfills compress_legacy_tcx`를 실행하세요"
+            )
+        if "tcx_blob" not in existing_act:
             act_stmts.append(
-                "ALTER TABLE activities ADD COLUMN tcx_data MEDIUMTEXT NULL"
+                "ALTER TABLE activities ADD COLUMN tcx_blob MEDIUMBLOB NULL"
             )
         if "is_treadmill" not in existing_act:
             act_stmts.append(
@@ -91,6 +102,11 @@ def _run_migrations() -> None:
                 "ENUM('pending','processing','completed','failed') NULL"
             )
 
+        if "laps" not in existing_act:
+            act_stmts.append(
+                "ALTER TABLE activities ADD COLUMN laps JSON NULL"
+            )
+
         if "plan_session_id" not in existing_act:
             act_stmts.append(
                 "ALTER TABLE activities ADD COLUMN plan_session_id INTEGER NULL"
@@ -102,6 +118,26 @@ def _run_migrations() -> None:
                     logger.info("Migration: %s", stmt)
                     conn.execute(text(stmt))
 
+    # llm_jobs 테이블 컬럼 추가
+    if "llm_jobs" in inspector.get_table_names():
+        existing_jobs = {col["name"] for col in inspector.get_columns("llm_jobs")}
+        if "bypass_cache" not in existing_jobs:
+            stmt = "ALTER TABLE llm_jobs ADD COLUMN bypass_cache BOOLEAN NOT NULL DEFAULT FALSE"
+            with engine.begin() as conn:
+                logger.info("Migration: %s", stmt)
+                conn.execute(text(stmt))
+
+    # 모델에 선언된 인덱스 중 기존 테이블에 없는 것 생성 (create_all은 기존 테이블을 건너뛴다)
+    table_names = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in table_names:
+            continue
+        existing_idx = {idx["name"] for idx in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_idx:
+                logger.info("Migration: CREATE INDEX %s ON %s", index.name, table.name)
+                index.create(bind=engine)
+
     logger.info("Migration complete.")
 
 
@@ -111,7 +147,19 @@ _run_migrations()
 UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
 os.makedirs(os.path.join(UPLOAD_DIR, "races"), exist_ok=True)
 
-app = FastAPI(title="Running Manager")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 첫 업로드가 워커 spawn 비용을 치르지 않도록 파싱 풀을 미리 띄운다
+    await parse_pool.start_parse_pool()
+    yield
+    parse_pool.shutdown_parse_pool()
+    password_hashing.shutdown_hash_pool()
+    email_service.stop_mail_sender()
+    await async_engine.dispose()
+
+
+app = FastAPI(title="Running Manager", lifespan=lifespan)
 
 origins = [
     "http://localhost:5173",
@@ -123,12 +171,15 @@ cors_env = os.getenv("CORS_ORIGINS", "")
 if cors_env:
     origins.extend([o.strip() for o in cors_env.split(",") if o.strip()])
 
+# CORS보다 먼저 추가해야 안쪽에 놓여 429 응답에도 CORS 헤더가 붙는다
+app.add_middleware(RateLimitMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[activities.NEXT_CURSOR_HEADER, "Retry-After"],
 )
 
 app.include_router(users.router)
@@ -1,7 +1,10 @@
 import enum
-from sqlalchemy import Boolean, Column, Date, Integer, String, Float, DateTime, ForeignKey, Text, Enum, Index
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, Date, Integer, String, Float, DateTime, ForeignKey, Text, Enum, Index, JSON, LargeBinary
+from sqlalchemy.dialects.mysql import MEDIUMBLOB
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import deferred, relationship
 from database import Base
+import payload_codec
 
 
 class DistanceType(str, enum.Enum):
@@ -32,6 +35,18 @@ class PlanStatus(str, enum.Enum):
     archived = "archived"
 
 
+class LLMJobKind(str, enum.Enum):
+    evaluate_activity = "evaluate_activity"
+    generate_plan = "generate_plan"
+
+
+class LLMJobStatus(str, enum.Enum):
+    queued = "queued"
+    processing = "processing"
+    completed = "completed"
+    failed = "failed"
+
+
 class SessionType(str, enum.Enum):
     Easy = "Easy"
     Long = "Long"
@@ -74,6 +89,11 @@ class User(Base):
         back_populates="user",
         cascade="all, delete-orphan"
     )
+    refresh_tokens = relationship(
+        "RefreshToken",
+        back_populates="user",
+        cascade="all, delete-orphan"
+    )
 
 
 class PasswordResetToken(Base):
@@ -91,6 +111,31 @@ class PasswordResetToken(Base):
 
     user = relationship("User", back_populates="password_reset_tokens")
 
+
+class RefreshToken(Base):
+    """리프레시 토큰 — 원문 대신 HMAC 해시만 저장한다 (auth.rotate_refresh_token).
+
+    사용할 때마다 revoked_at을 채우고 같은 family_id로 새 토큰을 발급한다. 이미
+    회전된 토큰이 다시 쓰이면 탈취로 보고 family 전체를 폐기한다.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    token_hash = Column(String(64), nullable=False)
+    family_id = Column(String(32), nullable=False)  # 한 번의 로그인에서 이어진 토큰 묶음
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_refresh_tokens_token_hash", "token_hash", unique=True),
+        Index("ix_refresh_tokens_family_id", "family_id"),
+        Index("ix_refresh_tokens_user_id", "user_id"),
+    )
+
+    user = relationship("User", back_populates="refresh_tokens")
+
 class Activity(Base):
     __tablename__ = "activities"
 
@@ -103,14 +148,83 @@ class Activity(Base):
     avg_hr = Column(Float)
     avg_cadence = Column(Float)
 
-    tcx_data = Column(Text, nullable=True)
+    # 상세 조회/재처리에서만 쓰는 페이로드 — 목록·집계 쿼리에서는 읽지 않는다 (필요 시 undefer)
+    tcx_blob = deferred(
+        Column(LargeBinary().with_variant(MEDIUMBLOB(), "mysql"), nullable=True),  # zlib 압축 경량 TCX
+        group="payload",
+    )
+    laps = deferred(
+        Column(JSON(none_as_null=True), nullable=True),  # 업로드 시 계산한 랩 목록 (ComputedLap dict)
+        group="payload",
+    )
     is_treadmill = Column(Boolean, default=False, nullable=False)
     llm_evaluation = Column(String(500), nullable=True)
     llm_evaluation_status = Column(Enum(LLMEvaluationStatus), nullable=True)
     plan_session_id = Column(Integer, ForeignKey("plan_sessions.id", ondelete="SET NULL"), nullable=True)
 
+    __table_args__ = (
+        # 사용자별 최신순 목록/커서 페이지네이션 — InnoDB 보조 인덱스는 PK(id)를 포함한다
+        Index("ix_activities_user_id_start_time", "user_id", "start_time"),
+    )
+
     owner = relationship("User", back_populates="activities")
     plan_session = relationship("PlanSession", foreign_keys=[plan_session_id])
+    series = relationship(
+        "ActivitySeries",
+        back_populates="activity",
+        uselist=False,
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    @hybrid_property
+    def tcx_data(self) -> str | None:
+        """경량 TCX 원문 — 접근할 때 tcx_blob을 해제한다."""
+        return payload_codec.decompress_text(self.tcx_blob)
+
+    @tcx_data.inplace.setter
+    def _tcx_data_setter(self, value: str | None) -> None:
+        self.tcx_blob = payload_codec.compress_text(value)
+
+    @tcx_data.inplace.expression
+    @classmethod
+    def _tcx_data_expression(cls):
+        # 쿼리에서는 압축 컬럼 자체로 NULL 여부 등을 판단한다
+        return cls.tcx_blob
+
+
+class ActivitySeries(Base):
+    """활동별 Trackpoint 시계열 — 필드별 little-endian 배열 (services/activity_series 참고)."""
+    __tablename__ = "activity_series"
+
+    activity_id = Column(Integer, ForeignKey("activities.id", ondelete="CASCADE"), primary_key=True)
+    point_count = Column(Integer, nullable=False)
+    time_offset = Column(LargeBinary, nullable=False)  # int32, seconds from start
+    distance = Column(LargeBinary, nullable=False)  # float32, cumulative meters
+    heart_rate = Column(LargeBinary, nullable=False)  # float32, NaN = 결측
+    cadence = Column(LargeBinary, nullable=False)  # float32
+    altitude = Column(LargeBinary, nullable=False)  # float32, meters
+    latitude = Column(LargeBinary, nullable=True)  # float64, GPS 없으면 NULL
+    longitude = Column(LargeBinary, nullable=True)  # float64
+
+    activity = relationship("Activity", back_populates="series")
+
+
+class TrainingRollup(Base):
+    """사용자별 일/주/월/연 훈련 집계 — 활동 업로드·삭제 시 같은 트랜잭션에서 증감한다 (services/rollups)."""
+    __tablename__ = "training_rollups"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    period_type = Column(String(5), primary_key=True)  # day | week | month | year
+    period_start = Column(Date, primary_key=True)  # 주는 월요일, 월/연은 1일
+    total_distance = Column(Float, nullable=False, default=0)  # meters
+    total_time = Column(Float, nullable=False, default=0)  # seconds
+    activity_count = Column(Integer, nullable=False, default=0)
+    pace_sum = Column(Float, nullable=False, default=0)  # avg_pace > 0인 활동만
+    pace_count = Column(Integer, nullable=False, default=0)
+    hr_sum = Column(Float, nullable=False, default=0)  # avg_hr가 있는 활동만
+    hr_count = Column(Integer, nullable=False, default=0)
+    treadmill_count = Column(Integer, nullable=False, default=0)
 
 
 class Race(Base):
@@ -129,6 +243,11 @@ class Race(Base):
     activity_id = Column(Integer, ForeignKey("activities.id", ondelete="SET NULL"), nullable=True)
     review = Column(Text, nullable=True)
 
+    __table_args__ = (
+        # 대시보드/계획 생성의 다가오는 대회(user_id, status) + race_date 정렬
+        Index("ix_races_user_id_status_race_date", "user_id", "status", "race_date"),
+    )
+
     owner = relationship("User", back_populates="races")
     activity = relationship("Activity", foreign_keys=[activity_id])
     images = relationship(
@@ -163,6 +282,11 @@ class Plan(Base):
     status = Column(Enum(PlanStatus), nullable=False, default=PlanStatus.active)
     generation_status = Column(Enum(LLMEvaluationStatus), nullable=True)
 
+    __table_args__ = (
+        # 활성 계획 조회(user_id, status) + created_at 최신순
+        Index("ix_plans_user_id_status_created_at", "user_id", "status", "created_at"),
+    )
+
     owner = relationship("User", back_populates="plans")
     sessions = relationship(
         "PlanSession",
@@ -185,3 +309,27 @@ class PlanSession(Base):
     target_pace = Column(Float, nullable=True)  # seconds per km
 
     plan = relationship("Plan", back_populates="sessions")
+
+
+class LLMJob(Base):
+    """LLM 작업 큐 — 웹 요청과 같은 트랜잭션에서 쌓고 worker.py가 가져가 처리한다 (services/jobs)."""
+    __tablename__ = "llm_jobs"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(Enum(LLMJobKind), nullable=False)
+    target_id = Column(Integer, nullable=False)  # kind에 따라 activities.id 또는 plans.id
+    status = Column(Enum(LLMJobStatus), nullable=False, default=LLMJobStatus.queued)
+    attempts = Column(Integer, nullable=False, default=0)
+    run_after = Column(DateTime, nullable=False)  # 재시도 백오프 — 이 시각 이후에만 가져간다
+    locked_at = Column(DateTime, nullable=True)  # processing 시작 시각 (reaper 기준)
+    locked_by = Column(String(100), nullable=True)
+    last_error = Column(String(500), nullable=True)
+    bypass_cache = Column(Boolean, nullable=False, default=False)  # LLM 응답 캐시를 건너뛰고 새로 호출
+    created_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # 가져갈 작업 탐색(queued, run_after 순)과 reaper의 processing 스캔
+        Index("ix_llm_jobs_status_run_after", "status", "run_after"),
+        Index("ix_llm_jobs_kind_target_id", "kind", "target_id"),
+    )
@@ -1,7 +1,12 @@
-from datetime import timedelta
-
-from fastapi import APIRouter, BackgroundTasks, Depends, Form, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, Form, HTTPException, Query, Response, UploadFile, File
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, undefer
 from typing import List, Optional
 
 import models
@@ -9,39 +14,58 @@ import schemas
 import database
 import auth
 import tcx_parser
-from services.llm.graph import evaluate_activity
+from services import activity_series, cache, jobs, parse_pool, rollups
 
 router = APIRouter(
     prefix="/activities",
     tags=["activities"],
 )
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _encode_cursor(activity: models.Activity) -> str:
+    """(start_time, id) 위치를 불투명한 URL-safe 문자열로 만든다."""
+    raw = json.dumps([activity.start_time.isoformat(), activity.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        start_time, activity_id = json.loads(raw)
+        return datetime.fromisoformat(start_time), int(activity_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 
 @router.post("/upload", response_model=List[schemas.Activity])
 async def upload_tcx(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     plan_session_id: Optional[int] = Form(None),
-    current_user: models.User = Depends(auth.get_current_user),
-    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(auth.get_current_user_async),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
-    content = await file.read()
     try:
-        parsed_activities = tcx_parser.parse_tcx(content)
+        ingested = await parse_pool.parse_tcx_upload(file)
+    except tcx_parser.TcxTooLargeError:
+        raise HTTPException(
+            status_code=413,
+            detail=f"TCX file is too large (max {tcx_parser.MAX_TCX_UPLOAD_SIZE // (1024 * 1024)}MB)",
+        )
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid TCX file: {str(e)}")
 
-    is_treadmill = tcx_parser.detect_treadmill(content)
-    lightweight_tcx = tcx_parser.create_lightweight_tcx(content)
-
     saved_activities = []
-    for activity_data in parsed_activities:
+    for activity_data, series in zip(ingested.activities, ingested.series):
         start = activity_data['start_time']
-        duplicate = db.query(models.Activity).filter(
-            models.Activity.user_id == current_user.id,
-            models.Activity.start_time >= start - timedelta(minutes=5),
-            models.Activity.start_time <= start + timedelta(minutes=5),
-        ).first()
+        duplicate = await db.scalar(
+            select(models.Activity.id).where(
+                models.Activity.user_id == current_user.id,
+                models.Activity.start_time >= start - timedelta(minutes=5),
+                models.Activity.start_time <= start + timedelta(minutes=5),
+            ).limit(1)
+        )
         if duplicate:
             raise HTTPException(
                 status_code=409,
@@ -56,16 +80,20 @@ async def upload_tcx(
             avg_pace=activity_data['avg_pace'],
             avg_hr=activity_data['avg_hr'],
             avg_cadence=activity_data['avg_cadence'],
-            tcx_data=lightweight_tcx,
-            is_treadmill=is_treadmill,
+            tcx_data=ingested.lightweight_tcx,
+            laps=activity_data['laps'],
+            series=activity_series.pack_series(series),
+            is_treadmill=ingested.is_treadmill,
             llm_evaluation_status=models.LLMEvaluationStatus.pending,
             plan_session_id=plan_session_id,
         )
         db.add(db_activity)
-        db.commit()
-        db.refresh(db_activity)
+        await db.flush()
+        await db.run_sync(rollups.apply_activity, db_activity)
+        await db.run_sync(jobs.enqueue, models.LLMJobKind.evaluate_activity, db_activity.id)
+        await db.commit()
+        cache.dashboard_cache.invalidate(current_user.id)
 
-        background_tasks.add_task(evaluate_activity, db_activity.id)
         saved_activities.append(db_activity)
 
     return saved_activities
@@ -73,18 +101,37 @@ async def upload_tcx(
 
 @router.get("/", response_model=List[schemas.Activity])
 def read_activities(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
     current_user: models.User = Depends(auth.get_current_user),
     db: Session = Depends(database.get_db),
 ):
-    activities = (
+    """최신순(start_time, id 내림차순) 활동 목록.
+
+    다음 페이지가 있으면 X-Next-Cursor 헤더로 커서를 돌려준다. cursor로 요청하면
+    ix_activities_user_id_start_time 인덱스 범위 탐색이라 페이지 깊이와 무관하게
+    비용이 같다. skip은 기존 클라이언트 호환용이다.
+    """
+    query = (
         db.query(models.Activity)
         .filter(models.Activity.user_id == current_user.id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+        .order_by(models.Activity.start_time.desc(), models.Activity.id.desc())
     )
+    if cursor:
+        start_time, last_id = _decode_cursor(cursor)
+        query = query.filter(or_(
+            models.Activity.start_time < start_time,
+            and_(models.Activity.start_time == start_time, models.Activity.id < last_id),
+        ))
+    elif skip:
+        query = query.offset(skip)
+
+    activities = query.limit(limit + 1).all()
+    if len(activities) > limit:
+        activities = activities[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = _encode_cursor(activities[-1])
     return activities
 
 
@@ -94,23 +141,51 @@ def read_activity(
     current_user: models.User = Depends(auth.get_current_user),
     db: Session = Depends(database.get_db),
 ):
-    activity = db.query(models.Activity).filter(
-        models.Activity.id == activity_id,
-        models.Activity.user_id == current_user.id,
-    ).first()
+    activity = (
+        db.query(models.Activity)
+        .options(undefer(models.Activity.laps))
+        .filter(
+            models.Activity.id == activity_id,
+            models.Activity.user_id == current_user.id,
+        )
+        .first()
+    )
     if activity is None:
         raise HTTPException(status_code=404, detail="Activity not found")
 
-    laps = tcx_parser.parse_laps_from_tcx(activity.tcx_data)
+    laps = activity.laps
+    if laps is None:
+        # 아직 백필되지 않은 기존 활동만 경량 TCX를 재파싱한다
+        laps = tcx_parser.parse_laps_from_tcx(activity.tcx_data)
 
     activity_dict = schemas.Activity.model_validate(activity).model_dump()
     return schemas.ActivityDetail(**activity_dict, laps=laps)
 
 
+@router.get("/{activity_id}/series", response_model=schemas.ActivitySeries)
+def read_activity_series(
+    activity_id: int,
+    current_user: models.User = Depends(auth.get_current_user),
+    db: Session = Depends(database.get_db),
+):
+    row = (
+        db.query(models.ActivitySeries)
+        .join(models.Activity)
+        .filter(
+            models.ActivitySeries.activity_id == activity_id,
+            models.Activity.user_id == current_user.id,
+        )
+        .first()
+    )
+    if row is None:
+        raise HTTPException(status_code=404, detail="Activity series not found")
+    return activity_series.unpack_series(row)
+
+
 @router.post("/{activity_id}/evaluate", response_model=schemas.MessageResponse)
 def re_evaluate_activity(
     activity_id: int,
-    background_tasks: BackgroundTasks,
+    bypass_cache: bool = Query(False),  # 입력이 같아도 LLM을 다시 호출 (캐시 무시)
     current_user: models.User = Depends(auth.get_current_user),
     db: Session = Depends(database.get_db),
 ):
@@ -123,9 +198,8 @@ def re_evaluate_activity(
 
     activity.llm_evaluation = None
     activity.llm_evaluation_status = models.LLMEvaluationStatus.pending
+    jobs.enqueue(db, models.LLMJobKind.evaluate_activity, activity_id, bypass_cache=bypass_cache)
     db.commit()
-
-    background_tasks.add_task(evaluate_activity, activity_id)
     return {"message": "평가를 다시 요청했습니다"}
 
 
@@ -141,6 +215,8 @@ def delete_activity(
     ).first()
     if activity is None:
         raise HTTPException(status_code=404, detail="Activity not found")
+    rollups.apply_activity(db, activity, sign=-1)
     db.delete(activity)
     db.commit()
+    cache.dashboard_cache.invalidate(current_user.id)
     return {"message": "Activity deleted successfully"}
@@ -1,9 +1,11 @@
 import calendar
-from datetime import datetime
-from collections import defaultdict
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from datetime import date, datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, selectinload
 import models, schemas, database, auth
+from services import cache, rollups
 
 router = APIRouter(
     prefix="/dashboard",
@@ -11,16 +13,56 @@ router = APIRouter(
 )
 
 
+def _period_total(row: models.TrainingRollup | None, period_start: date) -> schemas.PeriodTotal:
+    """집계 행을 응답용 기간 합계로 변환한다. 활동이 없는 기간은 0."""
+    if row is None or row.activity_count <= 0:
+        return schemas.PeriodTotal(period_start=period_start, distance_km=0, total_time=0, activity_count=0)
+    return schemas.PeriodTotal(
+        period_start=period_start,
+        distance_km=round(row.total_distance / 1000, 2),
+        total_time=row.total_time,
+        activity_count=row.activity_count,
+        avg_pace=round(row.pace_sum / row.pace_count, 1) if row.pace_count else None,
+        avg_hr=round(row.hr_sum / row.hr_count, 1) if row.hr_count else None,
+        treadmill_ratio=round(row.treadmill_count / row.activity_count, 3),
+    )
+
+
 @router.get("/", response_model=schemas.DashboardData)
 def get_dashboard(
+    year: Optional[int] = Query(None, ge=1970, le=2100),
+    month: Optional[int] = Query(None, ge=1, le=12),
     current_user: models.User = Depends(auth.get_current_user),
     db: Session = Depends(database.get_db),
 ):
+    user_id = current_user.id
+    now = datetime.utcnow()
+    year = year or now.year
+    month = month or now.month
+    week_start = rollups.period_start("week", now.date())
+
+    # 세대 키를 DB 조회 전에 고정하고, 인증 조회로 시작된 읽기 트랜잭션을 끝내
+    # 이후 조회가 마지막 무효화 시점 이후의 데이터를 보도록 한다
+    cache_key = cache.dashboard_cache.make_key(user_id, f"{year}-{month:02d}:{week_start}")
+    cached = cache.dashboard_cache.get(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+    db.commit()
+
+    body = _build_dashboard(db, user_id, year, month, week_start).model_dump_json()
+    cache.dashboard_cache.set(cache_key, body)
+    return Response(content=body, media_type="application/json")
+
+
+def _build_dashboard(
+    db: Session, user_id: int, year: int, month: int, week_start: date,
+) -> schemas.DashboardData:
     # Upcoming races: status == "예정", ordered by race_date ASC, limit 2
     upcoming_races = (
         db.query(models.Race)
+        .options(selectinload(models.Race.images), selectinload(models.Race.activity))
         .filter(
-            models.Race.user_id == current_user.id,
+            models.Race.user_id == user_id,
             models.Race.status == models.RaceStatus.upcoming,
         )
         .order_by(models.Race.race_date.asc())
@@ -28,46 +70,50 @@ def get_dashboard(
         .all()
     )
 
-    # Monthly running: ALL days of the current month
-    now = datetime.utcnow()
-    first_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    days_in_month = calendar.monthrange(now.year, now.month)[1]
+    # Monthly running: ALL days of the requested month
+    first_of_month = date(year, month, 1)
+    days_in_month = calendar.monthrange(year, month)[1]
 
-    activities = (
-        db.query(models.Activity)
+    # 일별 행 + 이번 주/선택한 달/연도 합계를 training_rollups에서 한 번에 읽는다
+    Rollup = models.TrainingRollup
+    rows = (
+        db.query(Rollup)
         .filter(
-            models.Activity.user_id == current_user.id,
-            models.Activity.start_time >= first_of_month,
+            Rollup.user_id == user_id,
+            or_(
+                and_(
+                    Rollup.period_type == "day",
+                    Rollup.period_start >= first_of_month,
+                    Rollup.period_start <= first_of_month.replace(day=days_in_month),
+                ),
+                and_(Rollup.period_type == "week", Rollup.period_start == week_start),
+                and_(Rollup.period_type == "month", Rollup.period_start == first_of_month),
+                and_(Rollup.period_type == "year", Rollup.period_start == date(year, 1, 1)),
+            ),
         )
         .all()
     )
-
-    # Group by date
-    daily: dict[str, list] = defaultdict(list)
-    for a in activities:
-        date_key = a.start_time.strftime("%Y-%m-%d")
-        daily[date_key].append(a)
+    daily = {row.period_start: row for row in rows if row.period_type == "day"}
+    totals = {row.period_type: row for row in rows if row.period_type != "day"}
 
     # Build all days of month
     monthly_running = []
-    for day in range(1, days_in_month + 1):
-        date_key = f"{now.year}-{now.month:02d}-{day:02d}"
-        if date_key in daily:
-            day_activities = daily[date_key]
-            total_distance_km = sum(a.total_distance for a in day_activities) / 1000
-            paces = [a.avg_pace for a in day_activities if a.avg_pace]
-            avg_pace = sum(paces) / len(paces) if paces else None
+    for day_of_month in range(1, days_in_month + 1):
+        day = first_of_month.replace(day=day_of_month)
+        row = daily.get(day)
+        if row is not None:
+            avg_pace = row.pace_sum / row.pace_count if row.pace_count else None
             monthly_running.append(
                 schemas.MonthlyRunningDay(
-                    date=date_key,
-                    distance_km=round(total_distance_km, 2),
+                    date=day.isoformat(),
+                    distance_km=round(row.total_distance / 1000, 2),
                     avg_pace=round(avg_pace, 1) if avg_pace else None,
                 )
             )
         else:
             monthly_running.append(
                 schemas.MonthlyRunningDay(
-                    date=date_key,
+                    date=day.isoformat(),
                     distance_km=0,
                     avg_pace=None,
                 )
@@ -76,7 +122,7 @@ def get_dashboard(
     # Recent 5 activities
     recent_activities = (
         db.query(models.Activity)
-        .filter(models.Activity.user_id == current_user.id)
+        .filter(models.Activity.user_id == user_id)
         .order_by(models.Activity.start_time.desc())
         .limit(5)
         .all()
@@ -86,4 +132,7 @@ def get_dashboard(
         upcoming_races=upcoming_races,
         monthly_running=monthly_running,
         recent_activities=recent_activities,
+        weekly_total=_period_total(totals.get("week"), week_start),
+        monthly_total=_period_total(totals.get("month"), first_of_month),
+        yearly_total=_period_total(totals.get("year"), date(year, 1, 1)),
     )
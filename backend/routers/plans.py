@@ -1,6 +1,7 @@
 from datetime import datetime
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from typing import List
 
@@ -8,7 +9,7 @@ import models
 import schemas
 import database
 import auth
-from services.llm.plan_graph import generate_plan
+from services import jobs
 
 router = APIRouter(
     prefix="/plans",
@@ -19,7 +20,6 @@ router = APIRouter(
 @router.post("/", response_model=schemas.PlanOut)
 def create_plan(
     plan_data: schemas.PlanCreate,
-    background_tasks: BackgroundTasks,
     current_user: models.User = Depends(auth.get_current_user),
     db: Session = Depends(database.get_db),
 ):
@@ -31,11 +31,11 @@ def create_plan(
         generation_status=models.LLMEvaluationStatus.pending,
     )
     db.add(db_plan)
+    db.flush()
+    jobs.enqueue(db, models.LLMJobKind.generate_plan, db_plan.id)
     db.commit()
     db.refresh(db_plan)
 
-    background_tasks.add_task(generate_plan, db_plan.id)
-
     result = schemas.PlanOut.model_validate(db_plan)
     result.session_count = 0
     return result
@@ -46,16 +46,23 @@ def list_plans(
     current_user: models.User = Depends(auth.get_current_user),
     db: Session = Depends(database.get_db),
 ):
-    plans = (
-        db.query(models.Plan)
+    # 세션 행을 읽지 않고 계획별 개수만 상관 서브쿼리로 함께 가져온다
+    session_count = (
+        select(func.count(models.PlanSession.id))
+        .where(models.PlanSession.plan_id == models.Plan.id)
+        .correlate(models.Plan)
+        .scalar_subquery()
+    )
+    rows = (
+        db.query(models.Plan, session_count.label("session_count"))
         .filter(models.Plan.user_id == current_user.id)
         .order_by(models.Plan.created_at.desc())
         .all()
     )
     result = []
-    for plan in plans:
+    for plan, count in rows:
         out = schemas.PlanOut.model_validate(plan)
-        out.session_count = len(plan.sessions)
+        out.session_count = count
         result.append(out)
     return result
 
@@ -115,6 +122,29 @@ def delete_plan(
     return {"message": "계획이 삭제되었습니다"}
 
 
+@router.post("/{plan_id}/regenerate", response_model=schemas.MessageResponse)
+def regenerate_plan(
+    plan_id: int,
+    bypass_cache: bool = Query(False),  # 입력이 같아도 LLM을 다시 호출 (캐시 무시)
+    current_user: models.User = Depends(auth.get_current_user),
+    db: Session = Depends(database.get_db),
+):
+    plan = db.query(models.Plan).filter(
+        models.Plan.id == plan_id,
+        models.Plan.user_id == current_user.id,
+    ).first()
+    if not plan:
+        raise HTTPException(status_code=404, detail="계획을 찾을 수 없습니다")
+
+    # 기존 세션은 새 응답으로 다시 만든다 — 연결된 활동은 FK의 SET NULL로 끊긴다
+    plan.sessions.clear()
+    plan.llm_plan_text = None
+    plan.generation_status = models.LLMEvaluationStatus.pending
+    jobs.enqueue(db, models.LLMJobKind.generate_plan, plan_id, bypass_cache=bypass_cache)
+    db.commit()
+    return {"message": "계획 생성을 다시 요청했습니다"}
+
+
 @router.get("/{plan_id}/sessions", response_model=List[schemas.PlanSessionBrief])
 def get_plan_sessions(
     plan_id: int,
@@ -2,12 +2,14 @@ import os
 import uuid
 import shutil
 from datetime import datetime, timedelta
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
 import models, schemas, database, auth, tcx_parser
-from services.llm.graph import evaluate_activity
+from services import activity_series, cache, jobs, parse_pool, rollups
 
 router = APIRouter(
     prefix="/races",
@@ -38,6 +40,7 @@ def create_race(
     )
     db.add(db_race)
     db.commit()
+    cache.dashboard_cache.invalidate(current_user.id)
     db.refresh(db_race)
     return db_race
 
@@ -51,7 +54,11 @@ def list_races(
     query = db.query(models.Race).filter(models.Race.user_id == current_user.id)
     if status:
         query = query.filter(models.Race.status == status)
-    races = query.order_by(models.Race.race_date.desc()).all()
+    races = (
+        query.options(selectinload(models.Race.images), selectinload(models.Race.activity))
+        .order_by(models.Race.race_date.desc())
+        .all()
+    )
     return races
 
 
@@ -89,6 +96,7 @@ def update_race(
         setattr(race, key, value)
 
     db.commit()
+    cache.dashboard_cache.invalidate(current_user.id)
     db.refresh(race)
     return race
 
@@ -112,6 +120,7 @@ def update_race_result(
         setattr(race, key, value)
 
     db.commit()
+    cache.dashboard_cache.invalidate(current_user.id)
     db.refresh(race)
     return race
 
@@ -119,44 +128,48 @@ def update_race_result(
 @router.post("/{race_id}/upload-tcx", response_model=schemas.RaceOut)
 async def upload_race_tcx(
     race_id: int,
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
-    current_user: models.User = Depends(auth.get_current_user),
-    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(auth.get_current_user_async),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     """Upload TCX for a race: creates activity (or links existing), and links to race."""
-    race = db.query(models.Race).filter(
-        models.Race.id == race_id,
-        models.Race.user_id == current_user.id,
-    ).first()
+    race = await db.scalar(
+        select(models.Race).where(
+            models.Race.id == race_id,
+            models.Race.user_id == current_user.id,
+        )
+    )
     if not race:
         raise HTTPException(status_code=404, detail="대회를 찾을 수 없습니다")
 
-    content = await file.read()
     try:
-        parsed_activities = tcx_parser.parse_tcx(content)
+        ingested = await parse_pool.parse_tcx_upload(file)
+    except tcx_parser.TcxTooLargeError:
+        raise HTTPException(
+            status_code=413,
+            detail=f"TCX 파일 크기는 {tcx_parser.MAX_TCX_UPLOAD_SIZE // (1024 * 1024)}MB 이하여야 합니다",
+        )
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"TCX 파일을 읽을 수 없습니다: {str(e)}")
 
-    if not parsed_activities:
+    if not ingested.activities:
         raise HTTPException(status_code=400, detail="TCX 파일에 활동 데이터가 없습니다")
 
-    activity_data = parsed_activities[0]
+    activity_data = ingested.activities[0]
 
     # Check if this activity already exists (within 5 min window)
     start = activity_data['start_time']
-    existing = db.query(models.Activity).filter(
-        models.Activity.user_id == current_user.id,
-        models.Activity.start_time >= start - timedelta(minutes=5),
-        models.Activity.start_time <= start + timedelta(minutes=5),
-    ).first()
+    existing_id = await db.scalar(
+        select(models.Activity.id).where(
+            models.Activity.user_id == current_user.id,
+            models.Activity.start_time >= start - timedelta(minutes=5),
+            models.Activity.start_time <= start + timedelta(minutes=5),
+        ).limit(1)
+    )
 
-    if existing:
-        race.activity_id = existing.id
+    if existing_id:
+        race.activity_id = existing_id
     else:
-        is_treadmill = tcx_parser.detect_treadmill(content)
-        lightweight_tcx = tcx_parser.create_lightweight_tcx(content)
-
         db_activity = models.Activity(
             user_id=current_user.id,
             start_time=activity_data['start_time'],
@@ -165,20 +178,27 @@ async def upload_race_tcx(
             avg_pace=activity_data['avg_pace'],
             avg_hr=activity_data['avg_hr'],
             avg_cadence=activity_data['avg_cadence'],
-            tcx_data=lightweight_tcx,
-            is_treadmill=is_treadmill,
+            tcx_data=ingested.lightweight_tcx,
+            laps=activity_data['laps'],
+            series=activity_series.pack_series(ingested.series[0]),
+            is_treadmill=ingested.is_treadmill,
             llm_evaluation_status=models.LLMEvaluationStatus.pending,
         )
         db.add(db_activity)
-        db.commit()
-        db.refresh(db_activity)
-
-        background_tasks.add_task(evaluate_activity, db_activity.id)
+        await db.flush()
+        await db.run_sync(rollups.apply_activity, db_activity)
+        await db.run_sync(jobs.enqueue, models.LLMJobKind.evaluate_activity, db_activity.id)
         race.activity_id = db_activity.id
 
-    db.commit()
-    db.refresh(race)
-    return race
+    await db.commit()
+    cache.dashboard_cache.invalidate(current_user.id)
+    # 응답 직렬화에서 lazy load가 일어나지 않도록 관계까지 다시 읽는다
+    return await db.scalar(
+        select(models.Race)
+        .where(models.Race.id == race_id)
+        .options(selectinload(models.Race.images), selectinload(models.Race.activity))
+        .execution_options(populate_existing=True)
+    )
 
 
 @router.delete("/{race_id}")
@@ -201,6 +221,7 @@ def delete_race(
 
     db.delete(race)
     db.commit()
+    cache.dashboard_cache.invalidate(current_user.id)
     return {"message": "대회가 삭제되었습니다"}
 
 
@@ -208,19 +229,21 @@ def delete_race(
 async def upload_race_image(
     race_id: int,
     file: UploadFile = File(...),
-    current_user: models.User = Depends(auth.get_current_user),
-    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(auth.get_current_user_async),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
-    race = db.query(models.Race).filter(
-        models.Race.id == race_id,
-        models.Race.user_id == current_user.id,
-    ).first()
-    if not race:
+    race_found = await db.scalar(
+        select(models.Race.id).where(
+            models.Race.id == race_id,
+            models.Race.user_id == current_user.id,
+        )
+    )
+    if not race_found:
         raise HTTPException(status_code=404, detail="대회를 찾을 수 없습니다")
 
-    image_count = db.query(models.RaceImage).filter(
-        models.RaceImage.race_id == race_id
-    ).count()
+    image_count = await db.scalar(
+        select(func.count(models.RaceImage.id)).where(models.RaceImage.race_id == race_id)
+    )
     if image_count >= MAX_IMAGES_PER_RACE:
         raise HTTPException(status_code=400, detail=f"이미지는 최대 {MAX_IMAGES_PER_RACE}장까지 업로드할 수 있습니다")
 
@@ -247,8 +270,8 @@ async def upload_race_image(
         uploaded_at=datetime.utcnow(),
     )
     db.add(db_image)
-    db.commit()
-    db.refresh(db_image)
+    await db.commit()
+    cache.dashboard_cache.invalidate(current_user.id)
     return db_image
 
 
@@ -279,6 +302,7 @@ def delete_race_image(
 
     db.delete(image)
     db.commit()
+    cache.dashboard_cache.invalidate(current_user.id)
     return {"message": "이미지가 삭제되었습니다"}
 
 
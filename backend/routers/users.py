@@ -11,6 +11,8 @@ import httpx
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import RedirectResponse
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 import auth
@@ -18,6 +20,7 @@ import database
 import email_service
 import models
 import schemas
+from services import password_hashing
 
 logger = logging.getLogger(__name__)
 
@@ -42,12 +45,12 @@ router = APIRouter(
     status_code=status.HTTP_201_CREATED,
     summary="회원 가입",
 )
-def create_user(user: schemas.UserCreate, db: Session = Depends(database.get_db)):
+async def create_user(user: schemas.UserCreate, db: AsyncSession = Depends(database.get_async_db)):
     """새 사용자를 등록합니다."""
-    db_user = db.query(models.User).filter(models.User.email == user.email).first()
+    db_user = await db.scalar(select(models.User).where(models.User.email == user.email))
     if db_user:
         raise HTTPException(status_code=400, detail="이미 사용 중인 이메일입니다.")
-    hashed_password = auth.get_password_hash(user.password)
+    hashed_password = await password_hashing.hash_password(user.password)
     db_user = models.User(
         email=user.email,
         hashed_password=hashed_password,
@@ -57,8 +60,7 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(database.get_db)
         gender=user.gender,
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
     return db_user
 
 
@@ -67,29 +69,77 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(database.get_db)
     response_model=schemas.Token,
     summary="로그인 (JWT 발급)",
 )
-def login_for_access_token(
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     """이메일/비밀번호로 로그인하여 JWT 액세스 토큰을 발급받습니다."""
-    user = db.query(models.User).filter(models.User.email == form_data.username).first()
+    user = await db.scalar(select(models.User).where(models.User.email == form_data.username))
     if not user or not user.hashed_password:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="이메일 또는 비밀번호가 올바르지 않습니다.",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    if not auth.verify_password(form_data.password, user.hashed_password):
+    verified, new_hash = await password_hashing.verify_password(
+        form_data.password, user.hashed_password,
+    )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="이메일 또는 비밀번호가 올바르지 않습니다.",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        # BCRYPT_ROUNDS가 바뀐 뒤 첫 로그인 — 평문을 아는 지금 새 비용으로 교체
+        user.hashed_password = new_hash
     access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = auth.create_access_token(
         data={"sub": user.email}, expires_delta=access_token_expires
     )
-    return {"access_token": access_token, "token_type": "bearer"}
+    refresh_token = await db.run_sync(auth.issue_refresh_token, user.id)
+    await db.commit()
+    if new_hash:
+        auth.invalidate_user(user.email)
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+
+@router.post(
+    "/token/refresh",
+    response_model=schemas.Token,
+    summary="액세스 토큰 갱신",
+)
+def refresh_access_token(
+    request: schemas.RefreshTokenRequest,
+    db: Session = Depends(database.get_db),
+):
+    """리프레시 토큰으로 새 액세스 토큰을 발급합니다.
+
+    리프레시 토큰은 한 번만 쓸 수 있으며, 응답의 새 리프레시 토큰으로 교체해야 합니다.
+    """
+    email, refresh_token = auth.rotate_refresh_token(db, request.refresh_token)
+    access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = auth.create_access_token(
+        data={"sub": email}, expires_delta=access_token_expires
+    )
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+
+@router.post(
+    "/token/revoke",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="리프레시 토큰 폐기 (로그아웃)",
+)
+def revoke_refresh_token(
+    request: schemas.RefreshTokenRequest,
+    db: Session = Depends(database.get_db),
+):
+    """로그아웃 시 리프레시 토큰과 그 로그인에서 회전된 토큰을 모두 폐기합니다.
+
+    이미 폐기됐거나 모르는 토큰이어도 204를 돌려줍니다.
+    """
+    auth.revoke_refresh_token_family(db, request.refresh_token)
+    db.commit()
 
 
 @router.get(
@@ -105,7 +155,7 @@ def google_login():
             detail="Google 로그인이 설정되지 않았습니다.",
         )
     redirect_uri = f"{BACKEND_URL}/users/auth/google/callback"
-    logger.info(f"Google login: BACKEND_URL={BACKEND_URL}, redirect_uri={redirect_uri}")
+    logger.info("Google login: redirect_uri=%s", redirect_uri)
 
     params = {
         "client_id": GOOGLE_CLIENT_ID,
@@ -116,7 +166,6 @@ def google_login():
     }
     query_string = urlencode(params)
     google_auth_url = f"{GOOGLE_AUTH_URL}?{query_string}"
-    logger.info(f"Redirecting to Google: {google_auth_url[:100]}...")
     return RedirectResponse(url=google_auth_url)
 
 
@@ -127,16 +176,13 @@ def google_login():
 )
 async def google_callback(
     request: Request,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     """Google OAuth 콜백을 처리하고 프론트엔드로 JWT와 함께 리다이렉트합니다."""
-    print("=" * 50)
-    print(f"GOOGLE CALLBACK CALLED!")
-    print(f"query_params: {dict(request.query_params)}")
-    print("=" * 50)
     code = request.query_params.get("code")
-    logger.info(f"Google callback received: query_params={dict(request.query_params)}")
-    logger.info(f"Code={code}")
+    # 인가 코드는 일회용 자격 증명이므로 로그에 남기지 않는다
+    logger.info("Google callback: code=%s, error=%s", "present" if code else "missing",
+                request.query_params.get("error"))
     if not GOOGLE_CLIENT_ID or not GOOGLE_CLIENT_SECRET:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -144,7 +190,6 @@ async def google_callback(
         )
 
     redirect_uri = f"{BACKEND_URL}/users/auth/google/callback"
-    logger.info(f"Google callback: BACKEND_URL={BACKEND_URL}, redirect_uri={redirect_uri}, code={code}")
 
     try:
         async with httpx.AsyncClient(timeout=10.0) as client:
@@ -155,7 +200,6 @@ async def google_callback(
                 "redirect_uri": redirect_uri,
                 "grant_type": "authorization_code",
             }
-            logger.info(f"Sending to Google token endpoint: {token_data}")
             token_response = await client.post(
                 GOOGLE_TOKEN_URL,
                 data=token_data,
@@ -186,13 +230,14 @@ async def google_callback(
         )
 
     # 기존 google_id로 조회 → 없으면 이메일로 조회 → 없으면 신규 생성
-    user = db.query(models.User).filter(models.User.google_id == google_id).first()
+    user = await db.scalar(select(models.User).where(models.User.google_id == google_id))
     if user is None:
-        user = db.query(models.User).filter(models.User.email == email).first()
+        user = await db.scalar(select(models.User).where(models.User.email == email))
         if user is not None:
             # 기존 이메일 계정에 Google ID 연결
             user.google_id = google_id
-            db.commit()
+            await db.commit()
+            auth.invalidate_user(user.email)
         else:
             user = models.User(
                 email=email,
@@ -201,16 +246,19 @@ async def google_callback(
                 hashed_password=None,
             )
             db.add(user)
-            db.commit()
-            db.refresh(user)
+            await db.commit()
 
     access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
     jwt_token = auth.create_access_token(
         data={"sub": user.email}, expires_delta=access_token_expires
     )
+    # 비밀번호 로그인과 같이 리프레시 토큰 계열을 새로 시작한다
+    refresh_token = await db.run_sync(auth.issue_refresh_token, user.id)
+    await db.commit()
 
+    query = urlencode({"token": jwt_token, "refresh_token": refresh_token})
     return RedirectResponse(
-        url=f"{FRONTEND_URL}/auth/google/callback?token={jwt_token}"
+        url=f"{FRONTEND_URL}/auth/google/callback?{query}"
     )
 
 
@@ -245,20 +293,22 @@ def update_my_profile(
     db: Session = Depends(database.get_db),
 ):
     """닉네임, 생년월일, 성별을 수정합니다."""
-    current_user.nickname = profile_update.nickname
-    current_user.birth_year = profile_update.birth_year
-    current_user.birth_month = profile_update.birth_month
-    current_user.gender = profile_update.gender
+    user = db.get(models.User, current_user.id)
+    user.nickname = profile_update.nickname
+    user.birth_year = profile_update.birth_year
+    user.birth_month = profile_update.birth_month
+    user.gender = profile_update.gender
     db.commit()
-    db.refresh(current_user)
+    auth.invalidate_user(user.email)
+    db.refresh(user)
     return schemas.UserProfile(
-        email=current_user.email,
-        nickname=current_user.nickname,
-        birth_year=current_user.birth_year,
-        birth_month=current_user.birth_month,
-        gender=current_user.gender,
-        has_google=bool(current_user.google_id),
-        has_password=bool(current_user.hashed_password),
+        email=user.email,
+        nickname=user.nickname,
+        birth_year=user.birth_year,
+        birth_month=user.birth_month,
+        gender=user.gender,
+        has_google=bool(user.google_id),
+        has_password=bool(user.hashed_password),
     )
 
 
@@ -267,24 +317,31 @@ def update_my_profile(
     response_model=schemas.MessageResponse,
     summary="비밀번호 변경",
 )
-def change_password(
+async def change_password(
     request: schemas.PasswordChangeRequest,
-    current_user: models.User = Depends(auth.get_current_user),
-    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(auth.get_current_user_async),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     """현재 비밀번호를 확인한 후 새 비밀번호로 변경합니다."""
+    # 캐시된 스냅샷이 아니라 최신 행으로 확인하고 수정한다
+    current_user = await db.get(models.User, current_user.id)
     if not current_user.hashed_password:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="비밀번호가 설정되지 않은 계정입니다.",
         )
-    if not auth.verify_password(request.current_password, current_user.hashed_password):
+    verified, _ = await password_hashing.verify_password(
+        request.current_password, current_user.hashed_password,
+    )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="현재 비밀번호가 올바르지 않습니다.",
         )
-    current_user.hashed_password = auth.get_password_hash(request.new_password)
-    db.commit()
+    current_user.hashed_password = await password_hashing.hash_password(request.new_password)
+    await db.run_sync(auth.revoke_refresh_tokens, current_user.id)
+    await db.commit()
+    auth.invalidate_user(current_user.email)
     return {"message": "비밀번호가 성공적으로 변경되었습니다."}
 
 
@@ -333,15 +390,14 @@ def forgot_password(
     response_model=schemas.MessageResponse,
     summary="비밀번호 재설정",
 )
-def reset_password(
+async def reset_password(
     request: schemas.ResetPasswordRequest,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     """재설정 토큰을 검증하고 새 비밀번호로 변경합니다."""
-    db_token = (
-        db.query(models.PasswordResetToken)
-        .filter(models.PasswordResetToken.token == request.token)
-        .first()
+    db_token = await db.scalar(
+        select(models.PasswordResetToken)
+        .where(models.PasswordResetToken.token == request.token)
     )
 
     if db_token is None or db_token.used:
@@ -356,15 +412,17 @@ def reset_password(
             detail="재설정 링크가 만료되었습니다. 다시 요청해 주세요.",
         )
 
-    user = db.query(models.User).filter(models.User.id == db_token.user_id).first()
+    user = await db.get(models.User, db_token.user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="사용자를 찾을 수 없습니다.",
         )
 
-    user.hashed_password = auth.get_password_hash(request.new_password)
+    user.hashed_password = await password_hashing.hash_password(request.new_password)
     db_token.used = True
-    db.commit()
+    await db.run_sync(auth.revoke_refresh_tokens, user.id)
+    await db.commit()
+    auth.invalidate_user(user.email)
 
     return {"message": "비밀번호가 성공적으로 변경되었습니다."}
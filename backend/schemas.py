@@ -49,6 +49,17 @@ class ActivityDetail(Activity):
     laps: list[ComputedLap] = []
 
 
+class ActivitySeries(BaseModel):
+    point_count: int
+    time_offset: list[int]
+    distance: list[float | None]
+    heart_rate: list[float | None]
+    cadence: list[float | None]
+    altitude: list[float | None]
+    latitude: list[float | None] | None = None
+    longitude: list[float | None] | None = None
+
+
 class UserBase(BaseModel):
     email: str
 
@@ -110,6 +121,10 @@ class MessageResponse(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: str | None = None
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
 
 class TokenData(BaseModel):
     email: str | None = None
@@ -211,10 +226,22 @@ class RecentActivity(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+class PeriodTotal(BaseModel):
+    period_start: date
+    distance_km: float
+    total_time: float  # seconds
+    activity_count: int
+    avg_pace: float | None = None  # seconds per km, 활동별 평균 페이스의 평균
+    avg_hr: float | None = None
+    treadmill_ratio: float = 0  # 트레드밀 활동 비율 (0~1)
+
 class DashboardData(BaseModel):
     upcoming_races: List[RaceOut] = []
     monthly_running: List[MonthlyRunningDay] = []
     recent_activities: List[RecentActivity] = []
+    weekly_total: PeriodTotal | None = None  # 이번 주 (월요일 시작)
+    monthly_total: PeriodTotal | None = None  # 요청한 달
+    yearly_total: PeriodTotal | None = None  # 요청한 연도
 
 
 # --- Plan schemas ---
@@ -0,0 +1,70 @@
+"""활동 시계열의 열(column) 단위 바이너리 인코딩.
+
+TcxIngestResult.series의 필드별 리스트를 표준 라이브러리 array로 패킹해
+activity_series 테이블의 BLOB 컬럼에 저장한다. 바이트 순서는 항상 little-endian,
+결측값은 float 배열에서 NaN으로 표현한다. 상세 화면/분석은 경량 TCX를
+다시 파싱하지 않고 수 KB의 배열만 읽으면 된다.
+"""
+
+import math
+import sys
+from array import array
+
+import models
+
+# 필드 -> array typecode (i: int32, f: float32, d: float64)
+SERIES_TYPECODES = {
+    "time_offset": "i",  # 활동 시작 기준 초
+    "distance": "f",  # 누적 meters
+    "heart_rate": "f",  # bpm
+    "cadence": "f",  # spm (기기 기록값 그대로)
+    "altitude": "f",  # meters
+    "latitude": "d",
+    "longitude": "d",
+}
+_OPTIONAL_FIELDS = ("latitude", "longitude")
+_NAN = float("nan")
+
+
+def _pack(typecode: str, values) -> bytes:
+    if typecode == "i":
+        packed = array(typecode, values)
+    else:
+        packed = array(typecode, (_NAN if v is None else v for v in values))
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack(typecode: str, data: bytes) -> list:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    if typecode == "i":
+        return values.tolist()
+    return [None if math.isnan(v) else v for v in values]
+
+
+def pack_series(series: dict) -> models.ActivitySeries:
+    """필드별 리스트 dict를 ActivitySeries 행으로 패킹한다.
+
+    위경도가 모두 비어 있으면(트레드밀, 백필 데이터) 해당 컬럼은 NULL로 둔다.
+    """
+    columns = {}
+    for name, typecode in SERIES_TYPECODES.items():
+        values = series.get(name) or []
+        if name in _OPTIONAL_FIELDS and all(v is None for v in values):
+            columns[name] = None
+        else:
+            columns[name] = _pack(typecode, values)
+    return models.ActivitySeries(point_count=len(series["time_offset"]), **columns)
+
+
+def unpack_series(row: models.ActivitySeries) -> dict:
+    """ActivitySeries 행을 필드별 리스트 dict로 되돌린다 (NaN은 None)."""
+    result = {"point_count": row.point_count}
+    for name, typecode in SERIES_TYPECODES.items():
+        data = getattr(row, name)
+        result[name] = None if data is None else _unpack(typecode, data)
+    return result
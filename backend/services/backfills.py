@@ -0,0 +1,216 @@
+"""스키마 변경 후 기존 행을 채우는 배치 백필 작업.
+
+기존 행 전체를 훑고 TCX를 다시 파싱하므로 앱 시작 경로에서는 돌리지 않는다.
+배포 후 웹 서버가 테이블/컬럼을 만든 다음 한 번 실행한다:
+
+    python -m services.backfills [작업 이름 ...]
+
+모든 작업은 작은 배치 단위로 커밋하며, 이미 처리된 행은 건너뛰므로 여러 번
+실행해도 안전하다.
+"""
+
+import argparse
+import logging
+
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import Session, undefer
+
+import models
+import payload_codec
+import tcx_parser
+from database import SessionLocal
+from services import activity_series, rollups
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_BATCH_SIZE = 200
+
+
+def compress_legacy_tcx(db: Session, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """압축 전 스키마의 activities.tcx_data(MEDIUMTEXT)를 tcx_blob으로 옮긴다.
+
+    옮긴 행의 원문은 바로 NULL로 비우므로 중간에 중단돼도 이어서 실행할 수 있다.
+    모든 행을 옮기면 기존 컬럼을 삭제한다 (스키마 변경이라 명령으로만 실행한다). ORM 매핑에는 더 이상 없는 컬럼이라
+    SQL을 직접 사용한다.
+
+    Returns:
+        변환된 활동 수
+    """
+    columns = {col["name"] for col in inspect(db.connection()).get_columns("activities")}
+    if "tcx_data" not in columns:
+        return 0
+
+    converted = 0
+    while True:
+        rows = db.execute(
+            text(
+                "SELECT id, tcx_data FROM activities "
+                "WHERE tcx_data IS NOT NULL ORDER BY id LIMIT :limit"
+            ),
+            {"limit": batch_size},
+        ).all()
+        if not rows:
+            break
+        db.execute(
+            text("UPDATE activities SET tcx_blob = :blob, tcx_data = NULL WHERE id = :id"),
+            [{"id": row.id, "blob": payload_codec.compress_text(row.tcx_data)} for row in rows],
+        )
+        db.commit()
+        converted += len(rows)
+
+    logger.info("Migration: %d개 활동의 TCX를 압축했습니다. tcx_data 컬럼을 삭제합니다", converted)
+    db.execute(text("ALTER TABLE activities DROP COLUMN tcx_data"))
+    db.commit()
+    return converted
+
+
+def backfill_activity_laps(db: Session, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """laps가 비어 있는 기존 활동의 랩 목록을 경량 TCX에서 한 번 계산해 저장한다.
+
+    Returns:
+        채워진 활동 수
+    """
+    filled = 0
+    last_id = 0
+    while True:
+        batch = (
+            db.query(models.Activity)
+            .options(undefer(models.Activity.tcx_blob))
+            .filter(
+                models.Activity.id > last_id,
+                models.Activity.laps.is_(None),
+                models.Activity.tcx_data.isnot(None),
+            )
+            .order_by(models.Activity.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+
+        for activity in batch:
+            try:
+                activity.laps = tcx_parser.parse_laps_from_tcx(activity.tcx_data)
+                filled += 1
+            except Exception:
+                # 손상된 TCX는 상세 조회 시 재파싱 경로에 맡긴다
+                logger.exception("Activity %d 랩 백필 실패", activity.id)
+        last_id = batch[-1].id
+        db.commit()
+        db.expunge_all()
+
+    if filled:
+        logger.info("Backfill: %d개 활동의 랩 데이터를 저장했습니다", filled)
+    return filled
+
+
+def _matching_series(activity: models.Activity, ingested: tcx_parser.TcxIngestResult) -> dict | None:
+    """여러 활동이 담긴 TCX는 모든 활동에 같은 경량 TCX가 저장되므로 시작 시각으로 고른다."""
+    if len(ingested.series) == 1:
+        return ingested.series[0]
+    for data, series in zip(ingested.activities, ingested.series):
+        if data["start_time"].replace(tzinfo=None) == activity.start_time:
+            return series
+    return None
+
+
+def backfill_activity_series(db: Session, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """시계열 행이 없는 기존 활동의 series를 경량 TCX에서 만든다.
+
+    경량 TCX의 Trackpoint는 이미 1분 간격이라 다시 샘플링해도 모두 유지된다.
+    위경도는 경량화 때 제거되었으므로 NULL로 남는다.
+
+    Returns:
+        채워진 활동 수
+    """
+    filled = 0
+    last_id = 0
+    while True:
+        batch = (
+            db.query(models.Activity)
+            .options(undefer(models.Activity.tcx_blob))
+            .outerjoin(models.ActivitySeries)
+            .filter(
+                models.Activity.id > last_id,
+                models.ActivitySeries.activity_id.is_(None),
+                models.Activity.tcx_data.isnot(None),
+            )
+            .order_by(models.Activity.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+
+        for activity in batch:
+            try:
+                ingested = tcx_parser.ingest_tcx(activity.tcx_data.encode("utf-8"))
+            except Exception:
+                logger.exception("Activity %d 시계열 백필 실패", activity.id)
+                continue
+            series = _matching_series(activity, ingested)
+            if series is not None:
+                activity.series = activity_series.pack_series(series)
+                filled += 1
+        last_id = batch[-1].id
+        db.commit()
+        db.expunge_all()
+
+    if filled:
+        logger.info("Backfill: %d개 활동의 시계열을 저장했습니다", filled)
+    return filled
+
+
+def backfill_training_rollups(db: Session) -> int:
+    """활동은 있지만 집계 행이 하나도 없는 사용자의 training_rollups를 재구축한다.
+
+    Returns:
+        재구축한 사용자 수
+    """
+    user_ids = [
+        row.user_id
+        for row in (
+            db.query(models.Activity.user_id)
+            .outerjoin(models.TrainingRollup, models.TrainingRollup.user_id == models.Activity.user_id)
+            .filter(models.TrainingRollup.user_id.is_(None))
+            .distinct()
+            .order_by(models.Activity.user_id)
+        )
+    ]
+    if user_ids:
+        rollups.rebuild_all(db, user_ids)
+        logger.info("Backfill: %d명의 훈련 집계를 재구축했습니다", len(user_ids))
+    return len(user_ids)
+
+
+# 이름 -> 작업. 명령행에서 이름을 주지 않으면 이 순서대로 모두 실행한다
+BACKFILLS = {
+    "compress_legacy_tcx": compress_legacy_tcx,
+    "laps": backfill_activity_laps,
+    "series": backfill_activity_series,
+    "rollups": backfill_training_rollups,
+}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="스키마 변경 후 기존 행 백필")
+    parser.add_argument("names", nargs="*", metavar="name",
+                        help=f"실행할 작업 ({', '.join(BACKFILLS)}; 기본: 전부)")
+    args = parser.parse_args(argv)
+    unknown = set(args.names) - set(BACKFILLS)
+    if unknown:
+        parser.error(f"알 수 없는 작업: {', '.join(sorted(unknown))}")
+
+    logging.basicConfig(level=logging.INFO)
+    with SessionLocal() as db:
+        for name, backfill in BACKFILLS.items():
+            if args.names and name not in args.names:
+                continue
+            count = backfill(db)
+            logger.info("Backfill %s: %d건 완료", name, count)
+            if name == "rollups" and count:
+                rollups.warn_if_cache_not_shared()
+
+
+if __name__ == "__main__":
+    main()
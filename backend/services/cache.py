@@ -0,0 +1,192 @@
+"""응답 캐시 — 프로세스 내 TTL LRU 기본, 멀티 워커용 공유 백엔드 교체 가능.
+
+CACHE_URL이 비어 있으면 워커 프로세스마다 MemoryBackend를 쓴다. 여러 uvicorn
+워커가 같은 캐시를 봐야 하면 CACHE_URL=redis://... 로 RedisBackend를 사용한다
+(redis 패키지는 이 경우에만 필요 — pyproject의 redis extra, Docker 이미지에는 기본 포함).
+
+LocalCache는 직렬화 없이 파이썬 객체를 그대로 보관하는 프로세스 전용 캐시다
+(인증 사용자 스냅샷 등 워커 간 공유가 필요 없는 짧은 TTL 항목용).
+
+사용자별 캐시는 세대(generation) 키로 무효화한다. invalidate(user_id)는 세대
+카운터만 올리므로, 키 조합(연/월 등)이 몇 개든 이전 항목은 다시 읽히지 않고
+TTL/LRU로 자연히 정리된다.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Protocol
+
+CACHE_URL = os.getenv("CACHE_URL", "")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+DASHBOARD_CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", "300"))  # seconds
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> str | None: ...
+
+    def set(self, key: str, value: str, ttl: int) -> None: ...
+
+    def counter(self, key: str) -> int: ...
+
+    def incr(self, key: str) -> int: ...
+
+
+class MemoryBackend:
+    """스레드 안전한 TTL + LRU 캐시 (단일 프로세스용)."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        # 세대 카운터는 LRU로 밀려나면 이전 세대가 되살아나므로 따로 보관한다
+        self._counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def counter(self, key: str) -> int:
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            value = self._counters.get(key, 0) + 1
+            self._counters[key] = value
+            return value
+
+
+class LocalCache:
+    """프로세스 내 TTL + LRU 객체 캐시 — 무효화 중 계산된 값은 저장하지 않는다.
+
+    version(key)을 값을 계산하기 전에 읽고 set()에 넘긴다. 그 사이 invalidate(key)가
+    호출되었으면 set()은 무시되므로, 갱신 직전에 읽은 값이 TTL 동안 남지 않는다.
+    """
+
+    def __init__(self, ttl: int, max_entries: int):
+        self.ttl = ttl
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self._versions: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def version(self, key: str) -> int:
+        with self._lock:
+            return self._versions.get(key, 0)
+
+    def get(self, key: str) -> object | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: object, version: int) -> None:
+        with self._lock:
+            if self._versions.get(key, 0) != version:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._versions[key] = self._versions.get(key, 0) + 1
+
+
+class RedisBackend:
+    """여러 워커가 공유하는 Redis 백엔드."""
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_URL에 redis를 쓰려면 redis extra가 필요합니다 (uv sync --extra redis)") from e
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+
+    def get(self, key: str) -> str | None:
+        return self._client.get(key)
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        self._client.set(key, value, ex=ttl)
+
+    def counter(self, key: str) -> int:
+        return int(self._client.get(key) or 0)
+
+    def incr(self, key: str) -> int:
+        return self._client.incr(key)
+
+
+def is_shared() -> bool:
+    """다른 프로세스(다른 워커, 관리 명령)와 같은 캐시를 보는지."""
+    return CACHE_URL.startswith(("redis://", "rediss://"))
+
+
+def _create_backend() -> CacheBackend:
+    if is_shared():
+        return RedisBackend(CACHE_URL)
+    return MemoryBackend()
+
+
+_backend: CacheBackend | None = None
+
+
+def get_backend() -> CacheBackend:
+    global _backend
+    if _backend is None:
+        _backend = _create_backend()
+    return _backend
+
+
+class UserScopedCache:
+    """사용자별 세대 키로 무효화하는 캐시 네임스페이스.
+
+    make_key()는 현재 세대를 키에 고정하므로, 값을 계산하기 전에(DB를 읽기 전에)
+    먼저 호출해야 한다. 계산 도중 invalidate()가 일어나면 그 결과는 이전 세대
+    키로 저장되어 다시 읽히지 않는다.
+    """
+
+    def __init__(self, namespace: str, ttl: int):
+        self.namespace = namespace
+        self.ttl = ttl
+
+    def make_key(self, user_id: int, key: str) -> str:
+        generation = get_backend().counter(f"{self.namespace}:gen:{user_id}")
+        return f"{self.namespace}:{user_id}:{generation}:{key}"
+
+    def get(self, cache_key: str) -> str | None:
+        return get_backend().get(cache_key)
+
+    def set(self, cache_key: str, value: str) -> None:
+        get_backend().set(cache_key, value, self.ttl)
+
+    def invalidate(self, user_id: int) -> None:
+        """쓰기 커밋 후 호출 — 해당 사용자의 모든 캐시 항목을 무효화한다."""
+        get_backend().incr(f"{self.namespace}:gen:{user_id}")
+
+
+dashboard_cache = UserScopedCache("dashboard", ttl=DASHBOARD_CACHE_TTL)
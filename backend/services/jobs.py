@@ -0,0 +1,312 @@
+"""LLM 작업 큐 (llm_jobs) — 웹 워커 대신 별도 워커 프로세스(worker.py)가 처리한다.
+
+웹 요청은 enqueue()로 활동/계획 행과 같은 트랜잭션에 작업을 쌓으므로, 커밋된
+요청은 재시작해도 작업을 잃지 않는다. 워커는 claim()으로 SELECT ... FOR UPDATE
+SKIP LOCKED 하여 여러 프로세스가 겹치지 않게 작업을 나눠 가져가고, 동시 실행
+수는 LLM_WORKER_CONCURRENCY로 제한한다. 실패하면 지수 백오프로 재시도하고,
+processing 상태로 멈춘 작업(워커 강제 종료 등)은 reap_stale()이 다시 큐에 넣는다.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session
+
+import models
+from database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+LLM_WORKER_CONCURRENCY = int(os.getenv("LLM_WORKER_CONCURRENCY", "2"))
+LLM_WORKER_POLL_SECONDS = float(os.getenv("LLM_WORKER_POLL_SECONDS", "2"))
+LLM_JOB_MAX_ATTEMPTS = int(os.getenv("LLM_JOB_MAX_ATTEMPTS", "3"))
+LLM_JOB_RETRY_BASE_SECONDS = int(os.getenv("LLM_JOB_RETRY_BASE_SECONDS", "30"))
+LLM_JOB_RETRY_MAX_SECONDS = int(os.getenv("LLM_JOB_RETRY_MAX_SECONDS", "900"))
+LLM_JOB_STALE_SECONDS = int(os.getenv("LLM_JOB_STALE_SECONDS", "600"))  # LLM 호출 최대 시간보다 길게
+# DB 오류(재시작, 스키마 생성 전 등) 뒤 다시 시도하기까지의 대기 — 연속 실패마다 두 배
+LLM_WORKER_ERROR_BACKOFF_SECONDS = float(os.getenv("LLM_WORKER_ERROR_BACKOFF_SECONDS", "5"))
+LLM_WORKER_ERROR_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_WORKER_ERROR_BACKOFF_MAX_SECONDS", "60"))
+
+_ACTIVE = (models.LLMJobStatus.queued, models.LLMJobStatus.processing)
+
+# 작업 종류 -> (대상 모델, 상태 컬럼)
+_TARGETS = {
+    models.LLMJobKind.evaluate_activity: (models.Activity, "llm_evaluation_status"),
+    models.LLMJobKind.generate_plan: (models.Plan, "generation_status"),
+}
+
+
+def _handlers() -> dict:
+    # LangGraph 그래프는 import 시 컴파일되므로 실제로 실행할 때만 불러온다
+    from services.llm.graph import evaluate_activity
+    from services.llm.plan_graph import generate_plan
+
+    return {
+        models.LLMJobKind.evaluate_activity: evaluate_activity,
+        models.LLMJobKind.generate_plan: generate_plan,
+    }
+
+
+def enqueue(
+    db: Session, kind: models.LLMJobKind, target_id: int, bypass_cache: bool = False,
+) -> models.LLMJob:
+    """작업을 추가한다. 커밋은 호출한 쪽 트랜잭션에 맡긴다.
+
+    같은 대상에 queued/processing 작업이 이미 있으면 새로 만들지 않고 그 작업을
+    돌려준다 (queued면 bypass_cache 요청만 반영한다).
+    """
+    model, _ = _TARGETS[kind]
+    # 대상 행을 잠가 같은 대상에 대한 동시 요청이 차례로 확인하게 한다 — 잠금 읽기라
+    # 다른 트랜잭션이 방금 커밋한 작업도 보인다
+    db.execute(select(model.id).where(model.id == target_id).with_for_update())
+    active = db.execute(
+        select(models.LLMJob)
+        .where(
+            models.LLMJob.kind == kind,
+            models.LLMJob.target_id == target_id,
+            models.LLMJob.status.in_(_ACTIVE),
+        )
+        .with_for_update()
+    ).scalars().first()
+    if active is not None:
+        if bypass_cache and active.status == models.LLMJobStatus.queued:
+            active.bypass_cache = True
+        logger.info("LLM job %d (%s %d) 이미 대기/실행 중, 새로 추가하지 않음", active.id, kind.value, target_id)
+        return active
+
+    now = datetime.utcnow()
+    job = models.LLMJob(
+        kind=kind,
+        target_id=target_id,
+        status=models.LLMJobStatus.queued,
+        attempts=0,
+        run_after=now,
+        bypass_cache=bypass_cache,
+        created_at=now,
+    )
+    db.add(job)
+    return job
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """attempts번째 시도가 실패한 뒤 다음 시도까지의 대기 시간."""
+    seconds = LLM_JOB_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(seconds, LLM_JOB_RETRY_MAX_SECONDS))
+
+
+def claimable_query(limit: int):
+    """지금 실행할 수 있는 작업 — 다른 워커가 잠근 행은 건너뛴다."""
+    return (
+        select(models.LLMJob)
+        .where(
+            models.LLMJob.status == models.LLMJobStatus.queued,
+            models.LLMJob.run_after <= datetime.utcnow(),
+        )
+        .order_by(models.LLMJob.run_after, models.LLMJob.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+
+
+def claim(db: Session, worker_id: str, limit: int) -> list[int]:
+    """최대 limit개의 작업을 processing으로 바꾸고 id 목록을 돌려준다."""
+    jobs = db.execute(claimable_query(limit)).scalars().all()
+    now = datetime.utcnow()
+    for job in jobs:
+        job.status = models.LLMJobStatus.processing
+        job.attempts += 1
+        job.locked_at = now
+        job.locked_by = worker_id
+    db.commit()
+    return [job.id for job in jobs]
+
+
+def _set_target_status(
+    db: Session, kind: models.LLMJobKind, target_id: int, status: models.LLMEvaluationStatus,
+) -> None:
+    model, column = _TARGETS[kind]
+    target = db.get(model, target_id)
+    if target is not None:
+        setattr(target, column, status)
+
+
+def _finish(db: Session, job: models.LLMJob, ok: bool, error: str | None) -> None:
+    now = datetime.utcnow()
+    job.locked_at = None
+    job.locked_by = None
+    if ok:
+        job.status = models.LLMJobStatus.completed
+        job.last_error = None
+        job.finished_at = now
+    elif job.attempts < LLM_JOB_MAX_ATTEMPTS:
+        job.status = models.LLMJobStatus.queued
+        job.run_after = now + retry_delay(job.attempts)
+        job.last_error = (error or "")[:500]
+    else:
+        job.status = models.LLMJobStatus.failed
+        job.last_error = (error or "")[:500]
+        job.finished_at = now
+        _set_target_status(db, job.kind, job.target_id, models.LLMEvaluationStatus.failed)
+
+
+def run_job(job_id: int) -> None:
+    """claim한 작업 하나를 실행하고 결과(완료/재시도/실패)를 기록한다."""
+    with SessionLocal() as db:
+        job = db.get(models.LLMJob, job_id)
+        if job is None or job.status != models.LLMJobStatus.processing:
+            return
+        kind, target_id, attempts = job.kind, job.target_id, job.attempts
+        bypass_cache = job.bypass_cache
+
+    final_attempt = attempts >= LLM_JOB_MAX_ATTEMPTS
+    error = None
+    try:
+        ok = _handlers()[kind](target_id, final_attempt=final_attempt, bypass_cache=bypass_cache)
+        if not ok:
+            error = f"{kind.value} failed (attempt {attempts})"
+    except Exception as e:
+        logger.exception("LLM job %d (%s %d) 실행 실패", job_id, kind.value, target_id)
+        ok, error = False, f"{type(e).__name__}: {e}"
+
+    with SessionLocal() as db:
+        job = db.get(models.LLMJob, job_id)
+        # reaper가 그 사이 다시 큐에 넣었거나 다른 워커가 가져갔으면 결과를 덮어쓰지 않는다
+        if job is None or job.status != models.LLMJobStatus.processing or job.attempts != attempts:
+            return
+        _finish(db, job, ok, error)
+        status = job.status
+        db.commit()
+    logger.info("LLM job %d (%s %d): %s", job_id, kind.value, target_id, status.value)
+
+
+def reap_stale(db: Session, stale_after: int = LLM_JOB_STALE_SECONDS) -> int:
+    """locked_at이 stale_after초보다 오래된 processing 작업을 재시도하거나 실패 처리한다."""
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_after)
+    jobs = db.execute(
+        select(models.LLMJob)
+        .where(
+            models.LLMJob.status == models.LLMJobStatus.processing,
+            models.LLMJob.locked_at < cutoff,
+        )
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    for job in jobs:
+        logger.warning("LLM job %d: %s 워커에서 응답 없음, 재처리", job.id, job.locked_by)
+        _finish(db, job, ok=False, error=f"stale: no result from {job.locked_by}")
+        if job.status == models.LLMJobStatus.queued:
+            job.run_after = datetime.utcnow()
+            _set_target_status(db, job.kind, job.target_id, models.LLMEvaluationStatus.pending)
+    db.commit()
+    return len(jobs)
+
+
+def orphans_query(kind: models.LLMJobKind):
+    """pending/processing인데 살아 있는 작업이 없는 대상.
+
+    여러 워커가 동시에 시작해도 같은 대상을 두 번 넣지 않도록 대상 행을 잠그고,
+    다른 워커가 잠근 행은 건너뛴다.
+    """
+    model, column = _TARGETS[kind]
+    return (
+        select(model)
+        .outerjoin(models.LLMJob, and_(
+            models.LLMJob.kind == kind,
+            models.LLMJob.target_id == model.id,
+            models.LLMJob.status.in_(_ACTIVE),
+        ))
+        .where(
+            getattr(model, column).in_((models.LLMEvaluationStatus.pending, models.LLMEvaluationStatus.processing)),
+            models.LLMJob.id.is_(None),
+        )
+        .with_for_update(skip_locked=True)
+    )
+
+
+def requeue_orphans(db: Session) -> int:
+    """pending/processing인데 살아 있는 작업이 없는 대상(큐 도입 전 행 등)에 작업을 만든다."""
+    count = 0
+    for kind, (_, column) in _TARGETS.items():
+        orphans = db.execute(orphans_query(kind)).scalars().all()
+        for target in orphans:
+            setattr(target, column, models.LLMEvaluationStatus.pending)
+            enqueue(db, kind, target.id)
+        count += len(orphans)
+    db.commit()
+    return count
+
+
+def _error_backoff(failures: int) -> float:
+    return min(LLM_WORKER_ERROR_BACKOFF_SECONDS * 2 ** (failures - 1), LLM_WORKER_ERROR_BACKOFF_MAX_SECONDS)
+
+
+def _requeue_orphans_until_ready(stop: threading.Event) -> None:
+    """DB가 준비될 때까지(웹 서버가 아직 테이블을 만들기 전 등) 재시도한다."""
+    failures = 0
+    while not stop.is_set():
+        try:
+            with SessionLocal() as db:
+                orphans = requeue_orphans(db)
+        except Exception:
+            failures += 1
+            delay = _error_backoff(failures)
+            logger.exception("LLM worker: 큐 초기화 실패, %.0f초 후 재시도", delay)
+            stop.wait(delay)
+            continue
+        if orphans:
+            logger.info("LLM worker: 작업이 없던 대상 %d개를 큐에 추가", orphans)
+        return
+
+
+def _log_failed(done: set[Future]) -> None:
+    for future in done:
+        if future.exception() is not None:
+            logger.error("LLM job 결과 기록 실패", exc_info=future.exception())
+
+
+def run_worker(worker_id: str, stop: threading.Event, concurrency: int = LLM_WORKER_CONCURRENCY) -> None:
+    """stop이 설정될 때까지 작업을 가져와 최대 concurrency개씩 동시에 실행한다.
+
+    DB 오류는 로그만 남기고 백오프 후 다시 시도한다 — 워커 프로세스는 죽지 않는다.
+    """
+    _requeue_orphans_until_ready(stop)
+
+    running: set[Future] = set()
+    next_reap = 0.0
+    failures = 0
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="llm-job") as executor:
+        while not stop.is_set():
+            claimed: list[int] = []
+            try:
+                if time.monotonic() >= next_reap:
+                    with SessionLocal() as db:
+                        reap_stale(db)
+                    next_reap = time.monotonic() + LLM_JOB_STALE_SECONDS / 4
+
+                free = concurrency - len(running)
+                if free > 0:
+                    with SessionLocal() as db:
+                        claimed = claim(db, worker_id, free)
+            except Exception:
+                failures += 1
+                delay = _error_backoff(failures)
+                logger.exception("LLM worker: DB 오류, %.0f초 후 재시도", delay)
+                stop.wait(delay)
+                continue
+            failures = 0
+
+            for job_id in claimed:
+                running.add(executor.submit(run_job, job_id))
+
+            if running and not claimed:
+                wait(running, timeout=LLM_WORKER_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            elif not claimed:
+                stop.wait(LLM_WORKER_POLL_SECONDS)
+            done = {f for f in running if f.done()}
+            _log_failed(done)
+            running -= done
+        logger.info("LLM worker: 종료 중, 실행 중인 작업 %d개 대기", len(running))
@@ -0,0 +1,68 @@
+"""LLM 응답 캐시 — 렌더링된 프롬프트의 해시로 찾는다 (content-addressed).
+
+키는 sha256(tier, 모델명, 프롬프트)라서 프롬프트에 들어가는 데이터(활동 수치,
+최근 활동, 계획 세션, 날짜 등)가 하나라도 바뀌면 자연히 새 키가 된다. 따로
+무효화할 필요가 없고, 같은 입력으로 다시 평가하면 토큰 없이 바로 끝난다.
+
+CACHE_URL이 Redis면 워커 프로세스들이 services.cache의 공유 백엔드를 쓰고,
+아니면 프로세스마다 LLM_CACHE_MAX_ENTRIES 크기의 LRU를 따로 둔다. Redis에서는
+항목 수 제한 대신 TTL만 걸리므로 서버에 maxmemory와 maxmemory-policy
+volatile-lru를 설정해야 한다 (TTL 없는 대시보드 세대 카운터는 밀려나지 않는다).
+
+응답은 호출한 쪽이 파싱/검증에 성공한 뒤에만 저장해야 한다 — 깨진 응답을
+저장하면 같은 입력이 TTL 동안 계속 같은 결과를 받는다.
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+from services import cache
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000"))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+
+_backend: cache.CacheBackend | None = None
+
+
+def get_backend() -> cache.CacheBackend:
+    global _backend
+    if _backend is None:
+        if cache.is_shared():
+            _backend = cache.get_backend()
+        else:
+            _backend = cache.MemoryBackend(max_entries=LLM_CACHE_MAX_ENTRIES)
+    return _backend
+
+
+def make_key(tier: str, model_name: str, prompt: str) -> str:
+    digest = hashlib.sha256(f"{tier}\0{model_name}\0{prompt}".encode()).hexdigest()
+    return f"llm:{digest}"
+
+
+def store(key: str, content) -> None:
+    # Claude는 content를 블록 list로 줄 수 있어 JSON으로 저장한다
+    get_backend().set(key, json.dumps(content, ensure_ascii=False), LLM_CACHE_TTL)
+
+
+def invoke(llm, tier: str, model_name: str, prompt: str, config: dict,
+           bypass: bool = False, store_result: bool = True):
+    """llm.invoke(prompt)의 content를 캐시를 거쳐 돌려준다.
+
+    bypass=True면 캐시를 읽지 않고 새로 호출한다 (사용자가 새 결과를 요청한 경우).
+    store_result=False면 저장하지 않는다 — 응답을 파싱한 뒤 store()로 직접 저장한다.
+    """
+    key = make_key(tier, model_name, prompt)
+    if not bypass:
+        cached = get_backend().get(key)
+        if cached is not None:
+            logger.info("LLM 캐시 적중 (%s)", key[:16])
+            return json.loads(cached)
+
+    content = llm.invoke(prompt, config=config).content
+    if store_result and content:
+        store(key, content)
+    return content
@@ -1,12 +1,12 @@
 import logging
-import os
 from typing import TypedDict
 
 from langgraph.graph import StateGraph, END
 
 from database import SessionLocal
 import models
-from services.llm.models import get_llm
+from services.llm import cache as llm_cache
+from services.llm.models import get_callbacks, get_llm, model_name_for
 from services.llm.prompts import load_prompt
 
 logger = logging.getLogger(__name__)
@@ -16,6 +16,7 @@ class EvalState(TypedDict):
     activity_id: int
     user_id: int
     prompt: str
+    bypass_cache: bool
     result: str
 
 
@@ -96,18 +97,15 @@ def _build_prompt(
 
 def _evaluate_node(state: EvalState) -> dict:
     """LLM을 호출하여 러닝 평가를 수행한다."""
-    llm = get_llm("low")
-
-    callbacks = []
-    if os.getenv("LANGFUSE_PUBLIC_KEY"):
-        try:
-            from langfuse.langchain import CallbackHandler as LangfuseCallbackHandler
-            callbacks.append(LangfuseCallbackHandler())
-        except Exception as e:
-            logger.warning("Langfuse 콜백 초기화 실패, 추적 없이 진행: %s", e)
-
-    result = llm.invoke(state["prompt"], config={"callbacks": callbacks})
-    return {"result": result.content[:400]}
+    content = llm_cache.invoke(
+        get_llm("low"), "low", model_name_for("low"), state["prompt"],
+        config={"callbacks": get_callbacks()}, bypass=state["bypass_cache"], store_result=False,
+    )
+    if not isinstance(content, str) or not content.strip():
+        raise ValueError(f"평가 응답 형식 비정상: {type(content).__name__}")
+    # 평가로 쓸 수 있는 응답만 캐시한다
+    llm_cache.store(llm_cache.make_key("low", model_name_for("low"), state["prompt"]), content)
+    return {"result": content[:400]}
 
 
 def _build_graph():
@@ -122,10 +120,17 @@ def _build_graph():
 _graph = _build_graph()
 
 
-def evaluate_activity(activity_id: int) -> None:
-    """BackgroundTasks에서 호출되는 LLM 평가 진입점.
+def evaluate_activity(activity_id: int, final_attempt: bool = True, bypass_cache: bool = False) -> bool:
+    """LLM 평가 진입점 — LLM 작업 워커(services/jobs)에서 호출된다.
+
+    별도 DB 세션을 생성하여 워커 스레드에서 안전하게 동작한다.
+
+    Args:
+        final_attempt: False면 실패 시 상태를 failed 대신 pending으로 되돌린다 (재시도 예정)
+        bypass_cache: True면 같은 프롬프트의 캐시된 응답이 있어도 LLM을 다시 호출한다
 
-    별도 DB 세션을 생성하여 비동기 컨텍스트에서 안전하게 동작한다.
+    Returns:
+        평가에 실패했으면 False (대상 활동이 없으면 할 일이 없으므로 True)
     """
     db = SessionLocal()
     try:
@@ -134,7 +139,7 @@ def evaluate_activity(activity_id: int) -> None:
         ).first()
         if not activity:
             logger.error("Activity %d not found for evaluation", activity_id)
-            return
+            return True
 
         # 상태를 processing으로 업데이트
         activity.llm_evaluation_status = models.LLMEvaluationStatus.processing
@@ -171,6 +176,7 @@ def evaluate_activity(activity_id: int) -> None:
             "activity_id": activity_id,
             "user_id": activity.user_id,
             "prompt": prompt,
+            "bypass_cache": bypass_cache,
             "result": "",
         })
 
@@ -179,6 +185,7 @@ def evaluate_activity(activity_id: int) -> None:
         db.commit()
 
         logger.info("Activity %d 평가 완료", activity_id)
+        return True
 
     except Exception:
         logger.exception("Activity %d 평가 실패", activity_id)
@@ -187,9 +194,13 @@ def evaluate_activity(activity_id: int) -> None:
                 models.Activity.id == activity_id
             ).first()
             if activity:
-                activity.llm_evaluation_status = models.LLMEvaluationStatus.failed
+                activity.llm_evaluation_status = (
+                    models.LLMEvaluationStatus.failed if final_attempt
+                    else models.LLMEvaluationStatus.pending
+                )
                 db.commit()
         except Exception:
             logger.exception("평가 실패 상태 업데이트 실패")
+        return False
     finally:
         db.close()
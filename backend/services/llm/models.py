@@ -1,19 +1,102 @@
+"""LLM 클라이언트 레지스트리.
+
+ChatAnthropic/ChatOpenAI 인스턴스는 (tier, model, max_tokens)별로 프로세스에
+하나만 만들어 재사용한다. 인스턴스 생성(설정 검증, SDK 클라이언트 구성)과
+Langfuse 콜백 핸들러 생성은 호출마다 반복할 필요가 없다. 프로세스 종료 시
+shutdown()으로 레지스트리가 소유한 HTTP 커넥션 풀을 닫고 Langfuse 버퍼를 비운다.
+"""
+
+import logging
 import os
+import threading
 
+import openai
 from langchain_anthropic import ChatAnthropic
 from langchain_openai import ChatOpenAI
 
+logger = logging.getLogger(__name__)
 
 LLM_HIGH_MODEL = os.getenv("LLM_HIGH_MODEL", "claude-haiku-4-5-20251001")
 LLM_LOW_MODEL = os.getenv("LLM_LOW_MODEL", "claude-haiku-4-5-20251001")
 
+_lock = threading.Lock()
+_clients: dict[tuple[str, str, int], ChatAnthropic | ChatOpenAI] = {}
+_callbacks: list | None = None
+
+
+def _create_llm(model_name: str, max_tokens: int):
+    if model_name.startswith("gpt"):
+        # 기본 커넥션 풀은 langchain-openai가 프로세스 전역으로 캐시해 다른 인스턴스와
+        # 공유하므로, shutdown()에서 닫을 수 있도록 인스턴스 전용 풀을 넘긴다
+        return ChatOpenAI(model=model_name, max_tokens=max_tokens, http_client=openai.DefaultHttpxClient())
+    return ChatAnthropic(model=model_name, max_tokens=max_tokens)
+
+
+def model_name_for(tier: str) -> str:
+    return LLM_HIGH_MODEL if tier == "high" else LLM_LOW_MODEL
+
 
 def get_llm(tier: str = "low", max_tokens: int | None = None):
-    """tier에 따라 LLM 인스턴스를 반환한다."""
-    model_name = LLM_HIGH_MODEL if tier == "high" else LLM_LOW_MODEL
+    """tier에 따라 LLM 인스턴스를 반환한다 (같은 설정이면 같은 인스턴스)."""
+    model_name = model_name_for(tier)
     tokens = max_tokens or (2048 if tier == "high" else 500)
+    key = (tier, model_name, tokens)
 
-    if model_name.startswith("gpt"):
-        return ChatOpenAI(model=model_name, max_tokens=tokens)
+    llm = _clients.get(key)
+    if llm is None:
+        with _lock:
+            llm = _clients.get(key)
+            if llm is None:
+                llm = _clients[key] = _create_llm(model_name, tokens)
+    return llm
+
+
+def _create_callbacks() -> list:
+    if not os.getenv("LANGFUSE_PUBLIC_KEY"):
+        return []
+    try:
+        from langfuse.langchain import CallbackHandler as LangfuseCallbackHandler
+        return [LangfuseCallbackHandler()]
+    except Exception as e:
+        logger.warning("Langfuse 콜백 초기화 실패, 추적 없이 진행: %s", e)
+        return []
+
+
+def get_callbacks() -> list:
+    """LLM 호출 config에 넘길 콜백 목록 — Langfuse가 설정돼 있으면 공유 핸들러."""
+    global _callbacks
+    if _callbacks is None:
+        with _lock:
+            if _callbacks is None:
+                _callbacks = _create_callbacks()
+    return list(_callbacks)
+
+
+def _close_http(llm) -> None:
+    # ChatOpenAI는 _create_llm이 넘긴 전용 풀을 공개 root_client로 닫는다. ChatAnthropic은
+    # 풀을 넘기거나 닫는 공개 API가 없고 langchain-anthropic이 프로세스 전역으로 캐시해
+    # 공유하므로 닫지 않는다 (닫으면 이후 만든 인스턴스도 못 쓴다 — 종료 시 스스로 닫힌다)
+    if isinstance(llm, ChatOpenAI) and llm.root_client is not None:
+        llm.root_client.close()
+
+
+def shutdown() -> None:
+    """레지스트리를 비우고 HTTP 풀을 닫고 Langfuse 버퍼를 전송한다 (프로세스 종료 시)."""
+    global _callbacks
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+        had_callbacks, _callbacks = bool(_callbacks), None
+
+    for llm in clients:
+        try:
+            _close_http(llm)
+        except Exception:
+            logger.exception("LLM 클라이언트 종료 실패")
 
-    return ChatAnthropic(model=model_name, max_tokens=tokens)
+    if had_callbacks:
+        try:
+            from langfuse import get_client
+            get_client().shutdown()
+        except Exception:
+            logger.exception("Langfuse 종료 실패")
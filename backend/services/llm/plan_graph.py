@@ -1,6 +1,5 @@
 import json
 import logging
-import os
 from datetime import date, datetime, timedelta
 from typing import TypedDict
 
@@ -8,7 +7,8 @@ from langgraph.graph import StateGraph, END
 
 from database import SessionLocal
 import models
-from services.llm.models import get_llm
+from services.llm import cache as llm_cache
+from services.llm.models import get_callbacks, get_llm, model_name_for
 from services.llm.prompts import load_prompt
 
 logger = logging.getLogger(__name__)
@@ -18,6 +18,7 @@ class PlanState(TypedDict):
     plan_id: int
     user_id: int
     prompt: str
+    bypass_cache: bool
     raw_response: str
     plan_text: str
     sessions: list
@@ -95,18 +96,11 @@ def _build_plan_prompt(
 
 
 def _call_llm_node(state: PlanState) -> dict:
-    llm = get_llm("high")
-
-    callbacks = []
-    if os.getenv("LANGFUSE_PUBLIC_KEY"):
-        try:
-            from langfuse.langchain import CallbackHandler as LangfuseCallbackHandler
-            callbacks.append(LangfuseCallbackHandler())
-        except Exception as e:
-            logger.warning("Langfuse 콜백 초기화 실패: %s", e)
-
-    result = llm.invoke(state["prompt"], config={"callbacks": callbacks})
-    content = result.content
+    # 세션 파싱에 성공한 응답만 _cache_response_node가 저장한다
+    content = llm_cache.invoke(
+        get_llm("high"), "high", model_name_for("high"), state["prompt"],
+        config={"callbacks": get_callbacks()}, bypass=state["bypass_cache"], store_result=False,
+    )
     logger.info("LLM 응답 type=%s, len=%s", type(content).__name__, len(content) if isinstance(content, str) else "N/A")
     logger.info("LLM 응답 처음 500자: %s", content[:500] if isinstance(content, str) else repr(content)[:500])
     return {"raw_response": content}
@@ -192,27 +186,45 @@ def _parse_response_node(state: PlanState) -> dict:
     return {"plan_text": plan_text, "sessions": validated}
 
 
+def _cache_response_node(state: PlanState) -> dict:
+    if state["sessions"]:
+        llm_cache.store(llm_cache.make_key("high", model_name_for("high"), state["prompt"]), state["raw_response"])
+    else:
+        logger.warning("Plan %d: 세션이 없는 응답은 캐시하지 않음", state["plan_id"])
+    return {}
+
+
 def _build_graph():
     builder = StateGraph(PlanState)
     builder.add_node("call_llm", _call_llm_node)
     builder.add_node("parse_response", _parse_response_node)
+    builder.add_node("cache_response", _cache_response_node)
     builder.set_entry_point("call_llm")
     builder.add_edge("call_llm", "parse_response")
-    builder.add_edge("parse_response", END)
+    builder.add_edge("parse_response", "cache_response")
+    builder.add_edge("cache_response", END)
     return builder.compile()
 
 
 _graph = _build_graph()
 
 
-def generate_plan(plan_id: int) -> None:
-    """BackgroundTasks에서 호출되는 계획 생성 진입점."""
+def generate_plan(plan_id: int, final_attempt: bool = True, bypass_cache: bool = False) -> bool:
+    """계획 생성 진입점 — LLM 작업 워커(services/jobs)에서 호출된다.
+
+    Args:
+        final_attempt: False면 실패 시 상태를 failed 대신 pending으로 되돌린다 (재시도 예정)
+        bypass_cache: True면 같은 프롬프트의 캐시된 응답이 있어도 LLM을 다시 호출한다
+
+    Returns:
+        생성에 실패했으면 False (대상 계획이 없으면 True)
+    """
     db = SessionLocal()
     try:
         plan = db.query(models.Plan).filter(models.Plan.id == plan_id).first()
         if not plan:
             logger.error("Plan %d not found", plan_id)
-            return
+            return True
 
         plan.generation_status = models.LLMEvaluationStatus.processing
         db.commit()
@@ -244,6 +256,7 @@ def generate_plan(plan_id: int) -> None:
             "plan_id": plan_id,
             "user_id": plan.user_id,
             "prompt": prompt,
+            "bypass_cache": bypass_cache,
             "raw_response": "",
             "plan_text": "",
             "sessions": [],
@@ -274,14 +287,16 @@ def generate_plan(plan_id: int) -> None:
             plan.start_date = date.today()
             plan.end_date = date.today() + timedelta(days=6)
 
-        # PlanSession 생성
+        # PlanSession 생성 — 모두 만든 뒤 추가해야 중간 실패 시 일부만 저장되어
+        # 재시도에서 세션이 중복되지 않는다
+        plan_sessions = []
         for s in sessions:
             try:
                 session_date = date.fromisoformat(s["date"]) if s.get("date") else date.today()
             except (ValueError, TypeError):
                 session_date = date.today()
 
-            db_session = models.PlanSession(
+            plan_sessions.append(models.PlanSession(
                 plan_id=plan_id,
                 date=session_date,
                 session_type=models.SessionType(s["session_type"]),
@@ -289,22 +304,27 @@ def generate_plan(plan_id: int) -> None:
                 description=s.get("description"),
                 target_distance=s.get("target_distance"),
                 target_pace=s.get("target_pace"),
-            )
-            db.add(db_session)
+            ))
+        db.add_all(plan_sessions)
 
         plan.generation_status = models.LLMEvaluationStatus.completed
         db.commit()
 
         logger.info("Plan %d 생성 완료 (%d sessions)", plan_id, len(sessions))
+        return True
 
     except Exception:
         logger.exception("Plan %d 생성 실패", plan_id)
         try:
             plan = db.query(models.Plan).filter(models.Plan.id == plan_id).first()
             if plan:
-                plan.generation_status = models.LLMEvaluationStatus.failed
+                plan.generation_status = (
+                    models.LLMEvaluationStatus.failed if final_attempt
+                    else models.LLMEvaluationStatus.pending
+                )
                 db.commit()
         except Exception:
             logger.exception("계획 실패 상태 업데이트 실패")
+        return False
     finally:
         db.close()
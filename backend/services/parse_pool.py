@@ -0,0 +1,127 @@
+"""TCX 파싱 전용 프로세스 풀.
+
+업로드 라우트는 async이므로 lxml/dateutil 파싱을 이벤트 루프에서 직접 돌리면
+같은 uvicorn 워커의 다른 요청이 모두 멈춘다. 업로드는 크기 제한을 지키며
+임시 파일로 청크 단위 저장하고, 파싱은 별도 프로세스에서 스트리밍으로 수행한다.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import aiofiles.os
+import aiofiles.tempfile
+from lxml import etree
+
+import tcx_parser
+
+logger = logging.getLogger(__name__)
+
+# 0이면 프로세스 풀 없이 기본 스레드 executor에서 파싱한다 (개발/디버깅용)
+TCX_PARSE_WORKERS = int(os.getenv("TCX_PARSE_WORKERS", "2"))
+
+_executor: ProcessPoolExecutor | None = None
+
+_WARMUP_TCX = (
+    b'<TrainingCenterDatabase xmlns="http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2">'
+    b"<Activities/></TrainingCenterDatabase>"
+)
+
+
+def _warmup() -> int:
+    """워커 프로세스에서 모듈 import와 lxml 초기화를 미리 끝낸다."""
+    tcx_parser.ingest_tcx(_WARMUP_TCX)
+    return os.getpid()
+
+
+def _ingest_file(path: str) -> tcx_parser.TcxIngestResult:
+    """워커 프로세스 진입점 — lxml 예외는 pickle되지 않으므로 ValueError로 바꿔 전달한다."""
+    try:
+        return tcx_parser.ingest_tcx_stream(path)
+    except etree.LxmlError as e:
+        raise ValueError(str(e)) from None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # uvicorn 이벤트 루프/스레드 상태를 fork하지 않도록 spawn 사용
+        _executor = ProcessPoolExecutor(
+            max_workers=TCX_PARSE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def _discard_executor(executor: ProcessPoolExecutor) -> None:
+    """고장 난 풀을 정리한다 — 남은 관리 스레드와 워커 프로세스를 기다리지 않고 닫는다."""
+    global _executor
+    if _executor is executor:
+        _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def start_parse_pool() -> None:
+    """앱 시작 시 풀을 만들고 모든 워커를 미리 띄운다 (이벤트 루프를 막지 않고 기다린다)."""
+    if TCX_PARSE_WORKERS <= 0:
+        return
+    executor = _get_executor()
+    futures = [asyncio.wrap_future(executor.submit(_warmup)) for _ in range(TCX_PARSE_WORKERS)]
+    pids = set(await asyncio.gather(*futures))
+    logger.info("TCX parse pool ready (%d workers: %s)", TCX_PARSE_WORKERS, sorted(pids))
+
+
+def shutdown_parse_pool() -> None:
+    """앱 종료 시 워커 프로세스를 정리한다."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+async def _spool_upload(upload, limit: int) -> str:
+    """UploadFile을 청크 단위로 임시 파일에 쓰고 경로를 반환한다.
+
+    누적 크기가 limit을 넘으면 즉시 읽기를 멈추고 TcxTooLargeError를 던진다.
+    """
+    async with aiofiles.tempfile.NamedTemporaryFile("wb", suffix=".tcx", delete=False) as f:
+        path = f.name
+        try:
+            received = 0
+            while chunk := await upload.read(tcx_parser.STREAM_CHUNK_SIZE):
+                received += len(chunk)
+                if received > limit:
+                    raise tcx_parser.TcxTooLargeError(f"TCX file exceeds {limit} bytes")
+                await f.write(chunk)
+        except BaseException:
+            await aiofiles.os.remove(path)
+            raise
+    return path
+
+
+async def parse_tcx_upload(upload, max_size: int | None = None) -> tcx_parser.TcxIngestResult:
+    """업로드된 TCX를 파싱 풀에서 처리하고 결과를 기다린다.
+
+    Raises:
+        TcxTooLargeError: 업로드가 max_size(기본 MAX_TCX_UPLOAD_SIZE)를 넘은 경우
+        ValueError 등: TCX 파싱에 실패한 경우
+    """
+    limit = tcx_parser.MAX_TCX_UPLOAD_SIZE if max_size is None else max_size
+    path = await _spool_upload(upload, limit)
+    loop = asyncio.get_running_loop()
+    try:
+        if TCX_PARSE_WORKERS <= 0:
+            return await loop.run_in_executor(None, _ingest_file, path)
+        executor = _get_executor()
+        try:
+            return await loop.run_in_executor(executor, _ingest_file, path)
+        except BrokenProcessPool:
+            # 워커가 죽으면(OOM 등) 풀을 새로 만들어 다음 요청은 정상 처리되도록 한다
+            logger.exception("TCX parse pool broken; recreating")
+            _discard_executor(executor)
+            raise
+    finally:
+        await aiofiles.os.remove(path)
@@ -0,0 +1,119 @@
+"""비밀번호 해시 전용 스레드 풀 — 로그인/가입 폭주가 다른 요청을 굶기지 않도록.
+
+bcrypt는 일부러 느린 연산이라 AnyIO 기본 스레드 풀(40개)에서 돌리면 로그인이
+몰릴 때 대시보드 같은 동기 라우트가 쓸 스레드가 남지 않는다. 해시/검증은
+PASSWORD_HASH_WORKERS 크기의 별도 풀에서만 실행하고, 실행 중 + 대기 작업이
+PASSWORD_HASH_MAX_PENDING을 넘으면 큐에 쌓지 않고 곧바로 503을 돌려준다.
+bcrypt 구현은 GIL을 놓으므로 스레드만으로 코어 수만큼 병렬 실행된다.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+
+import auth
+
+logger = logging.getLogger(__name__)
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+PASSWORD_HASH_RETRY_AFTER = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", "2"))  # seconds
+
+_executor: ThreadPoolExecutor | None = None
+_lock = threading.Lock()
+_pending = 0
+# 최근 호출의 (작업, 대기 ms, 실행 ms) — timing_stats()로 요약한다
+_timings: deque[tuple[str, float, float]] = deque(maxlen=1000)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash",
+                )
+    return _executor
+
+
+def shutdown_hash_pool() -> None:
+    """앱 종료 시 해시 스레드를 정리한다."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+def _release_slot(_future=None) -> None:
+    global _pending
+    with _lock:
+        _pending -= 1
+
+
+async def _run(op: str, func, *args):
+    global _pending
+    with _lock:
+        if _pending >= PASSWORD_HASH_MAX_PENDING:
+            logger.warning("Password hash pool saturated (%d pending), rejecting %s", _pending, op)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="요청이 많아 잠시 후 다시 시도해 주세요.",
+                headers={"Retry-After": str(PASSWORD_HASH_RETRY_AFTER)},
+            )
+        _pending += 1
+
+    submitted = time.perf_counter()
+
+    def _timed():
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            wait_ms = (started - submitted) * 1000
+            run_ms = (time.perf_counter() - started) * 1000
+            _timings.append((op, wait_ms, run_ms))
+            logger.debug("Password %s: wait %.1f ms, run %.1f ms", op, wait_ms, run_ms)
+
+    # 대기 슬롯은 요청이 아니라 실제 작업이 끝날 때 반납한다 — 클라이언트가 끊겨
+    # 요청이 취소돼도 이미 실행 중인 bcrypt는 끝까지 돌기 때문이다
+    try:
+        future = _get_executor().submit(_timed)
+    except BaseException:
+        _release_slot()
+        raise
+    future.add_done_callback(_release_slot)
+    return await asyncio.wrap_future(future)
+
+
+async def hash_password(password: str) -> str:
+    return await _run("hash", auth.get_password_hash, password)
+
+
+async def verify_password(password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """비밀번호를 검증한다. 해시 설정(BCRYPT_ROUNDS 등)이 바뀌었으면 새 해시도 돌려준다."""
+    return await _run("verify", auth.verify_and_update_password, password, hashed_password)
+
+
+def timing_stats() -> dict[str, dict[str, float]]:
+    """작업별 최근 호출 수와 대기/실행 시간(ms) p50/p95."""
+    stats = {}
+    for op in ("hash", "verify"):
+        waits = sorted(w for o, w, _ in _timings if o == op)
+        runs = sorted(r for o, _, r in _timings if o == op)
+        if not runs:
+            continue
+        stats[op] = {
+            "count": len(runs),
+            "wait_p50_ms": waits[len(waits) // 2],
+            "wait_p95_ms": waits[int(len(waits) * 0.95)],
+            "run_p50_ms": runs[len(runs) // 2],
+            "run_p95_ms": runs[int(len(runs) * 0.95)],
+        }
+    return stats
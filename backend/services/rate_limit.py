@@ -0,0 +1,281 @@
+"""요청 빈도 제한 — 비싼 엔드포인트(bcrypt, SMTP, TCX 파싱, LLM 작업)용 토큰 버킷.
+
+규칙마다 버킷 용량(limit)과 가득 채워지는 시간(window초)을 두고 요청마다 토큰
+하나를 쓴다. 로그인 전 엔드포인트는 클라이언트 IP, 업로드는 액세스 토큰의
+사용자(토큰이 없거나 잘못됐으면 IP)로 버킷을 나눈다. 로그인/비밀번호 재설정은
+IP 버킷과 함께 요청 본문의 계정(username, email, 재설정 토큰)별 버킷도 써서
+여러 IP에서 한 계정을 노리는 시도를 막는다. 한 요청에 맞는 규칙이 여럿이면
+모두 통과해야 한다. 한도는 RATE_LIMIT_<규칙> 환경 변수("횟수/초")로 바꿀 수 있다.
+
+CACHE_URL이 Redis면 워커 프로세스들이 버킷을 공유하고(Lua 스크립트로 원자적으로
+갱신), 아니면 워커 프로세스마다 메모리 버킷을 따로 둔다.
+"""
+
+import hashlib
+import ipaddress
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Protocol
+from urllib.parse import parse_qs
+
+from jose import JWTError, jwt
+
+import auth
+from services import cache
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+# 이 대역에서 온 요청은 리버스 프록시(nginx)로 보고 X-Real-IP를 클라이언트 IP로 쓴다
+RATE_LIMIT_TRUSTED_PROXIES = [
+    ipaddress.ip_network(net.strip())
+    for net in os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "").split(",")
+    if net.strip()
+]
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str  # 버킷 이름 — 같은 이름의 규칙은 버킷을 공유한다
+    method: str
+    path: re.Pattern
+    limit: int
+    window: int  # seconds
+    per: str  # "ip" | "user" | "account"
+    field: str | None = None  # per="account"일 때 계정으로 쓸 본문 필드
+
+
+def _rule(name: str, method: str, path: str, default: str, per: str, field: str | None = None) -> Rule:
+    limit, window = os.getenv(f"RATE_LIMIT_{name.upper()}", default).split("/")
+    return Rule(name, method, re.compile(path), int(limit), int(window), per, field)
+
+
+RULES = [
+    _rule("login", "POST", r"/users/token", "10/60", "ip"),
+    _rule("login_account", "POST", r"/users/token", "5/300", "account", "username"),
+    _rule("signup", "POST", r"/users/", "5/3600", "ip"),
+    _rule("forgot_password", "POST", r"/users/forgot-password", "5/3600", "ip"),
+    _rule("forgot_password_account", "POST", r"/users/forgot-password", "3/3600", "account", "email"),
+    _rule("reset_password", "POST", r"/users/reset-password", "10/3600", "ip"),
+    _rule("reset_password_account", "POST", r"/users/reset-password", "5/3600", "account", "token"),
+    _rule("upload", "POST", r"/activities/upload", "30/60", "user"),
+    _rule("upload", "POST", r"/races/\d+/upload-tcx", "30/60", "user"),
+]
+
+
+class Limiter(Protocol):
+    async def hit(self, key: str, limit: int, window: int) -> float:
+        """토큰 하나를 쓴다. 허용되면 0, 아니면 다음 토큰까지 남은 초."""
+        ...
+
+
+class MemoryLimiter:
+    """스레드 안전한 토큰 버킷 (단일 프로세스용, 오래 안 쓴 키부터 정리)."""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self._max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def hit(self, key: str, limit: int, window: int) -> float:
+        rate = limit / window
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (limit, now))
+            tokens = min(limit, tokens + (now - updated) * rate)
+            retry_after = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                retry_after = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+
+_REDIS_TOKEN_BUCKET = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local rate = limit / window
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or limit
+local ts = tonumber(state[2]) or now
+tokens = math.min(limit, tokens + math.max(0, now - ts) * rate)
+local retry_after = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], window)
+return tostring(retry_after)
+"""
+
+
+class RedisLimiter:
+    """여러 워커가 공유하는 Redis 토큰 버킷.
+
+    Redis에 닿지 못하면 요청을 막지 않고 통과시킨다 (fail open) — 빈도 제한 때문에
+    로그인/업로드까지 500이 나지 않도록.
+    """
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+            from redis.exceptions import RedisError
+        except ImportError as e:
+            raise RuntimeError("CACHE_URL에 redis를 쓰려면 redis extra가 필요합니다 (uv sync --extra redis)") from e
+        self._script = redis.Redis.from_url(url).register_script(_REDIS_TOKEN_BUCKET)
+        self._errors = (RedisError, OSError)
+
+    async def hit(self, key: str, limit: int, window: int) -> float:
+        try:
+            return float(await self._script(keys=[key], args=[limit, window, time.time()]))
+        except self._errors as e:
+            logger.warning("Rate limit backend unavailable, allowing request (%s): %s", key, e)
+            return 0.0
+
+
+def _create_limiter() -> Limiter:
+    if cache.is_shared():
+        return RedisLimiter(cache.CACHE_URL)
+    return MemoryLimiter()
+
+
+def _header(scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def client_ip(scope) -> str:
+    peer = scope["client"][0] if scope.get("client") else "unknown"
+    real_ip = _header(scope, b"x-real-ip")
+    if real_ip and RATE_LIMIT_TRUSTED_PROXIES:
+        try:
+            address = ipaddress.ip_address(peer)
+        except ValueError:
+            return peer
+        if any(address in net for net in RATE_LIMIT_TRUSTED_PROXIES):
+            return real_ip
+    return peer
+
+
+def _token_subject(scope) -> str | None:
+    authorization = _header(scope, b"authorization") or ""
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return jwt.decode(token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM]).get("sub")
+    except JWTError:
+        return None
+
+
+def _body_field(body: bytes, content_type: str, field: str) -> str | None:
+    """폼(로그인) 또는 JSON 본문에서 field 값을 꺼낸다."""
+    try:
+        if content_type.startswith("application/x-www-form-urlencoded"):
+            values = parse_qs(body.decode())
+            value = values[field][0] if field in values else None
+        elif content_type.startswith("application/json"):
+            data = json.loads(body)
+            value = data.get(field) if isinstance(data, dict) else None
+        else:
+            return None
+    except (UnicodeDecodeError, ValueError):
+        return None
+    if not isinstance(value, str) or not value.strip():
+        return None
+    # 계정 식별자를 그대로 Redis 키에 남기지 않도록 해시한다
+    return hashlib.sha256(value.strip().lower().encode()).hexdigest()[:32]
+
+
+async def _read_body(receive) -> tuple[bytes, list[dict]]:
+    """본문을 끝까지 읽고, 앱에 다시 넘겨줄 메시지도 함께 돌려준다."""
+    messages, chunks = [], []
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks), messages
+
+
+def _replay(messages: list[dict], receive):
+    async def _receive():
+        if messages:
+            return messages.pop(0)
+        return await receive()
+    return _receive
+
+
+class RateLimitMiddleware:
+    """RULES에 맞는 요청만 버킷을 확인하고, 한도를 넘으면 429 + Retry-After로 막는다."""
+
+    def __init__(self, app, rules: list[Rule] | None = None, limiter: Limiter | None = None):
+        self.app = app
+        self.rules = RULES if rules is None else rules
+        self.limiter = limiter or _create_limiter()
+
+    def _match(self, scope) -> list[Rule]:
+        return [
+            rule for rule in self.rules
+            if rule.method == scope["method"] and rule.path.fullmatch(scope["path"])
+        ]
+
+    async def __call__(self, scope, receive, send):
+        rules = self._match(scope) if scope["type"] == "http" and RATE_LIMIT_ENABLED else []
+        if not rules:
+            await self.app(scope, receive, send)
+            return
+
+        request_body = b""
+        if any(rule.per == "account" for rule in rules):
+            request_body, messages = await _read_body(receive)
+            receive = _replay(messages, receive)
+        content_type = _header(scope, b"content-type") or ""
+
+        retry_after = 0.0
+        for rule in rules:
+            if rule.per == "account":
+                account = _body_field(request_body, content_type, rule.field)
+                if account is None:
+                    continue  # 계정을 알 수 없으면 IP 규칙만 적용된다
+                identity = f"account:{account}"
+            else:
+                subject = _token_subject(scope) if rule.per == "user" else None
+                identity = f"user:{subject}" if subject else f"ip:{client_ip(scope)}"
+            wait = await self.limiter.hit(f"ratelimit:{rule.name}:{identity}", rule.limit, rule.window)
+            retry_after = max(retry_after, wait)
+        if not retry_after:
+            await self.app(scope, receive, send)
+            return
+
+        body = json.dumps({"detail": "요청이 너무 많습니다. 잠시 후 다시 시도해 주세요."}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(math.ceil(retry_after)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
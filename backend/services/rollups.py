@@ -0,0 +1,190 @@
+"""사용자별 일/주/월/연 훈련 집계(training_rollups) 관리.
+
+활동 업로드·삭제 경로가 apply_activity로 해당 기간 행을 같은 트랜잭션에서
+원자적으로 증감(upsert)한다. 대시보드와 통계는 activities 대신 이 테이블을
+기간 수만큼만 읽는다. 집계가 어긋났거나 처음 배포할 때는 재구축한다:
+
+    python -m services.rollups [--user-id N]
+"""
+
+import argparse
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+import models
+from database import SessionLocal
+from services import cache
+
+logger = logging.getLogger(__name__)
+
+PERIOD_TYPES = ("day", "week", "month", "year")
+_KEY_COLUMNS = ("user_id", "period_type", "period_start")
+_METRIC_COLUMNS = (
+    "total_distance", "total_time", "activity_count",
+    "pace_sum", "pace_count", "hr_sum", "hr_count", "treadmill_count",
+)
+
+
+def period_start(period_type: str, day: date) -> date:
+    """day가 속한 기간의 시작일 (주는 월요일 기준)."""
+    if period_type == "day":
+        return day
+    if period_type == "week":
+        return day - timedelta(days=day.weekday())
+    if period_type == "month":
+        return day.replace(day=1)
+    if period_type == "year":
+        return day.replace(month=1, day=1)
+    raise ValueError(f"Unknown period type: {period_type}")
+
+
+def _metrics(activity, sign: int = 1) -> dict:
+    """활동 하나가 집계에 더하는(sign=-1이면 빼는) 값."""
+    has_pace = bool(activity.avg_pace) and activity.avg_pace > 0
+    has_hr = activity.avg_hr is not None
+    return {
+        "total_distance": sign * (activity.total_distance or 0),
+        "total_time": sign * (activity.total_time or 0),
+        "activity_count": sign,
+        "pace_sum": sign * activity.avg_pace if has_pace else 0,
+        "pace_count": sign if has_pace else 0,
+        "hr_sum": sign * activity.avg_hr if has_hr else 0,
+        "hr_count": sign if has_hr else 0,
+        "treadmill_count": sign if activity.is_treadmill else 0,
+    }
+
+
+def _activity_date(start_time: datetime) -> date:
+    # 업로드 경로는 UTC aware, DB에서 읽으면 naive UTC — 둘 다 UTC 날짜 기준
+    return start_time.date()
+
+
+def _upsert(db: Session, rows: list[dict]) -> None:
+    """기간 행을 삽입하거나 기존 값에 원자적으로 더한다."""
+    table = models.TrainingRollup.__table__
+    if db.get_bind().dialect.name == "mysql":
+        stmt = mysql_insert(table).values(rows)
+        stmt = stmt.on_duplicate_key_update(
+            {c: table.c[c] + stmt.inserted[c] for c in _METRIC_COLUMNS}
+        )
+    else:
+        stmt = sqlite_insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(_KEY_COLUMNS),
+            set_={c: table.c[c] + stmt.excluded[c] for c in _METRIC_COLUMNS},
+        )
+    db.execute(stmt)
+
+
+def apply_activity(db: Session, activity: models.Activity, sign: int = 1) -> None:
+    """활동을 일/주/월/연 집계에 반영한다. 커밋은 호출한 쪽 트랜잭션에 맡긴다.
+
+    Args:
+        sign: 1이면 추가(업로드), -1이면 제거(삭제)
+    """
+    if activity.start_time is None:
+        return
+    day = _activity_date(activity.start_time)
+    metrics = _metrics(activity, sign)
+    _upsert(db, [
+        {"user_id": activity.user_id, "period_type": t, "period_start": period_start(t, day), **metrics}
+        for t in PERIOD_TYPES
+    ])
+    if sign < 0:
+        db.query(models.TrainingRollup).filter(
+            models.TrainingRollup.user_id == activity.user_id,
+            models.TrainingRollup.activity_count <= 0,
+        ).delete(synchronize_session=False)
+
+
+def rebuild_user(db: Session, user_id: int) -> int:
+    """activities에서 한 사용자의 집계를 처음부터 다시 계산한다.
+
+    Returns:
+        생성된 집계 행 수
+    """
+    totals: dict[tuple, dict] = defaultdict(lambda: dict.fromkeys(_METRIC_COLUMNS, 0))
+    activities = (
+        db.query(
+            models.Activity.start_time,
+            models.Activity.total_distance,
+            models.Activity.total_time,
+            models.Activity.avg_pace,
+            models.Activity.avg_hr,
+            models.Activity.is_treadmill,
+        )
+        .filter(models.Activity.user_id == user_id, models.Activity.start_time.isnot(None))
+        .yield_per(1000)
+    )
+    for activity in activities:
+        day = _activity_date(activity.start_time)
+        metrics = _metrics(activity)
+        for t in PERIOD_TYPES:
+            bucket = totals[(t, period_start(t, day))]
+            for column, value in metrics.items():
+                bucket[column] += value
+
+    db.query(models.TrainingRollup).filter(
+        models.TrainingRollup.user_id == user_id
+    ).delete(synchronize_session=False)
+    if totals:
+        db.execute(
+            models.TrainingRollup.__table__.insert(),
+            [
+                {"user_id": user_id, "period_type": t, "period_start": start, **metrics}
+                for (t, start), metrics in totals.items()
+            ],
+        )
+    db.commit()
+    cache.dashboard_cache.invalidate(user_id)
+    return len(totals)
+
+
+def rebuild_all(db: Session, user_ids: list[int] | None = None) -> int:
+    """여러 사용자의 집계를 재구축한다. user_ids가 없으면 활동이 있는 모든 사용자.
+
+    Returns:
+        재구축한 사용자 수
+    """
+    if user_ids is None:
+        user_ids = [
+            row.user_id
+            for row in db.query(models.Activity.user_id).distinct().order_by(models.Activity.user_id)
+        ]
+    for user_id in user_ids:
+        rows = rebuild_user(db, user_id)
+        logger.info("Rollups: user %d — %d개 기간 행 재구축", user_id, rows)
+    return len(user_ids)
+
+
+def warn_if_cache_not_shared() -> None:
+    """관리 명령에서 재구축 후 호출 — 프로세스별 캐시면 서버의 대시보드 캐시는 여기서 무효화되지 않는다."""
+    if not cache.is_shared():
+        logger.warning(
+            "CACHE_URL이 설정되지 않아 실행 중인 서버의 대시보드 캐시는 무효화되지 않습니다. "
+            "최대 %d초(DASHBOARD_CACHE_TTL) 동안 이전 집계가 보일 수 있으니, 바로 반영하려면 "
+            "서버를 재시작하거나 공유 캐시(CACHE_URL=redis://...)를 사용하세요",
+            cache.DASHBOARD_CACHE_TTL,
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="training_rollups 재구축")
+    parser.add_argument("--user-id", type=int, action="append", help="특정 사용자만 재구축 (여러 번 지정 가능)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    with SessionLocal() as db:
+        count = rebuild_all(db, args.user_id)
+    logger.info("Rollups: %d명 재구축 완료", count)
+    if count:
+        warn_if_cache_not_shared()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
-from copy import deepcopy
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 
 from lxml import etree
 import dateutil.parser
@@ -9,113 +11,211 @@ NAMESPACES = {
 }
 
 
+def _xpath(expression: str, text: bool = False) -> etree.XPath:
+    """NAMESPACES를 바인딩한 XPath를 모듈 로드 시 한 번만 컴파일한다."""
+    return etree.XPath(expression, namespaces=NAMESPACES, smart_strings=not text)
+
+
+# 요소 탐색
+_X_ALL_ACTIVITIES = _xpath('//ns:Activity')
+_X_ALL_POSITIONS = _xpath('//ns:Trackpoint/ns:Position')
+_X_LAPS = _xpath('ns:Lap')
+_X_TRACKS = _xpath('ns:Track')
+_X_TRACKPOINTS = _xpath('ns:Trackpoint')
+_X_TP_POSITION = _xpath('ns:Position')
+_X_TP_WATTS = _xpath('.//ns3:Watts')
+
+# 텍스트 값 (문자열 리스트 반환)
+_X_ACTIVITY_ID = _xpath('ns:Id/text()', text=True)
+_X_TP_TIME = _xpath('ns:Time/text()', text=True)
+_X_LAP_TIME = _xpath('ns:TotalTimeSeconds/text()', text=True)
+_X_LAP_DISTANCE = _xpath('ns:DistanceMeters/text()', text=True)
+_X_LAP_AVG_HR = _xpath('ns:AverageHeartRateBpm/ns:Value/text()', text=True)
+_X_LAP_MAX_HR = _xpath('ns:MaximumHeartRateBpm/ns:Value/text()', text=True)
+_X_LAP_CADENCE = _xpath('ns:Cadence/text()', text=True)
+_X_LAP_LX_CADENCE = _xpath('ns:Extensions/ns3:LX/ns3:AvgRunCadence/text()', text=True)
+_X_TP_DISTANCE = _xpath('ns:DistanceMeters/text()', text=True)
+_X_TP_HR = _xpath('ns:HeartRateBpm/ns:Value/text()', text=True)
+_X_TP_ALTITUDE = _xpath('ns:AltitudeMeters/text()', text=True)
+_X_TP_CADENCE = _xpath('ns:Cadence/text() | ns:Extensions/ns3:TPX/ns3:RunCadence/text()', text=True)
+_X_TP_LATITUDE = _xpath('ns:Position/ns:LatitudeDegrees/text()', text=True)
+_X_TP_LONGITUDE = _xpath('ns:Position/ns:LongitudeDegrees/text()', text=True)
+
+
+def _activity_id(activity) -> str | None:
+    ids = _X_ACTIVITY_ID(activity)
+    return ids[0] if ids else None
+
+
+def _trackpoint_time(tp) -> str | None:
+    times = _X_TP_TIME(tp)
+    return times[0] if times else None
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_SAMPLE_INTERVAL_US = 60 * 1_000_000  # Trackpoint 샘플링 간격 (1분)
+
+
+def _tcx_time_us(text: str) -> int:
+    """Trackpoint 시간 문자열을 epoch 마이크로초(int)로 변환한다.
+
+    TCX의 고정 형식 'YYYY-MM-DDTHH:MM:SS(.fff)Z'는 C 구현인 fromisoformat으로
+    바로 해석하고, 그 외 형식(오프셋, 비표준 표기 등)만 dateutil로 처리한다.
+    dateutil과 같은 마이크로초 정밀도라 샘플링 결과가 달라지지 않는다.
+    """
+    dt = None
+    if text.endswith('Z'):
+        try:
+            dt = datetime.fromisoformat(text)
+        except ValueError:
+            pass
+    if dt is None:
+        dt = dateutil.parser.parse(text)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+    delta = dt - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _parse_lap(lap, lap_number: int) -> dict:
+    """Lap XML 요소 하나에서 랩 데이터를 추출한다."""
+    lap_time = float(_X_LAP_TIME(lap)[0])
+    lap_dist = float(_X_LAP_DISTANCE(lap)[0])
+
+    avg_hr_text = _X_LAP_AVG_HR(lap)
+    avg_hr = float(avg_hr_text[0]) if avg_hr_text else None
+
+    max_hr_text = _X_LAP_MAX_HR(lap)
+    max_hr = float(max_hr_text[0]) if max_hr_text else None
+
+    avg_cadence = None
+    cadence_text = _X_LAP_CADENCE(lap)
+    if cadence_text:
+        avg_cadence = float(cadence_text[0])
+    else:
+        lx = _X_LAP_LX_CADENCE(lap)
+        if lx:
+            avg_cadence = float(lx[0])
+
+    pace = (lap_time / (lap_dist / 1000)) if lap_dist > 0 else 0
+
+    return {
+        "lap_number": lap_number,
+        "time": lap_time,
+        "distance": lap_dist,
+        "pace": pace,
+        "avg_hr": avg_hr,
+        "max_hr": max_hr,
+        "avg_cadence": avg_cadence,
+    }
+
+
 def _parse_lap_elements(laps_elements):
     """Lap XML 요소 목록에서 랩 데이터를 추출한다."""
-    laps_data = []
-    for i, lap in enumerate(laps_elements):
-        lap_time = float(lap.xpath('ns:TotalTimeSeconds', namespaces=NAMESPACES)[0].text)
-        lap_dist = float(lap.xpath('ns:DistanceMeters', namespaces=NAMESPACES)[0].text)
+    return [_parse_lap(lap, i + 1) for i, lap in enumerate(laps_elements)]
 
-        avg_hr_elem = lap.xpath('ns:AverageHeartRateBpm/ns:Value', namespaces=NAMESPACES)
-        avg_hr = float(avg_hr_elem[0].text) if avg_hr_elem else None
 
-        max_hr_elem = lap.xpath('ns:MaximumHeartRateBpm/ns:Value', namespaces=NAMESPACES)
-        max_hr = float(max_hr_elem[0].text) if max_hr_elem else None
+def _summarize_activity(start_time, laps_data: list[dict]) -> dict:
+    """랩 데이터로 활동 요약 dict를 만든다."""
+    total_time = sum(l['time'] for l in laps_data)
+    total_distance = sum(l['distance'] for l in laps_data)
+    avg_pace = (total_time / (total_distance / 1000)) if total_distance > 0 else 0
 
-        avg_cadence = None
-        cadence_elem = lap.xpath('ns:Cadence', namespaces=NAMESPACES)
-        if cadence_elem:
-            avg_cadence = float(cadence_elem[0].text)
-        else:
-            lx = lap.xpath('ns:Extensions/ns3:LX/ns3:AvgRunCadence', namespaces=NAMESPACES)
-            if lx:
-                avg_cadence = float(lx[0].text)
+    valid_hrs = [l['avg_hr'] for l in laps_data if l['avg_hr'] is not None]
+    activity_avg_hr = sum(valid_hrs) / len(valid_hrs) if valid_hrs else None
 
-        pace = (lap_time / (lap_dist / 1000)) if lap_dist > 0 else 0
+    valid_cadence = [l['avg_cadence'] for l in laps_data if l['avg_cadence'] is not None]
+    activity_avg_cadence = sum(valid_cadence) / len(valid_cadence) if valid_cadence else None
 
-        laps_data.append({
-            "lap_number": i + 1,
-            "time": lap_time,
-            "distance": lap_dist,
-            "pace": pace,
-            "avg_hr": avg_hr,
-            "max_hr": max_hr,
-            "avg_cadence": avg_cadence,
-        })
+    return {
+        "start_time": start_time,
+        "total_time": total_time,
+        "total_distance": total_distance,
+        "avg_pace": avg_pace,
+        "avg_hr": activity_avg_hr,
+        "avg_cadence": activity_avg_cadence,
+        "laps": laps_data,
+    }
 
-    return laps_data
 
+SERIES_FIELDS = ('time_offset', 'distance', 'heart_rate', 'cadence', 'altitude', 'latitude', 'longitude')
+
+
+def _first_float(values: list) -> float | None:
+    return float(values[0]) if values else None
 
-def parse_tcx(file_content):
-    """원본 TCX를 파싱하여 활동 요약 + 랩 데이터를 반환한다."""
-    tree = etree.fromstring(file_content)
-    activities = tree.xpath('//ns:Activity', namespaces=NAMESPACES)
+
+def _trackpoint_values(tp) -> tuple:
+    """Trackpoint 하나에서 시계열 값(시간 제외)을 SERIES_FIELDS 순서로 뽑는다."""
+    return (
+        _first_float(_X_TP_DISTANCE(tp)),
+        _first_float(_X_TP_HR(tp)),
+        _first_float(_X_TP_CADENCE(tp)),
+        _first_float(_X_TP_ALTITUDE(tp)),
+        _first_float(_X_TP_LATITUDE(tp)),
+        _first_float(_X_TP_LONGITUDE(tp)),
+    )
+
+
+@dataclass
+class TcxIngestResult:
+    """업로드 경로에서 한 번의 파싱으로 얻는 결과 묶음.
+
+    series는 activities와 같은 순서로, 경량 TCX에 남는 샘플 Trackpoint의
+    필드별 값 목록(SERIES_FIELDS)을 담는다. time_offset은 활동 시작 기준 초.
+    """
+
+    activities: list[dict]
+    is_treadmill: bool
+    lightweight_tcx: str
+    series: list[dict] = field(default_factory=list)
+
+
+def _parse_activities(tree) -> list[dict]:
+    """파싱된 TCX 트리에서 활동 요약 + 랩 데이터를 추출한다."""
+    activities = _X_ALL_ACTIVITIES(tree)
 
     parsed_data = []
 
     for activity in activities:
-        start_time_elem = activity.find('ns:Id', namespaces=NAMESPACES)
-        start_time_str = start_time_elem.text if start_time_elem is not None else None
+        start_time_str = _activity_id(activity)
         if not start_time_str:
             continue
         start_time = dateutil.parser.parse(start_time_str)
 
-        laps = activity.xpath('ns:Lap', namespaces=NAMESPACES)
-        laps_data = _parse_lap_elements(laps)
-
-        total_time = sum(l['time'] for l in laps_data)
-        total_distance = sum(l['distance'] for l in laps_data)
-        avg_pace = (total_time / (total_distance / 1000)) if total_distance > 0 else 0
-
-        valid_hrs = [l['avg_hr'] for l in laps_data if l['avg_hr'] is not None]
-        activity_avg_hr = sum(valid_hrs) / len(valid_hrs) if valid_hrs else None
-
-        valid_cadence = [l['avg_cadence'] for l in laps_data if l['avg_cadence'] is not None]
-        activity_avg_cadence = sum(valid_cadence) / len(valid_cadence) if valid_cadence else None
-
-        parsed_data.append({
-            "start_time": start_time,
-            "total_time": total_time,
-            "total_distance": total_distance,
-            "avg_pace": avg_pace,
-            "avg_hr": activity_avg_hr,
-            "avg_cadence": activity_avg_cadence,
-            "laps": laps_data,
-        })
+        laps = _X_LAPS(activity)
+        parsed_data.append(_summarize_activity(start_time, _parse_lap_elements(laps)))
 
     return parsed_data
 
 
-def detect_treadmill(file_content: bytes) -> bool:
-    """TCX에 GPS 좌표(Position)가 없으면 트레드밀로 판단한다."""
-    tree = etree.fromstring(file_content)
-    positions = tree.xpath('//ns:Trackpoint/ns:Position', namespaces=NAMESPACES)
-    return len(positions) == 0
+def _has_position(tree) -> bool:
+    """Trackpoint 중 하나라도 GPS 좌표(Position)를 가지고 있는지 확인한다."""
+    return bool(_X_ALL_POSITIONS(tree))
 
 
-def create_lightweight_tcx(file_content: bytes) -> str:
-    """원본 TCX에서 경량 TCX를 생성한다.
+def _strip_trackpoint(tp) -> None:
+    """유지되는 Trackpoint에서 Position, Watts 태그를 제거한다."""
+    for pos in _X_TP_POSITION(tp):
+        tp.remove(pos)
+    for watts in _X_TP_WATTS(tp):
+        watts.getparent().remove(watts)
 
-    - Lap 요약 태그 유지
-    - Trackpoint는 1분 간격으로 샘플링
-    - Position, Watts 태그 제거
-    - 인라인 네임스페이스 선언을 루트로 통합
-    """
-    tree = etree.fromstring(file_content)
 
-    for activity in tree.xpath('//ns:Activity', namespaces=NAMESPACES):
-        for lap in activity.xpath('ns:Lap', namespaces=NAMESPACES):
-            for track in lap.xpath('ns:Track', namespaces=NAMESPACES):
-                trackpoints = track.xpath('ns:Trackpoint', namespaces=NAMESPACES)
+def _lighten_tree(tree) -> None:
+    """트리를 제자리에서 경량화한다 (1분 샘플링, Position/Watts 제거)."""
+    for activity in _X_ALL_ACTIVITIES(tree):
+        for lap in _X_LAPS(activity):
+            for track in _X_TRACKS(lap):
+                trackpoints = _X_TRACKPOINTS(track)
                 if not trackpoints:
                     continue
 
                 # 첫 Trackpoint의 시간을 기준으로 1분 간격 샘플링
-                first_time_elem = trackpoints[0].find('ns:Time', namespaces=NAMESPACES)
-                if first_time_elem is None:
+                first_time = _trackpoint_time(trackpoints[0])
+                if first_time is None:
                     continue
-                base_time = dateutil.parser.parse(first_time_elem.text)
-                last_kept_time = base_time
+                last_kept_time = _tcx_time_us(first_time)
 
                 to_remove = []
                 for j, tp in enumerate(trackpoints):
@@ -123,40 +223,250 @@ def create_lightweight_tcx(file_content: bytes) -> str:
                         # 첫 포인트는 항상 유지
                         pass
                     else:
-                        time_elem = tp.find('ns:Time', namespaces=NAMESPACES)
-                        if time_elem is None:
+                        time_text = _trackpoint_time(tp)
+                        if time_text is None:
                             to_remove.append(tp)
                             continue
-                        tp_time = dateutil.parser.parse(time_elem.text)
-                        if (tp_time - last_kept_time).total_seconds() < 60:
+                        tp_time = _tcx_time_us(time_text)
+                        if tp_time - last_kept_time < _SAMPLE_INTERVAL_US:
                             to_remove.append(tp)
                             continue
                         last_kept_time = tp_time
 
                     # 유지되는 Trackpoint에서 Position, Watts 제거
-                    for pos in tp.xpath('ns:Position', namespaces=NAMESPACES):
-                        tp.remove(pos)
-                    for watts in tp.xpath('.//ns3:Watts', namespaces=NAMESPACES):
-                        watts.getparent().remove(watts)
+                    _strip_trackpoint(tp)
 
                 # 불필요한 Trackpoint 제거
                 for tp in to_remove:
                     track.remove(tp)
 
+
+_TCD = '{%s}' % NAMESPACES['ns']
+_ACTIVITY_TAG = _TCD + 'Activity'
+_LAP_TAG = _TCD + 'Lap'
+_TRACK_TAG = _TCD + 'Track'
+_TRACKPOINT_TAG = _TCD + 'Trackpoint'
+
+STREAM_CHUNK_SIZE = 64 * 1024
+MAX_TCX_UPLOAD_SIZE = int(os.getenv("MAX_TCX_UPLOAD_SIZE", str(50 * 1024 * 1024)))  # bytes
+
+
+class TcxTooLargeError(ValueError):
+    """업로드된 TCX가 허용 크기(MAX_TCX_UPLOAD_SIZE)를 넘었을 때 발생한다."""
+
+
+class TcxStreamParser:
+    """XMLPullParser 기반 점진적 TCX 파서.
+
+    feed()로 받은 바이트를 바로 파싱하고, Lap/Trackpoint 요소가 닫히는 즉시
+    처리한 뒤 버린다. 샘플링에서 빠지는 Trackpoint는 트리에서 곧바로 제거되므로
+    메모리 사용량은 원본 크기가 아니라 경량 TCX 크기에 비례한다.
+    lightweight=False이면 요약만 계산하고 처리가 끝난 Lap/Activity도 모두 비운다.
+    lightweight 모드에서는 남기는 Trackpoint의 값(위경도 포함)을 제거 전에 모아
+    활동별 시계열(TcxIngestResult.series)도 함께 만든다.
+
+    결과는 parse_tcx / detect_treadmill / create_lightweight_tcx와 동일하다.
+    """
+
+    def __init__(self, lightweight: bool = True):
+        self._lightweight = lightweight
+        self._parser = etree.XMLPullParser(
+            events=('end',),
+            tag=(_ACTIVITY_TAG, _LAP_TAG, _TRACKPOINT_TAG),
+        )
+        self._activities: list[dict] = []
+        self._series: list[dict] = []
+        self._laps: list[dict] = []
+        self._points: list[tuple] = []
+        self._has_position = False
+        self._track = None
+        self._track_passthrough = False
+        self._last_kept_time = None
+        self._pending_drop = None
+
+    def feed(self, data: bytes) -> None:
+        """바이트 조각을 파서에 넣고, 닫힌 요소를 처리한다."""
+        self._parser.feed(data)
+        self._drain()
+
+    def close(self) -> TcxIngestResult:
+        """입력을 마무리하고 파싱 결과를 반환한다."""
+        root = self._parser.close()
+        self._drain()
+        self._flush_drop()
+        lightweight_tcx = etree.tostring(root, encoding='unicode') if self._lightweight else ''
+        return TcxIngestResult(
+            activities=self._activities,
+            is_treadmill=not self._has_position,
+            lightweight_tcx=lightweight_tcx,
+            series=self._series,
+        )
+
+    def _drain(self) -> None:
+        for _, elem in self._parser.read_events():
+            self._flush_drop()
+            if elem.tag == _TRACKPOINT_TAG:
+                self._on_trackpoint(elem)
+            elif elem.tag == _LAP_TAG:
+                self._on_lap(elem)
+            else:
+                self._on_activity(elem)
+
+    def _on_trackpoint(self, tp) -> None:
+        if not self._has_position and _X_TP_POSITION(tp):
+            self._has_position = True
+
+        track = tp.getparent()
+        if not self._lightweight:
+            tp.clear()
+            track.remove(tp)
+            return
+
+        # Activity/Lap/Track/Trackpoint 구조가 아니면 create_lightweight_tcx처럼 그대로 둔다
+        lap = track.getparent() if track.tag == _TRACK_TAG else None
+        if lap is None or lap.tag != _LAP_TAG or lap.getparent() is None \
+                or lap.getparent().tag != _ACTIVITY_TAG:
+            return
+
+        time_text = _trackpoint_time(tp)
+        if track is not self._track:
+            # 트랙의 첫 포인트는 항상 유지 — 시간이 없으면 트랙 전체를 건드리지 않는다
+            self._track = track
+            self._track_passthrough = time_text is None
+            if self._track_passthrough:
+                return
+            self._last_kept_time = _tcx_time_us(time_text)
+        elif self._track_passthrough:
+            return
+        else:
+            if time_text is None:
+                self._drop(track, tp)
+                return
+            tp_time = _tcx_time_us(time_text)
+            if tp_time - self._last_kept_time < _SAMPLE_INTERVAL_US:
+                self._drop(track, tp)
+                return
+            self._last_kept_time = tp_time
+
+        self._points.append((self._last_kept_time, *_trackpoint_values(tp)))
+        _strip_trackpoint(tp)
+
+    def _drop(self, track, tp) -> None:
+        # 청크 경계에서 tail 공백이 잘릴 수 있으므로 다음 이벤트에서 제거한다
+        self._pending_drop = (track, tp)
+
+    def _flush_drop(self) -> None:
+        if self._pending_drop is None:
+            return
+        track, tp = self._pending_drop
+        self._pending_drop = None
+        tp.clear()
+        track.remove(tp)
+
+    def _on_lap(self, lap) -> None:
+        activity = lap.getparent()
+        if activity is None or activity.tag != _ACTIVITY_TAG:
+            return
+        # Id가 없는 Activity는 parse_tcx에서 건너뛰므로 랩도 해석하지 않는다
+        if _activity_id(activity):
+            self._laps.append(_parse_lap(lap, len(self._laps) + 1))
+        if not self._lightweight:
+            lap.clear()
+            activity.remove(lap)
+
+    def _on_activity(self, activity) -> None:
+        start_time_str = _activity_id(activity)
+        if start_time_str:
+            start_time = dateutil.parser.parse(start_time_str)
+            self._activities.append(_summarize_activity(start_time, self._laps))
+            self._series.append(_build_series(_tcx_time_us(start_time_str), self._points))
+        self._laps = []
+        self._points = []
+        self._track = None
+        if not self._lightweight:
+            parent = activity.getparent()
+            activity.clear()
+            if parent is not None:
+                parent.remove(activity)
+
+
+def _build_series(start_us: int, points: list[tuple]) -> dict:
+    """(epoch us, 값...) 튜플 목록을 필드별 리스트로 전치한다."""
+    columns = list(zip(*points)) if points else [()] * len(SERIES_FIELDS)
+    series = {name: list(values) for name, values in zip(SERIES_FIELDS, columns)}
+    series['time_offset'] = [round((t - start_us) / 1_000_000) for t in series['time_offset']]
+    return series
+
+
+def ingest_tcx_stream(source, lightweight: bool = True) -> TcxIngestResult:
+    """파일 경로 또는 바이너리 파일 객체를 청크 단위로 읽어 스트리밍 파싱한다."""
+    parser = TcxStreamParser(lightweight=lightweight)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            _feed_file(parser, f)
+    else:
+        _feed_file(parser, source)
+    return parser.close()
+
+
+def _feed_file(parser: TcxStreamParser, f) -> None:
+    while chunk := f.read(STREAM_CHUNK_SIZE):
+        parser.feed(chunk)
+
+
+def parse_tcx_stream(source) -> list[dict]:
+    """대용량 TCX용 parse_tcx — 트리를 유지하지 않고 요약 + 랩 데이터만 반환한다."""
+    return ingest_tcx_stream(source, lightweight=False).activities
+
+
+def parse_tcx(file_content):
+    """원본 TCX를 파싱하여 활동 요약 + 랩 데이터를 반환한다."""
+    tree = etree.fromstring(file_content)
+    return _parse_activities(tree)
+
+
+def detect_treadmill(file_content: bytes) -> bool:
+    """TCX에 GPS 좌표(Position)가 없으면 트레드밀로 판단한다."""
+    tree = etree.fromstring(file_content)
+    return not _has_position(tree)
+
+
+def create_lightweight_tcx(file_content: bytes) -> str:
+    """원본 TCX에서 경량 TCX를 생성한다.
+
+    - Lap 요약 태그 유지
+    - Trackpoint는 1분 간격으로 샘플링
+    - Position, Watts 태그 제거
+    - 인라인 네임스페이스 선언을 루트로 통합
+    """
+    tree = etree.fromstring(file_content)
+    _lighten_tree(tree)
+
     # 인라인 ns3 네임스페이스 선언 정리 — 루트에만 유지
     result = etree.tostring(tree, encoding='unicode')
 
     return result
 
 
+def ingest_tcx(file_content: bytes) -> TcxIngestResult:
+    """원본 TCX를 한 번만 파싱해 활동 요약, 트레드밀 여부, 경량 TCX를 함께 만든다.
+
+    parse_tcx / detect_treadmill / create_lightweight_tcx를 각각 호출하면
+    DOM을 세 번 만들게 되므로, 업로드 경로는 이 함수를 사용한다.
+    """
+    parser = TcxStreamParser()
+    parser.feed(file_content)
+    return parser.close()
+
+
 def parse_laps_from_tcx(tcx_data: str) -> list[dict]:
     """저장된 경량 TCX 문자열에서 랩 데이터를 재파싱한다."""
     if not tcx_data:
         return []
     tree = etree.fromstring(tcx_data.encode('utf-8'))
-    activities = tree.xpath('//ns:Activity', namespaces=NAMESPACES)
+    activities = _X_ALL_ACTIVITIES(tree)
     if not activities:
         return []
 
-    laps = activities[0].xpath('ns:Lap', namespaces=NAMESPACES)
+    laps = _X_LAPS(activities[0])
     return _parse_lap_elements(laps)
@@ -4,13 +4,16 @@ Uses SQLite in-memory DB and builds a test FastAPI app from routers directly,
 bypassing main.py (which runs MySQL-specific migrations at import time).
 """
 
+from contextlib import contextmanager
+
 import pytest
 from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, sessionmaker
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
-from database import Base, get_db
+from database import Base, get_async_db, get_db
 import auth
 import models
 from tests.fixtures.sample_data import make_user
@@ -57,6 +60,48 @@ def db_session(test_engine, tables):
     connection.close()
 
 
+@pytest.fixture()
+def async_db_session(db_session):
+    """AsyncSession for async routes, sharing db_session's connection and transaction.
+
+    Mirrors AsyncSessionLocal (expire_on_commit=False) but runs on the sync SQLite
+    driver, so async routes see test data and roll back with the test.
+    """
+    sync_session = Session(bind=db_session.connection(), autoflush=False, expire_on_commit=False)
+    session = AsyncSession(sync_session_class=lambda **_: sync_session)
+    yield session
+    sync_session.close()
+
+
+@pytest.fixture()
+def sql_statements(test_engine):
+    """List of SQL statements executed on the test engine during the test."""
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_engine, "before_cursor_execute", _record)
+    yield statements
+    event.remove(test_engine, "before_cursor_execute", _record)
+
+
+@pytest.fixture()
+def assert_query_count(sql_statements):
+    """Context manager asserting the exact number of SQL statements run inside it."""
+
+    @contextmanager
+    def _assert(expected: int):
+        sql_statements.clear()
+        yield
+        executed = list(sql_statements)
+        assert len(executed) == expected, (
+            f"expected {expected} queries, got {len(executed)}:\n" + "\n".join(executed)
+        )
+
+    return _assert
+
+
 # ---------------------------------------------------------------------------
 # FastAPI test app + client fixtures
 # ---------------------------------------------------------------------------
@@ -75,10 +120,11 @@ def _create_test_app() -> FastAPI:
 
 
 @pytest.fixture()
-def test_app(db_session):
-    """FastAPI app with get_db overridden to use the test session."""
+def test_app(db_session, async_db_session):
+    """FastAPI app with get_db / get_async_db overridden to use the test sessions."""
     app = _create_test_app()
     app.dependency_overrides[get_db] = lambda: db_session
+    app.dependency_overrides[get_async_db] = lambda: async_db_session
     yield app
     app.dependency_overrides.clear()
 
@@ -114,15 +160,18 @@ def authenticated_client(test_app, auth_token):
 
 
 # ---------------------------------------------------------------------------
-# Background task mocks (autouse)
+# Autouse isolation fixtures
 # ---------------------------------------------------------------------------
 
 @pytest.fixture(autouse=True)
-def _mock_background_tasks(monkeypatch):
-    """Prevent real LLM calls from BackgroundTasks during endpoint tests."""
-    monkeypatch.setattr("routers.activities.evaluate_activity", lambda x: None)
-    monkeypatch.setattr("routers.races.evaluate_activity", lambda x: None)
-    monkeypatch.setattr("routers.plans.generate_plan", lambda x: None)
+def _fresh_cache(monkeypatch):
+    """Give every test an empty in-process cache backend."""
+    import auth
+    from services import cache
+    from services.llm import cache as llm_cache
+    monkeypatch.setattr(cache, "_backend", cache.MemoryBackend())
+    monkeypatch.setattr(llm_cache, "_backend", cache.MemoryBackend())
+    monkeypatch.setattr(auth, "user_cache", cache.LocalCache(ttl=auth.USER_CACHE_TTL, max_entries=100))
 
 
 @pytest.fixture(autouse=True)
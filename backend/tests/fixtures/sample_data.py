@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 
 import auth
 import models
+from services import rollups
 
 
 def make_user(
@@ -45,12 +46,13 @@ def make_activity(
     avg_hr: float | None = 150,
     avg_cadence: float | None = 88,
     tcx_data: str | None = None,
+    laps: list[dict] | None = None,
     is_treadmill: bool = False,
     llm_evaluation: str | None = None,
     llm_evaluation_status: models.LLMEvaluationStatus | None = None,
     plan_session_id: int | None = None,
 ) -> models.Activity:
-    """Create and persist an Activity."""
+    """Create and persist an Activity (and its training rollups, like the upload path)."""
     if start_time is None:
         start_time = datetime(2024, 1, 15, 10, 0, 0)
     activity = models.Activity(
@@ -62,12 +64,15 @@ def make_activity(
         avg_hr=avg_hr,
         avg_cadence=avg_cadence,
         tcx_data=tcx_data,
+        laps=laps,
         is_treadmill=is_treadmill,
         llm_evaluation=llm_evaluation,
         llm_evaluation_status=llm_evaluation_status,
         plan_session_id=plan_session_id,
     )
     db.add(activity)
+    # 업로드 경로와 같이 훈련 집계도 함께 갱신한다
+    rollups.apply_activity(db, activity)
     db.commit()
     db.refresh(activity)
     return activity
@@ -1,10 +1,14 @@
 """Minimal valid TCX XML factories for testing."""
 
+from datetime import datetime, timedelta
+
 
 def make_tcx(
     laps: list[dict] | None = None,
     has_position: bool = True,
     start_time: str = "2024-01-15T10:00:00.000Z",
+    trackpoints_per_lap: int = 1,
+    trackpoint_interval: int = 1,
 ) -> bytes:
     """Build a minimal valid TCX XML byte string.
 
@@ -13,10 +17,15 @@ def make_tcx(
               Defaults to a single 1km/5min lap.
         has_position: Whether to include GPS Position elements (False = treadmill).
         start_time: ISO 8601 start time for the activity.
+        trackpoints_per_lap: Number of Trackpoints generated in each lap's Track.
+        trackpoint_interval: Seconds between consecutive Trackpoints.
     """
     if laps is None:
         laps = [{"distance": 1000, "time": 300, "hr": 150, "max_hr": 165, "cadence": 88}]
 
+    base = datetime.strptime(start_time, "%Y-%m-%dT%H:%M:%S.%fZ")
+    point_index = 0
+
     lap_xml_parts = []
     for lap in laps:
         distance = lap.get("distance", 1000)
@@ -50,14 +59,30 @@ def make_tcx(
               <LongitudeDegrees>127.0</LongitudeDegrees>
             </Position>"""
 
+        trackpoint_parts = []
+        for _ in range(trackpoints_per_lap):
+            tp_time = base + timedelta(seconds=point_index * trackpoint_interval)
+            tp_time_str = tp_time.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+            trackpoint_parts.append(f"""
+          <Trackpoint>
+            <Time>{tp_time_str}</Time>{position_xml}
+            <DistanceMeters>{point_index * 3.0}</DistanceMeters>
+            <HeartRateBpm><Value>{140 + point_index % 20}</Value></HeartRateBpm>
+            <Extensions>
+              <ns3:TPX>
+                <ns3:RunCadence>{85 + point_index % 5}</ns3:RunCadence>
+                <ns3:Watts>250</ns3:Watts>
+              </ns3:TPX>
+            </Extensions>
+          </Trackpoint>""")
+            point_index += 1
+        trackpoints_xml = "".join(trackpoint_parts)
+
         lap_xml = f"""
       <Lap StartTime="{start_time}">
         <TotalTimeSeconds>{time}</TotalTimeSeconds>
         <DistanceMeters>{distance}</DistanceMeters>{hr_xml}{cadence_xml}
-        <Track>
-          <Trackpoint>
-            <Time>{start_time}</Time>{position_xml}
-          </Trackpoint>
+        <Track>{trackpoints_xml}
         </Track>
       </Lap>"""
         lap_xml_parts.append(lap_xml)
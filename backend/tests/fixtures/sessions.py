@@ -0,0 +1,14 @@
+"""Session wrappers for routing code that opens its own SessionLocal() to the test session."""
+
+
+class NoCloseSession:
+    """Wrapper that delegates to a real session but makes close() a no-op."""
+
+    def __init__(self, session):
+        self._session = session
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    def close(self):
+        pass  # prevent test session from being closed
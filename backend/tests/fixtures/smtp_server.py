@@ -0,0 +1,113 @@
+"""Minimal local SMTP server standing in for the real relay in tests.
+
+Speaks just enough SMTP for smtplib (EHLO, AUTH PLAIN, MAIL, RCPT, DATA, RSET,
+NOOP, QUIT) without TLS. Delivered messages are collected in ``messages``;
+``fail_next`` makes the next DATA commands answer with a temporary 451 error and
+``disconnect_all()`` drops every open connection, to exercise retries.
+
+Can also be run by hand as a debugging sink:
+
+    python -m tests.fixtures.smtp_server [port]
+"""
+
+import socket
+import socketserver
+import sys
+import threading
+from email import message_from_bytes
+
+
+class SMTPStandIn:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.messages: list[tuple[str, list[str], bytes]] = []
+        self.connections = 0
+        self.fail_next = 0
+        self._lock = threading.Lock()
+        self._sockets = set()
+        stand_in = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                with stand_in._lock:
+                    stand_in.connections += 1
+                    stand_in._sockets.add(self.connection)
+                try:
+                    stand_in._session(self.rfile, self.wfile)
+                except (ConnectionError, OSError):
+                    pass
+                finally:
+                    with stand_in._lock:
+                        stand_in._sockets.discard(self.connection)
+
+        self._server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.host, self.port = self._server.server_address[:2]
+
+    def _session(self, rfile, wfile):
+        def reply(line: str):
+            wfile.write(f"{line}\r\n".encode())
+            wfile.flush()
+
+        reply("220 stand-in ESMTP")
+        sender, recipients = None, []
+        while line := rfile.readline():
+            command = line.decode().rstrip("\r\n")
+            verb = command.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                reply("250-stand-in")
+                reply("250 AUTH PLAIN")
+            elif verb == "AUTH":
+                reply("235 2.7.0 Authentication successful")
+            elif verb == "MAIL":
+                sender, recipients = command.split(":", 1)[1].strip(" <>"), []
+                reply("250 OK")
+            elif verb == "RCPT":
+                recipients.append(command.split(":", 1)[1].strip(" <>"))
+                reply("250 OK")
+            elif verb == "DATA":
+                reply("354 End data with <CR><LF>.<CR><LF>")
+                data = bytearray()
+                while (chunk := rfile.readline()) not in (b".\r\n", b""):
+                    data += chunk[1:] if chunk.startswith(b"..") else chunk
+                with self._lock:
+                    failing = self.fail_next > 0
+                    self.fail_next -= failing
+                    if not failing:
+                        self.messages.append((sender, recipients, bytes(data)))
+                reply("451 4.3.0 Try again later" if failing else "250 OK queued")
+            elif verb in ("RSET", "NOOP"):
+                reply("250 OK")
+            elif verb == "QUIT":
+                reply("221 Bye")
+                return
+            else:
+                reply("502 Command not implemented")
+
+    def parsed(self, index: int = -1):
+        return message_from_bytes(self.messages[index][2])
+
+    def disconnect_all(self) -> None:
+        with self._lock:
+            for sock in list(self._sockets):
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+    def start(self) -> "SMTPStandIn":
+        threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self.disconnect_all()
+
+
+if __name__ == "__main__":
+    server = SMTPStandIn(port=int(sys.argv[1]) if len(sys.argv) > 1 else 1025).start()
+    print(f"SMTP stand-in listening on {server.host}:{server.port}", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
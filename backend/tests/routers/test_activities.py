@@ -1,6 +1,6 @@
 """Endpoint tests for /activities/* — upload, list, detail, delete."""
 
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 import pytest
 
@@ -21,6 +21,17 @@ class TestUploadTcx:
         assert len(data) == 1
         assert data[0]["total_distance"] == 1000
 
+    def test_enqueues_evaluation_job(self, authenticated_client, db_session, test_user):
+        resp = authenticated_client.post(
+            "/activities/upload",
+            files={"file": ("test.tcx", make_tcx(), "application/xml")},
+        )
+        activity_id = resp.json()[0]["id"]
+        job = db_session.query(models.LLMJob).one()
+        assert job.kind == models.LLMJobKind.evaluate_activity
+        assert job.target_id == activity_id
+        assert job.status == models.LLMJobStatus.queued
+
     def test_stores_lightweight_tcx(self, authenticated_client, db_session, test_user):
         tcx = make_tcx()
         resp = authenticated_client.post(
@@ -31,6 +42,41 @@ class TestUploadTcx:
         activity = db_session.query(models.Activity).get(activity_id)
         assert activity.tcx_data is not None
 
+    def test_stores_laps(self, authenticated_client, db_session, test_user):
+        tcx = make_tcx(laps=[
+            {"distance": 1000, "time": 300, "hr": 150, "max_hr": 165, "cadence": 88},
+            {"distance": 1000, "time": 310, "hr": 155, "max_hr": 170, "cadence": 90},
+        ])
+        resp = authenticated_client.post(
+            "/activities/upload",
+            files={"file": ("test.tcx", tcx, "application/xml")},
+        )
+        activity = db_session.query(models.Activity).get(resp.json()[0]["id"])
+        assert [lap["lap_number"] for lap in activity.laps] == [1, 2]
+        assert activity.laps[1]["time"] == 310
+
+    def test_stores_series(self, authenticated_client, db_session, test_user):
+        tcx = make_tcx(trackpoints_per_lap=121)
+        resp = authenticated_client.post(
+            "/activities/upload",
+            files={"file": ("test.tcx", tcx, "application/xml")},
+        )
+        series = db_session.query(models.ActivitySeries).get(resp.json()[0]["id"])
+        assert series.point_count == 3
+        assert series.latitude is not None
+
+    def test_updates_rollups(self, authenticated_client, db_session, test_user):
+        resp = authenticated_client.post(
+            "/activities/upload",
+            files={"file": ("test.tcx", make_tcx(), "application/xml")},
+        )
+        assert resp.status_code == 200
+        month = db_session.query(models.TrainingRollup).filter_by(
+            user_id=test_user.id, period_type="month", period_start=date(2024, 1, 1),
+        ).one()
+        assert month.total_distance == 1000
+        assert month.activity_count == 1
+
     def test_detects_treadmill(self, authenticated_client, db_session, test_user):
         tcx = make_tcx(has_position=False)
         resp = authenticated_client.post(
@@ -77,6 +123,16 @@ class TestUploadTcx:
         )
         assert resp.status_code == 400
 
+    def test_too_large_file_413(self, authenticated_client, db_session, test_user, monkeypatch):
+        monkeypatch.setattr("tcx_parser.MAX_TCX_UPLOAD_SIZE", 1024)
+        tcx = make_tcx(trackpoints_per_lap=50)
+        resp = authenticated_client.post(
+            "/activities/upload",
+            files={"file": ("big.tcx", tcx, "application/xml")},
+        )
+        assert resp.status_code == 413
+        assert db_session.query(models.Activity).count() == 0
+
     def test_unauthenticated(self, client):
         resp = client.post(
             "/activities/upload",
@@ -120,6 +176,48 @@ class TestListActivities:
         resp = authenticated_client.get("/activities/?skip=2&limit=2")
         assert len(resp.json()) == 2
 
+    def test_newest_first(self, authenticated_client, db_session, test_user):
+        for day in (12, 10, 14, 11):
+            make_activity(db_session, test_user, start_time=datetime(2024, 1, day, 10, 0))
+
+        resp = authenticated_client.get("/activities/")
+        days = [datetime.fromisoformat(a["start_time"]).day for a in resp.json()]
+        assert days == [14, 12, 11, 10]
+        assert "X-Next-Cursor" not in resp.headers
+
+    def test_cursor_pages_cover_all_in_order(self, authenticated_client, db_session, test_user):
+        # 같은 start_time이 여러 개여도 id로 순서가 고정된다
+        for i in range(7):
+            make_activity(db_session, test_user, start_time=datetime(2024, 1, 10 + i // 2, 10, 0))
+
+        seen = []
+        resp = authenticated_client.get("/activities/?limit=3")
+        seen += [a["id"] for a in resp.json()]
+        while "X-Next-Cursor" in resp.headers:
+            resp = authenticated_client.get(
+                "/activities/", params={"limit": 3, "cursor": resp.headers["X-Next-Cursor"]},
+            )
+            seen += [a["id"] for a in resp.json()]
+
+        expected = [a["id"] for a in authenticated_client.get("/activities/").json()]
+        assert seen == expected
+        assert len(seen) == 7
+
+    def test_invalid_cursor_400(self, authenticated_client, db_session, test_user):
+        resp = authenticated_client.get("/activities/?cursor=not-a-cursor")
+        assert resp.status_code == 400
+
+    def test_does_not_load_payload_columns(self, authenticated_client, db_session, test_user,
+                                           sql_statements):
+        make_activity(db_session, test_user, tcx_data="<x/>", laps=[])
+        sql_statements.clear()
+
+        resp = authenticated_client.get("/activities/")
+        assert len(resp.json()) == 1
+        activity_selects = [s for s in sql_statements if "FROM activities" in s]
+        assert activity_selects
+        assert not any("tcx_blob" in s or "activities.laps" in s for s in activity_selects)
+
 
 class TestActivityDetail:
     def test_with_laps(self, authenticated_client, db_session, test_user):
@@ -135,6 +233,29 @@ class TestActivityDetail:
         data = resp.json()
         assert len(data["laps"]) == 1
 
+    def test_stored_laps_skip_reparse(self, authenticated_client, db_session, test_user, monkeypatch):
+        laps = [{"lap_number": 1, "distance": 1000, "time": 300, "pace": 300,
+                 "avg_hr": 150, "max_hr": 165, "avg_cadence": 88}]
+        activity = make_activity(db_session, test_user, tcx_data="<unused/>", laps=laps)
+
+        def _fail(_):
+            raise AssertionError("tcx_data must not be re-parsed")
+        monkeypatch.setattr("tcx_parser.parse_laps_from_tcx", _fail)
+
+        resp = authenticated_client.get(f"/activities/{activity.id}")
+        assert resp.status_code == 200
+        assert resp.json()["laps"] == laps
+
+    def test_loads_laps_without_tcx(self, authenticated_client, db_session, test_user,
+                                    sql_statements):
+        activity = make_activity(db_session, test_user, tcx_data="<unused/>", laps=[])
+        db_session.expire_all()
+        sql_statements.clear()
+
+        resp = authenticated_client.get(f"/activities/{activity.id}")
+        assert resp.status_code == 200
+        assert not any("tcx_blob" in s for s in sql_statements)
+
     def test_not_found(self, authenticated_client, db_session, test_user):
         resp = authenticated_client.get("/activities/99999")
         assert resp.status_code == 404
@@ -152,6 +273,37 @@ class TestActivityDetail:
         assert resp.json()["laps"] == []
 
 
+class TestActivitySeries:
+    def test_returns_uploaded_series(self, authenticated_client, db_session, test_user):
+        tcx = make_tcx(trackpoints_per_lap=121)
+        upload = authenticated_client.post(
+            "/activities/upload",
+            files={"file": ("test.tcx", tcx, "application/xml")},
+        )
+        resp = authenticated_client.get(f"/activities/{upload.json()[0]['id']}/series")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["time_offset"] == [0, 60, 120]
+        assert data["distance"] == [0.0, 180.0, 360.0]
+        assert data["latitude"] == [37.5, 37.5, 37.5]
+
+    def test_missing_series_404(self, authenticated_client, db_session, test_user):
+        activity = make_activity(db_session, test_user)
+        resp = authenticated_client.get(f"/activities/{activity.id}/series")
+        assert resp.status_code == 404
+
+    def test_other_users_series_404(self, authenticated_client, db_session, test_user):
+        other = make_user(db_session, email="seriesother@test.com")
+        activity = make_activity(db_session, other)
+        db_session.add(models.ActivitySeries(
+            activity_id=activity.id, point_count=0, time_offset=b"", distance=b"",
+            heart_rate=b"", cadence=b"", altitude=b"",
+        ))
+        db_session.commit()
+        resp = authenticated_client.get(f"/activities/{activity.id}/series")
+        assert resp.status_code == 404
+
+
 class TestReEvaluate:
     def test_success(self, authenticated_client, db_session, test_user):
         activity = make_activity(
@@ -165,6 +317,21 @@ class TestReEvaluate:
         db_session.refresh(activity)
         assert activity.llm_evaluation is None
         assert activity.llm_evaluation_status == models.LLMEvaluationStatus.pending
+        job = db_session.query(models.LLMJob).one()
+        assert (job.kind, job.target_id) == (models.LLMJobKind.evaluate_activity, activity.id)
+        assert job.bypass_cache is False
+
+    def test_bypass_cache(self, authenticated_client, db_session, test_user):
+        activity = make_activity(db_session, test_user)
+        resp = authenticated_client.post(f"/activities/{activity.id}/evaluate?bypass_cache=true")
+        assert resp.status_code == 200
+        assert db_session.query(models.LLMJob).one().bypass_cache is True
+
+    def test_repeated_request_reuses_queued_job(self, authenticated_client, db_session, test_user):
+        activity = make_activity(db_session, test_user)
+        for _ in range(2):
+            assert authenticated_client.post(f"/activities/{activity.id}/evaluate").status_code == 200
+        assert db_session.query(models.LLMJob).count() == 1
 
     def test_not_found(self, authenticated_client, db_session, test_user):
         resp = authenticated_client.post("/activities/99999/evaluate")
@@ -180,6 +347,18 @@ class TestDeleteActivity:
         deleted = db_session.query(models.Activity).get(activity.id)
         assert deleted is None
 
+    def test_removes_from_rollups(self, authenticated_client, db_session, test_user):
+        keep = make_activity(db_session, test_user, start_time=datetime(2024, 1, 15, 10, 0))
+        gone = make_activity(db_session, test_user, start_time=datetime(2024, 1, 16, 10, 0))
+
+        authenticated_client.delete(f"/activities/{gone.id}")
+
+        rows = db_session.query(models.TrainingRollup).filter_by(user_id=test_user.id).all()
+        assert {r.period_type: r.activity_count for r in rows} == {
+            "day": 1, "week": 1, "month": 1, "year": 1,
+        }
+        assert all(r.total_distance == keep.total_distance for r in rows)
+
     def test_not_found(self, authenticated_client, db_session, test_user):
         resp = authenticated_client.delete("/activities/99999")
         assert resp.status_code == 404
@@ -7,6 +7,7 @@ from freezegun import freeze_time
 
 import models
 from tests.fixtures.sample_data import make_user, make_activity, make_race
+from tests.fixtures.sample_tcx import make_tcx
 
 
 @freeze_time("2024-01-15 12:00:00")
@@ -50,6 +51,67 @@ class TestDashboard:
         assert running["2024-01-10"]["distance_km"] == 10.0
         assert running["2024-01-01"]["distance_km"] == 0
 
+    def test_monthly_running_sums_same_day(self, authenticated_client, db_session, test_user):
+        make_activity(db_session, test_user, start_time=datetime(2024, 1, 5, 7, 0),
+                      total_distance=5000, avg_pace=300)
+        make_activity(db_session, test_user, start_time=datetime(2024, 1, 5, 19, 0),
+                      total_distance=3000, avg_pace=360)
+        # 페이스 0은 평균에서 제외
+        make_activity(db_session, test_user, start_time=datetime(2024, 1, 5, 21, 0),
+                      total_distance=500, avg_pace=0)
+
+        resp = authenticated_client.get("/dashboard/")
+        running = {d["date"]: d for d in resp.json()["monthly_running"]}
+        assert running["2024-01-05"]["distance_km"] == 8.5
+        assert running["2024-01-05"]["avg_pace"] == 330.0
+
+    def test_monthly_running_excludes_other_months(self, authenticated_client, db_session, test_user):
+        make_activity(db_session, test_user, start_time=datetime(2023, 12, 31, 23, 0))
+        make_activity(db_session, test_user, start_time=datetime(2024, 2, 1, 0, 0))
+
+        resp = authenticated_client.get("/dashboard/")
+        assert all(d["distance_km"] == 0 for d in resp.json()["monthly_running"])
+
+    def test_monthly_running_for_requested_month(self, authenticated_client, db_session, test_user):
+        make_activity(db_session, test_user, start_time=datetime(2023, 2, 14, 7, 0),
+                      total_distance=7000, avg_pace=310)
+
+        resp = authenticated_client.get("/dashboard/?year=2023&month=2")
+        running = resp.json()["monthly_running"]
+        assert len(running) == 28
+        assert running[13] == {"date": "2023-02-14", "distance_km": 7.0, "avg_pace": 310.0}
+
+    def test_invalid_month_422(self, authenticated_client, db_session, test_user):
+        resp = authenticated_client.get("/dashboard/?month=13")
+        assert resp.status_code == 422
+
+    def test_period_totals(self, authenticated_client, db_session, test_user):
+        # 2024-01-15(월) 기준 이번 주
+        make_activity(db_session, test_user, start_time=datetime(2024, 1, 15, 7, 0),
+                      total_distance=10000, total_time=3000, avg_pace=300, avg_hr=150,
+                      is_treadmill=True)
+        make_activity(db_session, test_user, start_time=datetime(2024, 1, 3, 7, 0),
+                      total_distance=5000, total_time=1800, avg_pace=360, avg_hr=None)
+        make_activity(db_session, test_user, start_time=datetime(2023, 12, 3, 7, 0),
+                      total_distance=4000)
+
+        data = authenticated_client.get("/dashboard/").json()
+
+        assert data["weekly_total"]["period_start"] == "2024-01-15"
+        assert data["weekly_total"]["distance_km"] == 10.0
+        assert data["monthly_total"]["activity_count"] == 2
+        assert data["monthly_total"]["avg_pace"] == 330.0
+        assert data["monthly_total"]["avg_hr"] == 150.0
+        assert data["monthly_total"]["treadmill_ratio"] == 0.5
+        assert data["yearly_total"]["distance_km"] == 15.0
+
+    def test_period_totals_empty(self, authenticated_client, db_session, test_user):
+        data = authenticated_client.get("/dashboard/?year=2020&month=5").json()
+        assert data["monthly_total"] == {
+            "period_start": "2020-05-01", "distance_km": 0, "total_time": 0,
+            "activity_count": 0, "avg_pace": None, "avg_hr": None, "treadmill_ratio": 0,
+        }
+
     def test_recent_activities_max_5(self, authenticated_client, db_session, test_user):
         for i in range(7):
             make_activity(db_session, test_user,
@@ -59,6 +121,79 @@ class TestDashboard:
         data = resp.json()
         assert len(data["recent_activities"]) == 5
 
+    def test_does_not_load_payload_columns(self, authenticated_client, db_session, test_user,
+                                           sql_statements):
+        make_activity(db_session, test_user, start_time=datetime(2024, 1, 5, 7, 0),
+                      tcx_data="<x/>", laps=[])
+        sql_statements.clear()
+
+        authenticated_client.get("/dashboard/")
+        assert not any("tcx_blob" in s or "activities.laps" in s for s in sql_statements)
+
+    def test_second_request_served_from_cache(self, authenticated_client, db_session, test_user,
+                                              sql_statements):
+        make_activity(db_session, test_user, start_time=datetime(2024, 1, 5, 7, 0))
+        first = authenticated_client.get("/dashboard/")
+        sql_statements.clear()
+
+        second = authenticated_client.get("/dashboard/")
+
+        assert second.json() == first.json()
+        # 인증용 사용자 조회 외에는 쿼리가 없어야 한다
+        assert not any("FROM activities" in s or "FROM training_rollups" in s or "FROM races" in s
+                       for s in sql_statements)
+
+    def test_cache_is_per_month(self, authenticated_client, db_session, test_user):
+        authenticated_client.get("/dashboard/")
+        resp = authenticated_client.get("/dashboard/?year=2023&month=2")
+        assert len(resp.json()["monthly_running"]) == 28
+
+    def test_activity_upload_and_delete_invalidate(self, authenticated_client, db_session, test_user):
+        assert authenticated_client.get("/dashboard/").json()["recent_activities"] == []
+
+        upload = authenticated_client.post(
+            "/activities/upload",
+            files={"file": ("test.tcx", make_tcx(start_time="2024-01-10T07:00:00.000Z"), "application/xml")},
+        )
+        activity_id = upload.json()[0]["id"]
+        data = authenticated_client.get("/dashboard/").json()
+        assert [a["id"] for a in data["recent_activities"]] == [activity_id]
+        assert data["monthly_total"]["activity_count"] == 1
+
+        authenticated_client.delete(f"/activities/{activity_id}")
+        data = authenticated_client.get("/dashboard/").json()
+        assert data["recent_activities"] == []
+        assert data["monthly_total"]["activity_count"] == 0
+
+    def test_race_writes_invalidate(self, authenticated_client, db_session, test_user,
+                                    tmp_path, monkeypatch):
+        monkeypatch.setattr("routers.races.UPLOAD_DIR", str(tmp_path))
+        assert authenticated_client.get("/dashboard/").json()["upcoming_races"] == []
+
+        race_id = authenticated_client.post("/races/", json={
+            "race_name": "서울 마라톤", "race_date": "2024-04-15T08:00:00",
+            "distance_type": "full",
+        }).json()["id"]
+        races = authenticated_client.get("/dashboard/").json()["upcoming_races"]
+        assert [r["race_name"] for r in races] == ["서울 마라톤"]
+
+        authenticated_client.put(f"/races/{race_id}", json={"race_name": "부산 마라톤"})
+        races = authenticated_client.get("/dashboard/").json()["upcoming_races"]
+        assert races[0]["race_name"] == "부산 마라톤"
+
+        image = authenticated_client.post(
+            f"/races/{race_id}/images",
+            files={"file": ("photo.jpg", b"\xff\xd8\xff\xe0" + b"\x00" * 100, "image/jpeg")},
+        ).json()
+        races = authenticated_client.get("/dashboard/").json()["upcoming_races"]
+        assert [i["id"] for i in races[0]["images"]] == [image["id"]]
+
+        authenticated_client.delete(f"/races/{race_id}/images/{image['id']}")
+        assert authenticated_client.get("/dashboard/").json()["upcoming_races"][0]["images"] == []
+
+        authenticated_client.put(f"/races/{race_id}/result", json={"status": "완주"})
+        assert authenticated_client.get("/dashboard/").json()["upcoming_races"] == []
+
     def test_unauthenticated(self, client):
         resp = client.get("/dashboard/")
         assert resp.status_code == 401
@@ -19,6 +19,9 @@ class TestCreatePlan:
         assert data["generation_status"] == "pending"
         assert data["session_count"] == 0
 
+        job = db_session.query(models.LLMJob).one()
+        assert (job.kind, job.target_id) == (models.LLMJobKind.generate_plan, data["id"])
+
 
 class TestListPlans:
     def test_list(self, authenticated_client, db_session, test_user):
@@ -100,6 +103,36 @@ class TestDeletePlan:
         assert resp.status_code == 404
 
 
+class TestRegeneratePlan:
+    def test_success(self, authenticated_client, db_session, test_user):
+        plan = make_plan(
+            db_session, test_user,
+            llm_plan_text="old",
+            generation_status=models.LLMEvaluationStatus.completed,
+        )
+        make_plan_session(db_session, plan)
+        resp = authenticated_client.post(f"/plans/{plan.id}/regenerate")
+        assert resp.status_code == 200
+
+        db_session.refresh(plan)
+        assert plan.llm_plan_text is None
+        assert plan.generation_status == models.LLMEvaluationStatus.pending
+        assert plan.sessions == []
+        job = db_session.query(models.LLMJob).one()
+        assert (job.kind, job.target_id) == (models.LLMJobKind.generate_plan, plan.id)
+        assert job.bypass_cache is False
+
+    def test_bypass_cache(self, authenticated_client, db_session, test_user):
+        plan = make_plan(db_session, test_user)
+        resp = authenticated_client.post(f"/plans/{plan.id}/regenerate?bypass_cache=true")
+        assert resp.status_code == 200
+        assert db_session.query(models.LLMJob).one().bypass_cache is True
+
+    def test_not_found(self, authenticated_client, db_session, test_user):
+        resp = authenticated_client.post("/plans/99999/regenerate")
+        assert resp.status_code == 404
+
+
 class TestPlanSessions:
     def test_get_sessions(self, authenticated_client, db_session, test_user):
         plan = make_plan(db_session, test_user)
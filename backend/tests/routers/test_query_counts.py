@@ -0,0 +1,58 @@
+"""Query-count regression tests — list endpoints must not issue per-row queries (N+1).
+
+Each endpoint is called with 1 and with 5 rows; the number of SQL statements
+must be the same fixed value in both cases. Counts include the user lookup
+done by auth.get_current_user.
+"""
+
+from datetime import date, datetime
+
+import pytest
+from freezegun import freeze_time
+
+import models
+from tests.fixtures.sample_data import make_activity, make_plan, make_plan_session, make_race
+
+
+def _make_races(db_session, user, n: int) -> None:
+    for i in range(n):
+        activity = make_activity(db_session, user, start_time=datetime(2024, 1, 1 + i, 7, 0))
+        race = make_race(db_session, user, race_name=f"Race {i}",
+                         race_date=datetime(2024, 2, 1 + i, 8, 0), activity_id=activity.id)
+        for j in range(2):
+            db_session.add(models.RaceImage(
+                race_id=race.id, filename=f"{i}-{j}.jpg", original_name=f"{j}.jpg",
+                uploaded_at=datetime(2024, 1, 1),
+            ))
+    db_session.commit()
+    db_session.expire_all()
+
+
+@pytest.mark.parametrize("n", [1, 5])
+class TestFixedQueryCount:
+    def test_list_races(self, authenticated_client, db_session, test_user, assert_query_count, n):
+        _make_races(db_session, test_user, n)
+        # user + races + images(selectin) + activities(selectin)
+        with assert_query_count(4):
+            resp = authenticated_client.get("/races/")
+        assert len(resp.json()) == n
+        assert all(len(r["images"]) == 2 and r["activity"] for r in resp.json())
+
+    @freeze_time("2024-01-15 12:00:00")
+    def test_dashboard(self, authenticated_client, db_session, test_user, assert_query_count, n):
+        _make_races(db_session, test_user, n)
+        # user + races + images + activities + rollups + recent activities
+        with assert_query_count(6):
+            resp = authenticated_client.get("/dashboard/")
+        assert len(resp.json()["upcoming_races"]) == min(n, 2)
+
+    def test_list_plans(self, authenticated_client, db_session, test_user, assert_query_count, n):
+        for i in range(n):
+            plan = make_plan(db_session, test_user)
+            for d in range(3):
+                make_plan_session(db_session, plan, session_date=date(2024, 1, 15 + d))
+        db_session.expire_all()
+        # user + plans with session counts
+        with assert_query_count(2):
+            resp = authenticated_client.get("/plans/")
+        assert [p["session_count"] for p in resp.json()] == [3] * n
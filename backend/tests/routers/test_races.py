@@ -145,6 +145,17 @@ class TestRaceTcxUpload:
         )
         assert resp.status_code == 400
 
+    def test_too_large_tcx(self, authenticated_client, db_session, test_user, monkeypatch):
+        monkeypatch.setattr("tcx_parser.MAX_TCX_UPLOAD_SIZE", 1024)
+        race = make_race(db_session, test_user)
+        tcx = make_tcx(trackpoints_per_lap=50)
+
+        resp = authenticated_client.post(
+            f"/races/{race.id}/upload-tcx",
+            files={"file": ("race.tcx", tcx, "application/xml")},
+        )
+        assert resp.status_code == 413
+
 
 class TestRaceImages:
     def test_upload_image(self, authenticated_client, db_session, test_user, tmp_path, monkeypatch):
@@ -1,9 +1,12 @@
 """Endpoint tests for /users/* — registration, login, profile, password."""
 
 from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+from urllib.parse import parse_qs, urlparse
 
 import pytest
 
+import auth
 import models
 from tests.fixtures.sample_data import make_user
 
@@ -64,6 +67,20 @@ class TestLogin:
         })
         assert resp.status_code == 401
 
+    def test_rehashes_password_when_cost_changes(self, client, db_session):
+        from passlib.context import CryptContext
+
+        old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("OldCost123!")
+        user = make_user(db_session, email="oldcost@test.com", password=None)
+        user.hashed_password = old_hash
+        db_session.commit()
+
+        resp = client.post("/users/token", data={"username": user.email, "password": "OldCost123!"})
+        assert resp.status_code == 200
+        db_session.refresh(user)
+        assert user.hashed_password != old_hash
+        assert auth.verify_password("OldCost123!", user.hashed_password)
+
     def test_google_only_account_no_password(self, client, db_session):
         make_user(db_session, email="google@test.com", password=None, google_id="g123")
         resp = client.post("/users/token", data={
@@ -73,6 +90,74 @@ class TestLogin:
         assert resp.status_code == 401
 
 
+class TestRefreshToken:
+    def _login(self, client, test_user):
+        resp = client.post("/users/token", data={
+            "username": test_user.email, "password": "TestPass123!",
+        })
+        return resp.json()["refresh_token"]
+
+    def _refresh(self, client, token):
+        return client.post("/users/token/refresh", json={"refresh_token": token})
+
+    def test_login_issues_hashed_refresh_token(self, client, db_session, test_user):
+        token = self._login(client, test_user)
+        stored = db_session.query(models.RefreshToken).one()
+        assert stored.user_id == test_user.id
+        assert stored.token_hash != token
+
+    def test_refresh_rotates_token(self, client, db_session, test_user):
+        token = self._login(client, test_user)
+
+        resp = self._refresh(client, token)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["refresh_token"] != token
+        me = client.get("/users/me", headers={"Authorization": f"Bearer {data['access_token']}"})
+        assert me.json()["email"] == test_user.email
+
+    def test_reuse_revokes_family(self, client, db_session, test_user):
+        first = self._login(client, test_user)
+        second = self._refresh(client, first).json()["refresh_token"]
+
+        assert self._refresh(client, first).status_code == 401
+        assert self._refresh(client, second).status_code == 401
+
+    def test_expired_token_rejected(self, client, db_session, test_user):
+        token = self._login(client, test_user)
+        db_session.query(models.RefreshToken).update(
+            {models.RefreshToken.expires_at: datetime.utcnow() - timedelta(minutes=1)}
+        )
+        db_session.commit()
+        assert self._refresh(client, token).status_code == 401
+
+    def test_unknown_token_rejected(self, client):
+        assert self._refresh(client, "not-a-token").status_code == 401
+
+    def test_password_change_revokes_tokens(self, authenticated_client, client, test_user):
+        token = self._login(client, test_user)
+        authenticated_client.put("/users/me/password", json={
+            "current_password": "TestPass123!",
+            "new_password": "NewPass456!",
+        })
+        assert self._refresh(client, token).status_code == 401
+
+    def test_revoke_logs_out_refresh_token(self, client, db_session, test_user):
+        first = self._login(client, test_user)
+        second = self._refresh(client, first).json()["refresh_token"]
+        other_login = self._login(client, test_user)
+
+        resp = client.post("/users/token/revoke", json={"refresh_token": second})
+        assert resp.status_code == 204
+        assert self._refresh(client, second).status_code == 401
+        # 다른 기기의 로그인은 유지된다
+        assert self._refresh(client, other_login).status_code == 200
+
+    def test_revoke_unknown_token_is_noop(self, client):
+        resp = client.post("/users/token/revoke", json={"refresh_token": "not-a-token"})
+        assert resp.status_code == 204
+
+
 class TestProfile:
     def test_get_profile(self, authenticated_client, test_user):
         resp = authenticated_client.get("/users/me")
@@ -97,6 +182,13 @@ class TestProfile:
         assert data["nickname"] == "Updated"
         assert data["birth_year"] == 1985
 
+    def test_update_invalidates_cached_user(self, authenticated_client, test_user):
+        assert authenticated_client.get("/users/me").json()["nickname"] == test_user.nickname
+        authenticated_client.put("/users/me", json={
+            "nickname": "Updated", "birth_year": 1985, "birth_month": 12, "gender": "여성",
+        })
+        assert authenticated_client.get("/users/me").json()["nickname"] == "Updated"
+
 
 class TestChangePassword:
     def test_success(self, authenticated_client, test_user):
@@ -143,7 +235,9 @@ class TestForgotResetPassword:
         resp = client.post("/users/forgot-password", json={"email": "nobody@test.com"})
         assert resp.status_code == 200  # Same response to prevent email enumeration
 
-    def test_reset_valid_token(self, client, db_session, test_user):
+    def test_reset_valid_token(self, client, db_session, test_user, auth_token):
+        auth.get_current_user(token=auth_token, db=db_session)  # 캐시 채우기
+        auth.issue_refresh_token(db_session, test_user.id)
         db_token = models.PasswordResetToken(
             user_id=test_user.id,
             token="validtoken123",
@@ -161,6 +255,8 @@ class TestForgotResetPassword:
 
         db_session.refresh(db_token)
         assert db_token.used is True
+        assert auth.user_cache.get(test_user.email) is None
+        assert db_session.query(models.RefreshToken).one().revoked_at is not None
 
     def test_reset_expired_token(self, client, db_session, test_user):
         db_token = models.PasswordResetToken(
@@ -213,3 +309,24 @@ class TestGoogleOAuth:
         resp = client.get("/users/auth/google", follow_redirects=False)
         assert resp.status_code == 307
         assert "accounts.google.com" in resp.headers["location"]
+
+    def test_google_callback_issues_refresh_token(self, client, db_session, monkeypatch):
+        monkeypatch.setattr("routers.users.GOOGLE_CLIENT_ID", "test-client-id")
+        monkeypatch.setattr("routers.users.GOOGLE_CLIENT_SECRET", "test-secret")
+        user = make_user(db_session, email="g@test.com", password=None, google_id="g789")
+        google = MagicMock()
+        google.post = AsyncMock(return_value=MagicMock(json=lambda: {"access_token": "google-token"}))
+        google.get = AsyncMock(return_value=MagicMock(json=lambda: {"sub": "g789", "email": "g@test.com"}))
+        google.__aenter__ = AsyncMock(return_value=google)
+        google.__aexit__ = AsyncMock(return_value=False)
+
+        with patch("routers.users.httpx.AsyncClient", return_value=google):
+            resp = client.get("/users/auth/google/callback?code=abc", follow_redirects=False)
+
+        assert resp.status_code == 307
+        params = parse_qs(urlparse(resp.headers["location"]).query)
+        assert params["token"]
+        assert db_session.query(models.RefreshToken).filter_by(user_id=user.id).count() == 1
+        # 비밀번호 로그인과 같은 방식으로 회전할 수 있다
+        refreshed = client.post("/users/token/refresh", json={"refresh_token": params["refresh_token"][0]})
+        assert refreshed.status_code == 200
@@ -0,0 +1,50 @@
+"""Unit tests for services/activity_series.py."""
+
+import pytest
+
+from services import activity_series
+
+
+def _series(**overrides):
+    series = {
+        "time_offset": [0, 60, 120],
+        "distance": [0.0, 180.5, 361.0],
+        "heart_rate": [140.0, None, 152.0],
+        "cadence": [85.0, 86.0, 87.0],
+        "altitude": [None, None, None],
+        "latitude": [37.5, 37.500123456789, 37.5002],
+        "longitude": [127.0, 127.000123456789, 127.0002],
+    }
+    series.update(overrides)
+    return series
+
+
+class TestPackSeries:
+    def test_round_trip(self):
+        row = activity_series.pack_series(_series())
+        result = activity_series.unpack_series(row)
+
+        assert result["point_count"] == 3
+        assert result["time_offset"] == [0, 60, 120]
+        assert result["heart_rate"] == [140.0, None, 152.0]
+        assert result["altitude"] == [None, None, None]
+        assert result["distance"] == pytest.approx([0.0, 180.5, 361.0])
+        # 위경도는 float64로 저장해 정밀도를 유지한다
+        assert result["latitude"] == [37.5, 37.500123456789, 37.5002]
+
+    def test_compact_fixed_width_columns(self):
+        row = activity_series.pack_series(_series())
+        assert len(row.time_offset) == 3 * 4
+        assert len(row.heart_rate) == 3 * 4
+        assert len(row.latitude) == 3 * 8
+
+    def test_missing_position_is_null(self):
+        row = activity_series.pack_series(_series(latitude=[None] * 3, longitude=[None] * 3))
+        assert row.latitude is None
+        assert activity_series.unpack_series(row)["longitude"] is None
+
+    def test_empty_series(self):
+        row = activity_series.pack_series({name: [] for name in activity_series.SERIES_TYPECODES})
+        result = activity_series.unpack_series(row)
+        assert result["point_count"] == 0
+        assert result["time_offset"] == []
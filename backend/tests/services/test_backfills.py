@@ -0,0 +1,132 @@
+"""Unit tests for services/backfills.py."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import inspect, text
+
+import models
+import tcx_parser
+from services import activity_series, backfills
+from tests.fixtures.sample_data import make_activity
+from tests.fixtures.sample_tcx import make_tcx
+
+
+class TestCompressLegacyTcx:
+    def test_moves_text_into_blob_and_drops_column(self, db_session, test_user):
+        db_session.execute(text("ALTER TABLE activities ADD COLUMN tcx_data TEXT NULL"))
+        lightweight = tcx_parser.create_lightweight_tcx(make_tcx())
+        activity_ids = [make_activity(db_session, test_user).id for _ in range(3)]
+        empty_id = make_activity(db_session, test_user).id
+        db_session.execute(
+            text("UPDATE activities SET tcx_data = :tcx WHERE id IN (:a, :b, :c)"),
+            {"tcx": lightweight, "a": activity_ids[0], "b": activity_ids[1], "c": activity_ids[2]},
+        )
+
+        converted = backfills.compress_legacy_tcx(db_session, batch_size=2)
+
+        assert converted == 3
+        columns = {c["name"] for c in inspect(db_session.connection()).get_columns("activities")}
+        assert "tcx_data" not in columns
+        db_session.expire_all()
+        for activity_id in activity_ids:
+            assert db_session.query(models.Activity).get(activity_id).tcx_data == lightweight
+        assert db_session.query(models.Activity).get(empty_id).tcx_blob is None
+
+    def test_noop_without_legacy_column(self, db_session, test_user):
+        assert backfills.compress_legacy_tcx(db_session) == 0
+
+
+class TestBackfillActivityLaps:
+    def test_fills_missing_laps_from_tcx(self, db_session, test_user):
+        lightweight = tcx_parser.create_lightweight_tcx(make_tcx(laps=[
+            {"distance": 1000, "time": 300, "hr": 150},
+            {"distance": 500, "time": 160},
+        ]))
+        activity_ids = [
+            make_activity(db_session, test_user, tcx_data=lightweight).id
+            for _ in range(3)
+        ]
+
+        filled = backfills.backfill_activity_laps(db_session, batch_size=2)
+
+        assert filled == 3
+        for activity_id in activity_ids:
+            stored = db_session.query(models.Activity).get(activity_id)
+            assert [lap["distance"] for lap in stored.laps] == [1000, 500]
+
+    def test_skips_rows_without_tcx_or_with_laps(self, db_session, test_user):
+        make_activity(db_session, test_user, tcx_data=None)
+        make_activity(db_session, test_user, tcx_data="<x/>", laps=[])
+
+        assert backfills.backfill_activity_laps(db_session) == 0
+
+    def test_corrupt_tcx_does_not_stop_batch(self, db_session, test_user):
+        bad_id = make_activity(db_session, test_user, tcx_data="not xml").id
+        good_id = make_activity(
+            db_session, test_user,
+            tcx_data=tcx_parser.create_lightweight_tcx(make_tcx()),
+        ).id
+
+        assert backfills.backfill_activity_laps(db_session) == 1
+        assert db_session.query(models.Activity).get(bad_id).laps is None
+        assert len(db_session.query(models.Activity).get(good_id).laps) == 1
+
+
+class TestBackfillActivitySeries:
+    def test_fills_missing_series_from_lightweight_tcx(self, db_session, test_user):
+        lightweight = tcx_parser.create_lightweight_tcx(make_tcx(trackpoints_per_lap=121))
+        activity_ids = [
+            make_activity(db_session, test_user, tcx_data=lightweight).id
+            for _ in range(3)
+        ]
+
+        filled = backfills.backfill_activity_series(db_session, batch_size=2)
+
+        assert filled == 3
+        for activity_id in activity_ids:
+            row = db_session.query(models.ActivitySeries).get(activity_id)
+            assert activity_series.unpack_series(row)["time_offset"] == [0, 60, 120]
+            # 경량 TCX에는 위경도가 없다
+            assert row.latitude is None
+
+    def test_skips_rows_with_series(self, db_session, test_user):
+        activity_id = make_activity(
+            db_session, test_user,
+            tcx_data=tcx_parser.create_lightweight_tcx(make_tcx()),
+        ).id
+        backfills.backfill_activity_series(db_session)
+        assert backfills.backfill_activity_series(db_session) == 0
+        assert db_session.query(models.ActivitySeries).get(activity_id) is not None
+
+    def test_corrupt_tcx_does_not_stop_batch(self, db_session, test_user):
+        make_activity(db_session, test_user, tcx_data="not xml")
+        make_activity(
+            db_session, test_user,
+            tcx_data=tcx_parser.create_lightweight_tcx(make_tcx()),
+        )
+        assert backfills.backfill_activity_series(db_session) == 1
+
+
+class TestMain:
+    @pytest.fixture()
+    def steps(self):
+        steps = {"first": MagicMock(return_value=1), "second": MagicMock(return_value=0)}
+        with (
+            patch.dict(backfills.BACKFILLS, steps, clear=True),
+            patch("services.backfills.SessionLocal"),
+        ):
+            yield steps
+
+    def test_runs_every_backfill_by_default(self, steps):
+        backfills.main([])
+        assert steps["first"].called and steps["second"].called
+
+    def test_runs_only_named_backfills(self, steps):
+        backfills.main(["second"])
+        assert not steps["first"].called
+        assert steps["second"].called
+
+    def test_rejects_unknown_name(self, steps):
+        with pytest.raises(SystemExit):
+            backfills.main(["nope"])
@@ -0,0 +1,93 @@
+"""Unit tests for services/cache.py."""
+
+from unittest.mock import patch
+
+from services import cache
+
+
+class TestMemoryBackend:
+    def test_get_set(self):
+        backend = cache.MemoryBackend()
+        backend.set("a", "1", ttl=60)
+        assert backend.get("a") == "1"
+        assert backend.get("missing") is None
+
+    def test_ttl_expiry(self):
+        backend = cache.MemoryBackend()
+        with patch("services.cache.time.monotonic", return_value=1000.0):
+            backend.set("a", "1", ttl=10)
+        with patch("services.cache.time.monotonic", return_value=1009.9):
+            assert backend.get("a") == "1"
+        with patch("services.cache.time.monotonic", return_value=1010.0):
+            assert backend.get("a") is None
+
+    def test_lru_eviction(self):
+        backend = cache.MemoryBackend(max_entries=2)
+        backend.set("a", "1", ttl=60)
+        backend.set("b", "2", ttl=60)
+        backend.get("a")  # a가 최근 사용
+        backend.set("c", "3", ttl=60)
+        assert backend.get("b") is None
+        assert backend.get("a") == "1"
+        assert backend.get("c") == "3"
+
+    def test_counters_survive_eviction(self):
+        backend = cache.MemoryBackend(max_entries=1)
+        backend.incr("gen")
+        backend.set("a", "1", ttl=60)
+        backend.set("b", "2", ttl=60)
+        assert backend.counter("gen") == 1
+        assert backend.incr("gen") == 2
+
+
+class TestUserScopedCache:
+    def test_invalidate_hides_all_keys_of_user(self):
+        scoped = cache.UserScopedCache("test", ttl=60)
+        for key in ("2024-01", "2024-02"):
+            scoped.set(scoped.make_key(1, key), key)
+        scoped.set(scoped.make_key(2, "2024-01"), "other")
+
+        scoped.invalidate(1)
+
+        assert scoped.get(scoped.make_key(1, "2024-01")) is None
+        assert scoped.get(scoped.make_key(1, "2024-02")) is None
+        assert scoped.get(scoped.make_key(2, "2024-01")) == "other"
+
+    def test_value_computed_across_invalidation_is_not_served(self):
+        scoped = cache.UserScopedCache("test", ttl=60)
+        key = scoped.make_key(1, "k")
+        scoped.invalidate(1)  # 값 계산 도중 쓰기가 일어난 경우
+        scoped.set(key, "stale")
+        assert scoped.get(scoped.make_key(1, "k")) is None
+
+
+class TestLocalCache:
+    def test_get_set_keeps_object(self):
+        local = cache.LocalCache(ttl=60, max_entries=10)
+        value = {"id": 1}
+        local.set("a", value, local.version("a"))
+        assert local.get("a") is value
+        assert local.get("missing") is None
+
+    def test_invalidate_drops_entry(self):
+        local = cache.LocalCache(ttl=60, max_entries=10)
+        local.set("a", 1, local.version("a"))
+        local.invalidate("a")
+        assert local.get("a") is None
+
+    def test_value_computed_across_invalidation_is_not_stored(self):
+        local = cache.LocalCache(ttl=60, max_entries=10)
+        version = local.version("a")
+        local.invalidate("a")  # 값 계산 도중 쓰기가 일어난 경우
+        local.set("a", "stale", version)
+        assert local.get("a") is None
+
+    def test_ttl_and_lru(self):
+        local = cache.LocalCache(ttl=10, max_entries=2)
+        with patch("services.cache.time.monotonic", return_value=1000.0):
+            for key in ("a", "b", "c"):
+                local.set(key, key, 0)
+            assert local.get("a") is None
+            assert local.get("b") == "b"
+        with patch("services.cache.time.monotonic", return_value=1010.0):
+            assert local.get("c") is None
@@ -0,0 +1,316 @@
+"""Unit tests for services/jobs.py — LLM job queue claim, retry, reaper and worker loop."""
+
+import threading
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import mysql
+from sqlalchemy.exc import OperationalError
+
+import models
+from services import jobs
+from tests.fixtures.sample_data import make_activity, make_plan
+from tests.fixtures.sessions import NoCloseSession
+
+
+class _SessionContext(NoCloseSession):
+    """NoCloseSession usable as `with SessionLocal() as db`."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+@pytest.fixture()
+def job_session(db_session):
+    """Route services.jobs' own sessions to the test session."""
+    with patch("services.jobs.SessionLocal", return_value=_SessionContext(db_session)):
+        yield db_session
+
+
+def _enqueue(db_session, target_id, kind=models.LLMJobKind.evaluate_activity, **fields):
+    job = jobs.enqueue(db_session, kind, target_id)
+    for name, value in fields.items():
+        setattr(job, name, value)
+    db_session.commit()
+    return job
+
+
+def _run_with_handler(job_id, handler):
+    with patch("services.jobs._handlers", return_value={
+        models.LLMJobKind.evaluate_activity: handler,
+        models.LLMJobKind.generate_plan: handler,
+    }):
+        jobs.run_job(job_id)
+
+
+class TestClaim:
+    def test_claims_queued_jobs_in_order(self, db_session):
+        first = _enqueue(db_session, 1, run_after=datetime.utcnow() - timedelta(minutes=2))
+        second = _enqueue(db_session, 2, run_after=datetime.utcnow() - timedelta(minutes=1))
+
+        claimed = jobs.claim(db_session, "w1", limit=1)
+
+        assert claimed == [first.id]
+        assert first.status == models.LLMJobStatus.processing
+        assert first.attempts == 1
+        assert first.locked_by == "w1"
+        assert second.status == models.LLMJobStatus.queued
+
+    def test_skips_backoff_and_processing_jobs(self, db_session):
+        _enqueue(db_session, 1, run_after=datetime.utcnow() + timedelta(minutes=5))
+        _enqueue(db_session, 2, status=models.LLMJobStatus.processing)
+        assert jobs.claim(db_session, "w1", limit=10) == []
+
+    def test_mysql_claim_uses_skip_locked(self):
+        sql = str(jobs.claimable_query(5).compile(dialect=mysql.dialect()))
+        assert "FOR UPDATE SKIP LOCKED" in sql
+
+
+class TestEnqueue:
+    def test_reuses_active_job_for_same_target(self, db_session):
+        queued = _enqueue(db_session, 1)
+        again = jobs.enqueue(db_session, models.LLMJobKind.evaluate_activity, 1, bypass_cache=True)
+        db_session.commit()
+
+        assert again is queued
+        assert queued.bypass_cache is True
+        assert db_session.query(models.LLMJob).count() == 1
+        # 다른 종류의 작업은 별개
+        jobs.enqueue(db_session, models.LLMJobKind.generate_plan, 1)
+        db_session.commit()
+        assert db_session.query(models.LLMJob).count() == 2
+
+    def test_processing_job_is_reused_as_is(self, db_session):
+        running = _enqueue(db_session, 1, status=models.LLMJobStatus.processing)
+        assert jobs.enqueue(db_session, models.LLMJobKind.evaluate_activity, 1, bypass_cache=True) is running
+        assert running.bypass_cache is False
+
+    def test_finished_jobs_do_not_block_new_job(self, db_session):
+        done = _enqueue(db_session, 1, status=models.LLMJobStatus.completed)
+        assert jobs.enqueue(db_session, models.LLMJobKind.evaluate_activity, 1) is not done
+
+
+class TestRunJob:
+    def test_success_completes(self, job_session, test_user):
+        activity = make_activity(job_session, test_user)
+        job = _enqueue(job_session, activity.id)
+        jobs.claim(job_session, "w1", limit=1)
+        handler = MagicMock(return_value=True)
+
+        _run_with_handler(job.id, handler)
+
+        handler.assert_called_once_with(activity.id, final_attempt=False, bypass_cache=False)
+        job_session.refresh(job)
+        assert job.status == models.LLMJobStatus.completed
+        assert job.locked_by is None
+        assert job.finished_at is not None
+
+    def test_failure_schedules_retry_with_backoff(self, job_session, test_user):
+        activity = make_activity(job_session, test_user)
+        job = _enqueue(job_session, activity.id)
+        jobs.claim(job_session, "w1", limit=1)
+
+        before = datetime.utcnow()
+        _run_with_handler(job.id, MagicMock(side_effect=RuntimeError("rate limited")))
+
+        job_session.refresh(job)
+        assert job.status == models.LLMJobStatus.queued
+        assert job.run_after >= before + jobs.retry_delay(1)
+        assert "rate limited" in job.last_error
+
+    def test_final_failure_marks_job_and_target_failed(self, job_session, test_user):
+        activity = make_activity(
+            job_session, test_user, llm_evaluation_status=models.LLMEvaluationStatus.processing,
+        )
+        job = _enqueue(job_session, activity.id, attempts=jobs.LLM_JOB_MAX_ATTEMPTS - 1)
+        jobs.claim(job_session, "w1", limit=1)
+        handler = MagicMock(return_value=False)
+
+        _run_with_handler(job.id, handler)
+
+        handler.assert_called_once_with(activity.id, final_attempt=True, bypass_cache=False)
+        job_session.refresh(job)
+        job_session.refresh(activity)
+        assert job.status == models.LLMJobStatus.failed
+        assert activity.llm_evaluation_status == models.LLMEvaluationStatus.failed
+
+    def test_passes_bypass_cache_to_handler(self, job_session):
+        job = _enqueue(job_session, 1, bypass_cache=True)
+        jobs.claim(job_session, "w1", limit=1)
+        handler = MagicMock(return_value=True)
+
+        _run_with_handler(job.id, handler)
+
+        handler.assert_called_once_with(1, final_attempt=False, bypass_cache=True)
+
+    def test_ignores_job_requeued_by_reaper(self, job_session):
+        job = _enqueue(job_session, 1)
+        jobs.claim(job_session, "w1", limit=1)
+        handler = MagicMock(return_value=True)
+
+        job.status = models.LLMJobStatus.queued
+        job_session.commit()
+        _run_with_handler(job.id, handler)
+
+        handler.assert_not_called()
+        assert job.status == models.LLMJobStatus.queued
+
+
+def test_retry_delay_is_exponential_and_capped():
+    assert jobs.retry_delay(1) == timedelta(seconds=jobs.LLM_JOB_RETRY_BASE_SECONDS)
+    assert jobs.retry_delay(2) == timedelta(seconds=jobs.LLM_JOB_RETRY_BASE_SECONDS * 2)
+    assert jobs.retry_delay(50) == timedelta(seconds=jobs.LLM_JOB_RETRY_MAX_SECONDS)
+
+
+class TestReapStale:
+    def test_requeues_stale_processing_job(self, db_session, test_user):
+        activity = make_activity(
+            db_session, test_user, llm_evaluation_status=models.LLMEvaluationStatus.processing,
+        )
+        stale = _enqueue(
+            db_session, activity.id, status=models.LLMJobStatus.processing, attempts=1,
+            locked_by="dead", locked_at=datetime.utcnow() - timedelta(hours=1),
+        )
+        busy = make_activity(
+            db_session, test_user, start_time=datetime(2024, 1, 16, 7, 0),
+            llm_evaluation_status=models.LLMEvaluationStatus.processing,
+        )
+        fresh = _enqueue(
+            db_session, busy.id, status=models.LLMJobStatus.processing, attempts=1,
+            locked_by="alive", locked_at=datetime.utcnow(),
+        )
+
+        assert jobs.reap_stale(db_session, stale_after=600) == 1
+
+        assert stale.status == models.LLMJobStatus.queued
+        assert stale.run_after <= datetime.utcnow()
+        assert activity.llm_evaluation_status == models.LLMEvaluationStatus.pending
+        assert fresh.status == models.LLMJobStatus.processing
+
+    def test_fails_stale_job_out_of_attempts(self, db_session, test_user):
+        plan = make_plan(db_session, test_user, generation_status=models.LLMEvaluationStatus.processing)
+        job = _enqueue(
+            db_session, plan.id, kind=models.LLMJobKind.generate_plan,
+            status=models.LLMJobStatus.processing, attempts=jobs.LLM_JOB_MAX_ATTEMPTS,
+            locked_at=datetime.utcnow() - timedelta(hours=1),
+        )
+
+        jobs.reap_stale(db_session, stale_after=600)
+
+        assert job.status == models.LLMJobStatus.failed
+        assert plan.generation_status == models.LLMEvaluationStatus.failed
+
+
+class TestRequeueOrphans:
+    def test_enqueues_pending_targets_without_job(self, db_session, test_user):
+        orphan = make_activity(
+            db_session, test_user, llm_evaluation_status=models.LLMEvaluationStatus.processing,
+        )
+        queued = make_activity(
+            db_session, test_user, start_time=datetime(2024, 1, 16, 7, 0),
+            llm_evaluation_status=models.LLMEvaluationStatus.pending,
+        )
+        make_activity(
+            db_session, test_user, start_time=datetime(2024, 1, 17, 7, 0),
+            llm_evaluation_status=models.LLMEvaluationStatus.completed,
+        )
+        plan = make_plan(db_session, test_user, generation_status=models.LLMEvaluationStatus.pending)
+        _enqueue(db_session, queued.id)
+
+        assert jobs.requeue_orphans(db_session) == 2
+
+        targets = {
+            (job.kind, job.target_id)
+            for job in db_session.query(models.LLMJob).filter(models.LLMJob.target_id != queued.id)
+        }
+        assert targets == {
+            (models.LLMJobKind.evaluate_activity, orphan.id),
+            (models.LLMJobKind.generate_plan, plan.id),
+        }
+        assert orphan.llm_evaluation_status == models.LLMEvaluationStatus.pending
+
+
+    def test_second_run_adds_nothing(self, db_session, test_user):
+        make_activity(db_session, test_user, llm_evaluation_status=models.LLMEvaluationStatus.pending)
+        assert jobs.requeue_orphans(db_session) == 1
+        assert jobs.requeue_orphans(db_session) == 0
+        assert db_session.query(models.LLMJob).count() == 1
+
+    def test_mysql_orphans_query_skips_locked_targets(self):
+        sql = str(jobs.orphans_query(models.LLMJobKind.evaluate_activity).compile(dialect=mysql.dialect()))
+        assert "FOR UPDATE SKIP LOCKED" in sql
+
+
+class TestRunWorker:
+    def test_processes_queue_until_stopped(self, job_session, test_user):
+        activity_ids = [
+            make_activity(job_session, test_user, start_time=datetime(2024, 1, day, 7, 0)).id
+            for day in (15, 16, 17)
+        ]
+        for activity_id in activity_ids:
+            _enqueue(job_session, activity_id)
+
+        stop = threading.Event()
+        handled = []
+
+        def handler(target_id, final_attempt, bypass_cache):
+            handled.append(target_id)
+            if len(handled) == len(activity_ids):
+                stop.set()
+            return True
+
+        with (
+            patch("services.jobs._handlers", return_value={models.LLMJobKind.evaluate_activity: handler}),
+            patch("services.jobs.LLM_WORKER_POLL_SECONDS", 0.01),
+        ):
+            # 테스트 세션은 스레드 간에 공유할 수 없으므로 한 번에 하나씩 실행한다
+            jobs.run_worker("w1", stop, concurrency=1)
+
+        assert sorted(handled) == activity_ids
+        statuses = {job.status for job in job_session.query(models.LLMJob)}
+        assert statuses == {models.LLMJobStatus.completed}
+
+    def test_survives_db_errors(self, job_session, test_user):
+        activity = make_activity(job_session, test_user)
+        _enqueue(job_session, activity.id)
+
+        stop = threading.Event()
+        handled = []
+
+        def handler(target_id, final_attempt, bypass_cache):
+            handled.append(target_id)
+            stop.set()
+            return True
+
+        db_error = OperationalError("SELECT 1", {}, Exception("MySQL server has gone away"))
+        real_claim = jobs.claim
+        claim_errors = [db_error]
+
+        def flaky_claim(db, worker_id, limit):
+            if claim_errors:
+                raise claim_errors.pop()
+            return real_claim(db, worker_id, limit)
+
+        with (
+            patch("services.jobs._handlers", return_value={models.LLMJobKind.evaluate_activity: handler}),
+            patch("services.jobs.requeue_orphans", side_effect=[db_error, 0]) as requeue,
+            patch("services.jobs.claim", side_effect=flaky_claim),
+            patch("services.jobs.LLM_WORKER_POLL_SECONDS", 0.01),
+            patch("services.jobs.LLM_WORKER_ERROR_BACKOFF_SECONDS", 0.01),
+        ):
+            jobs.run_worker("w1", stop, concurrency=1)
+
+        assert requeue.call_count == 2
+        assert handled == [activity.id]
+
+
+def test_error_backoff_doubles_and_is_capped():
+    with (
+        patch("services.jobs.LLM_WORKER_ERROR_BACKOFF_SECONDS", 5),
+        patch("services.jobs.LLM_WORKER_ERROR_BACKOFF_MAX_SECONDS", 60),
+    ):
+        assert [jobs._error_backoff(n) for n in (1, 2, 3, 5)] == [5, 10, 20, 60]
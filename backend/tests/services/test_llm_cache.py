@@ -0,0 +1,68 @@
+"""Unit tests for services/llm/cache.py — prompt-hash keyed LLM response cache."""
+
+from unittest.mock import MagicMock
+
+from services import cache
+from services.llm import cache as llm_cache
+
+
+def _llm(content="응답"):
+    llm = MagicMock()
+    llm.invoke.return_value = MagicMock(content=content)
+    return llm
+
+
+class TestMakeKey:
+    def test_same_input_same_key(self):
+        assert llm_cache.make_key("low", "m", "p") == llm_cache.make_key("low", "m", "p")
+
+    def test_prompt_model_and_tier_change_key(self):
+        base = llm_cache.make_key("low", "m", "p")
+        assert llm_cache.make_key("low", "m", "p2") != base
+        assert llm_cache.make_key("low", "m2", "p") != base
+        assert llm_cache.make_key("high", "m", "p") != base
+
+
+class TestInvoke:
+    def test_second_call_hits_cache(self):
+        llm = _llm()
+        first = llm_cache.invoke(llm, "low", "m", "prompt", config={})
+        second = llm_cache.invoke(llm, "low", "m", "prompt", config={})
+        assert first == second == "응답"
+        llm.invoke.assert_called_once_with("prompt", config={})
+
+    def test_bypass_calls_llm_and_refreshes_entry(self):
+        llm_cache.invoke(_llm("old"), "low", "m", "prompt", config={})
+        assert llm_cache.invoke(_llm("new"), "low", "m", "prompt", config={}, bypass=True) == "new"
+        assert llm_cache.invoke(_llm("unused"), "low", "m", "prompt", config={}) == "new"
+
+    def test_list_content_round_trips(self):
+        blocks = [{"type": "text", "text": "계획"}]
+        llm_cache.invoke(_llm(blocks), "high", "m", "prompt", config={})
+        assert llm_cache.invoke(_llm(), "high", "m", "prompt", config={}) == blocks
+
+    def test_failure_is_not_cached(self):
+        llm = MagicMock()
+        llm.invoke.side_effect = RuntimeError("rate limited")
+        try:
+            llm_cache.invoke(llm, "low", "m", "prompt", config={})
+        except RuntimeError:
+            pass
+        assert llm_cache.invoke(_llm("ok"), "low", "m", "prompt", config={}) == "ok"
+
+    def test_store_result_false_leaves_storing_to_caller(self):
+        llm_cache.invoke(_llm("raw"), "low", "m", "prompt", config={}, store_result=False)
+        assert llm_cache.invoke(_llm("fresh"), "low", "m", "prompt", config={}, store_result=False) == "fresh"
+
+        llm_cache.store(llm_cache.make_key("low", "m", "prompt"), "parsed ok")
+        assert llm_cache.invoke(_llm("unused"), "low", "m", "prompt", config={}) == "parsed ok"
+
+    def test_evicts_least_recently_used(self, monkeypatch):
+        monkeypatch.setattr(llm_cache, "_backend", cache.MemoryBackend(max_entries=2))
+        llm_cache.invoke(_llm("a"), "low", "m", "a", config={})
+        llm_cache.invoke(_llm("b"), "low", "m", "b", config={})
+        llm_cache.invoke(_llm("a2"), "low", "m", "a", config={})  # a를 최근 사용으로
+        llm_cache.invoke(_llm("c"), "low", "m", "c", config={})
+
+        assert llm_cache.invoke(_llm("a3"), "low", "m", "a", config={}) == "a"
+        assert llm_cache.invoke(_llm("b2"), "low", "m", "b", config={}) == "b2"
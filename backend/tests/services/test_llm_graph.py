@@ -15,19 +15,7 @@ from services.llm.graph import (
 )
 import models
 from tests.fixtures.sample_data import make_user, make_activity, make_plan, make_plan_session
-
-
-class _NoCloseSession:
-    """Wrapper that delegates to a real session but makes close() a no-op."""
-
-    def __init__(self, session):
-        self._session = session
-
-    def __getattr__(self, name):
-        return getattr(self._session, name)
-
-    def close(self):
-        pass
+from tests.fixtures.sessions import NoCloseSession
 
 
 class TestFormatTime:
@@ -155,7 +143,7 @@ class TestEvaluateActivity:
 
         mock_llm = MagicMock()
         mock_llm.invoke.return_value = MagicMock(content="좋은 러닝이었습니다.")
-        wrapper = _NoCloseSession(db_session)
+        wrapper = NoCloseSession(db_session)
 
         with (
             patch("services.llm.graph.SessionLocal", return_value=wrapper),
@@ -168,7 +156,7 @@ class TestEvaluateActivity:
         assert activity.llm_evaluation_status == models.LLMEvaluationStatus.completed
 
     def test_not_found_returns_silently(self, db_session):
-        wrapper = _NoCloseSession(db_session)
+        wrapper = NoCloseSession(db_session)
         with patch("services.llm.graph.SessionLocal", return_value=wrapper):
             evaluate_activity(99999)  # Should not raise
 
@@ -180,7 +168,7 @@ class TestEvaluateActivity:
 
         mock_llm = MagicMock()
         mock_llm.invoke.side_effect = RuntimeError("LLM error")
-        wrapper = _NoCloseSession(db_session)
+        wrapper = NoCloseSession(db_session)
 
         with (
             patch("services.llm.graph.SessionLocal", return_value=wrapper),
@@ -190,3 +178,24 @@ class TestEvaluateActivity:
 
         db_session.refresh(activity)
         assert activity.llm_evaluation_status == models.LLMEvaluationStatus.failed
+
+    def test_repeat_uses_cached_response(self, db_session, test_user):
+        activity = make_activity(db_session, test_user)
+
+        mock_llm = MagicMock()
+        mock_llm.invoke.return_value = MagicMock(content="좋은 러닝이었습니다.")
+        wrapper = NoCloseSession(db_session)
+
+        with (
+            patch("services.llm.graph.SessionLocal", return_value=wrapper),
+            patch("services.llm.graph.get_llm", return_value=mock_llm),
+        ):
+            evaluate_activity(activity.id)
+            evaluate_activity(activity.id)
+            assert mock_llm.invoke.call_count == 1
+
+            evaluate_activity(activity.id, bypass_cache=True)
+            assert mock_llm.invoke.call_count == 2
+
+        db_session.refresh(activity)
+        assert activity.llm_evaluation == "좋은 러닝이었습니다."
@@ -2,6 +2,9 @@
 
 from unittest.mock import patch
 
+import pytest
+from langchain_openai import ChatOpenAI
+
 from services.llm import models as llm_models
 
 
@@ -36,3 +39,58 @@ class TestGetLlm:
         monkeypatch.setattr(llm_models, "LLM_LOW_MODEL", "claude-haiku-4-5-20251001")
         llm = llm_models.get_llm("low", max_tokens=1024)
         assert llm.max_tokens == 1024
+
+
+@pytest.fixture()
+def fresh_registry(monkeypatch):
+    """Empty client registry / callback cache for the test."""
+    monkeypatch.setattr(llm_models, "_clients", {})
+    monkeypatch.setattr(llm_models, "_callbacks", None)
+
+
+class TestClientRegistry:
+    def test_same_config_reuses_instance(self, monkeypatch, fresh_registry):
+        monkeypatch.setattr(llm_models, "LLM_LOW_MODEL", "claude-haiku-4-5-20251001")
+        assert llm_models.get_llm("low") is llm_models.get_llm("low")
+        assert llm_models.get_llm("low") is llm_models.get_llm("low", max_tokens=500)
+
+    def test_different_config_gets_own_instance(self, monkeypatch, fresh_registry):
+        monkeypatch.setattr(llm_models, "LLM_LOW_MODEL", "claude-haiku-4-5-20251001")
+        monkeypatch.setattr(llm_models, "LLM_HIGH_MODEL", "claude-haiku-4-5-20251001")
+        low = llm_models.get_llm("low")
+        assert llm_models.get_llm("low", max_tokens=1024) is not low
+        assert llm_models.get_llm("high") is not low
+
+    def test_shutdown_closes_clients_and_empties_registry(self, monkeypatch, fresh_registry):
+        monkeypatch.setattr(llm_models, "LLM_LOW_MODEL", "claude-haiku-4-5-20251001")
+        llm = llm_models.get_llm("low")
+        with patch.object(llm_models, "_close_http") as close_http:
+            llm_models.shutdown()
+        close_http.assert_called_once_with(llm)
+        assert llm_models.get_llm("low") is not llm
+
+    def test_shutdown_closes_only_owned_openai_pool(self, monkeypatch, fresh_registry):
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-fake-key")
+        monkeypatch.setattr(llm_models, "LLM_LOW_MODEL", "gpt-4o-mini")
+        first = llm_models.get_llm("low")
+        other = ChatOpenAI(model="gpt-4o-mini")  # langchain-openai 기본(공유) 풀
+        llm_models.shutdown()
+
+        assert first.http_client.is_closed
+        assert not other.root_client._client.is_closed
+        assert not llm_models.get_llm("low").http_client.is_closed
+
+
+class TestCallbacks:
+    def test_no_langfuse_key_returns_empty(self, monkeypatch, fresh_registry):
+        monkeypatch.delenv("LANGFUSE_PUBLIC_KEY", raising=False)
+        assert llm_models.get_callbacks() == []
+
+    def test_handler_created_once(self, monkeypatch, fresh_registry):
+        monkeypatch.setenv("LANGFUSE_PUBLIC_KEY", "pk-test")
+        handler = object()
+        with patch("langfuse.langchain.CallbackHandler", return_value=handler) as factory:
+            first = llm_models.get_callbacks()
+            second = llm_models.get_callbacks()
+        assert first == second == [handler]
+        factory.assert_called_once()
@@ -9,19 +9,7 @@ import pytest
 from services.llm.plan_graph import _parse_response_node, generate_plan
 import models
 from tests.fixtures.sample_data import make_user, make_plan
-
-
-class _NoCloseSession:
-    """Wrapper that delegates to a real session but makes close() a no-op."""
-
-    def __init__(self, session):
-        self._session = session
-
-    def __getattr__(self, name):
-        return getattr(self._session, name)
-
-    def close(self):
-        pass  # prevent test session from being closed
+from tests.fixtures.sessions import NoCloseSession
 
 
 class TestParseResponseNode:
@@ -111,7 +99,7 @@ class TestGeneratePlan:
 
         mock_llm = MagicMock()
         mock_llm.invoke.return_value = MagicMock(content=llm_response)
-        wrapper = _NoCloseSession(db_session)
+        wrapper = NoCloseSession(db_session)
 
         with (
             patch("services.llm.plan_graph.SessionLocal", return_value=wrapper),
@@ -127,7 +115,7 @@ class TestGeneratePlan:
         assert len(plan.sessions) == 2
 
     def test_not_found_returns_silently(self, db_session):
-        wrapper = _NoCloseSession(db_session)
+        wrapper = NoCloseSession(db_session)
         with patch("services.llm.plan_graph.SessionLocal", return_value=wrapper):
             generate_plan(99999)
 
@@ -139,7 +127,7 @@ class TestGeneratePlan:
 
         mock_llm = MagicMock()
         mock_llm.invoke.side_effect = RuntimeError("LLM error")
-        wrapper = _NoCloseSession(db_session)
+        wrapper = NoCloseSession(db_session)
 
         with (
             patch("services.llm.plan_graph.SessionLocal", return_value=wrapper),
@@ -149,3 +137,26 @@ class TestGeneratePlan:
 
         db_session.refresh(plan)
         assert plan.generation_status == models.LLMEvaluationStatus.failed
+
+    def test_only_parsed_plans_are_cached(self, db_session, test_user):
+        good = json.dumps({
+            "plan_text": "계획",
+            "sessions": [{"date": "2024-01-15", "session_type": "Easy", "title": "이지 런"}],
+        })
+        mock_llm = MagicMock()
+        mock_llm.invoke.side_effect = [
+            MagicMock(content="계획을 만들 수 없습니다"),
+            MagicMock(content=good),
+        ]
+        wrapper = NoCloseSession(db_session)
+
+        with (
+            patch("services.llm.plan_graph.SessionLocal", return_value=wrapper),
+            patch("services.llm.plan_graph.get_llm", return_value=mock_llm),
+            patch("services.llm.plan_graph._build_plan_prompt", return_value="같은 프롬프트"),
+        ):
+            for _ in range(3):
+                generate_plan(make_plan(db_session, test_user).id)
+
+        # 세션 없는 첫 응답은 저장되지 않아 두 번째에 다시 호출하고, 그 응답은 세 번째에 재사용된다
+        assert mock_llm.invoke.call_count == 2
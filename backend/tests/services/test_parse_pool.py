@@ -0,0 +1,94 @@
+"""Unit tests for services/parse_pool.py — upload spooling and pooled parsing."""
+
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import tcx_parser
+from services import parse_pool
+from tests.fixtures.sample_tcx import make_tcx
+
+
+class _ChunkedUpload:
+    """Minimal async stand-in for UploadFile.read(size)."""
+
+    def __init__(self, content: bytes):
+        self._buffer = io.BytesIO(content)
+        self.reads = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        self.reads += 1
+        return self._buffer.read(size)
+
+
+class TestSpoolUpload:
+    async def test_writes_upload_in_chunks(self, monkeypatch):
+        monkeypatch.setattr(tcx_parser, "STREAM_CHUNK_SIZE", 1024)
+        content = make_tcx(trackpoints_per_lap=100)
+        upload = _ChunkedUpload(content)
+
+        path = await parse_pool._spool_upload(upload, limit=len(content))
+        try:
+            with open(path, "rb") as f:
+                assert f.read() == content
+        finally:
+            os.remove(path)
+        assert upload.reads > 1
+
+    async def test_stops_reading_once_limit_crossed(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(tcx_parser, "STREAM_CHUNK_SIZE", 1024)
+        monkeypatch.setenv("TMPDIR", str(tmp_path))
+        monkeypatch.setattr("tempfile.tempdir", None)
+        upload = _ChunkedUpload(make_tcx(trackpoints_per_lap=100))
+
+        with pytest.raises(tcx_parser.TcxTooLargeError):
+            await parse_pool._spool_upload(upload, limit=2048)
+        assert upload.reads == 3
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestParseTcxUpload:
+    async def test_parses_in_worker_process(self):
+        content = make_tcx(trackpoints_per_lap=120)
+        result = await parse_pool.parse_tcx_upload(_ChunkedUpload(content))
+        assert result.activities == tcx_parser.parse_tcx(content)
+        assert result.lightweight_tcx == tcx_parser.create_lightweight_tcx(content)
+
+    async def test_inline_mode_without_pool(self, monkeypatch):
+        monkeypatch.setattr(parse_pool, "TCX_PARSE_WORKERS", 0)
+        content = make_tcx()
+        result = await parse_pool.parse_tcx_upload(_ChunkedUpload(content))
+        assert len(result.activities) == 1
+
+    async def test_broken_pool_is_shut_down_and_replaced(self, monkeypatch):
+        class _BrokenExecutor(ProcessPoolExecutor):
+            def submit(self, *args, **kwargs):
+                raise BrokenProcessPool("worker died")
+
+        broken = _BrokenExecutor(max_workers=1)
+        shutdown_calls = []
+        monkeypatch.setattr(broken, "shutdown", lambda **kwargs: shutdown_calls.append(kwargs))
+        monkeypatch.setattr(parse_pool, "_executor", broken)
+
+        with pytest.raises(BrokenProcessPool):
+            await parse_pool.parse_tcx_upload(_ChunkedUpload(make_tcx()))
+
+        assert shutdown_calls == [{"wait": False, "cancel_futures": True}]
+        assert parse_pool._executor is None
+        ProcessPoolExecutor.shutdown(broken)
+
+    async def test_start_parse_pool_warms_up_workers(self, monkeypatch):
+        monkeypatch.setattr(parse_pool, "TCX_PARSE_WORKERS", 1)
+        monkeypatch.setattr(parse_pool, "_executor", None)
+        try:
+            await parse_pool.start_parse_pool()
+            assert parse_pool._executor is not None
+        finally:
+            parse_pool.shutdown_parse_pool()
+
+    async def test_invalid_xml_raises_value_error(self):
+        with pytest.raises(ValueError):
+            await parse_pool.parse_tcx_upload(_ChunkedUpload(b"not xml"))
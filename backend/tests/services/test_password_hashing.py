@@ -0,0 +1,93 @@
+"""Unit tests for services/password_hashing.py — bounded hash pool and admission control."""
+
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+import auth
+from services import password_hashing
+
+
+@pytest.fixture(autouse=True)
+def _fresh_pool(monkeypatch):
+    monkeypatch.setattr(password_hashing, "_executor", None)
+    monkeypatch.setattr(password_hashing, "_pending", 0)
+    monkeypatch.setattr(password_hashing, "_timings", password_hashing.deque(maxlen=100))
+    yield
+    password_hashing.shutdown_hash_pool()
+
+
+async def test_hash_and_verify_record_timings():
+    hashed = await password_hashing.hash_password("secret")
+    assert await password_hashing.verify_password("secret", hashed) == (True, None)
+    assert (await password_hashing.verify_password("wrong", hashed))[0] is False
+
+    stats = password_hashing.timing_stats()
+    assert stats["hash"]["count"] == 1
+    assert stats["verify"]["count"] == 2
+    assert stats["verify"]["run_p50_ms"] > 0
+
+
+async def test_rejects_with_503_when_saturated(monkeypatch):
+    monkeypatch.setattr(password_hashing, "PASSWORD_HASH_MAX_PENDING", 0)
+    with pytest.raises(HTTPException) as exc_info:
+        await password_hashing.hash_password("secret")
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers["Retry-After"] == str(password_hashing.PASSWORD_HASH_RETRY_AFTER)
+
+
+async def test_pending_slot_released_after_failure(monkeypatch):
+    monkeypatch.setattr(password_hashing, "PASSWORD_HASH_MAX_PENDING", 1)
+    with pytest.raises(ValueError):
+        await password_hashing.verify_password("secret", "not-a-hash")
+    assert password_hashing._pending == 0
+    assert await password_hashing.hash_password("secret")
+
+
+async def test_cancelled_request_keeps_slot_until_work_finishes(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+
+    def _slow_hash(password):
+        started.set()
+        release.wait(5)
+        return "hashed"
+
+    monkeypatch.setattr(auth, "get_password_hash", _slow_hash)
+    monkeypatch.setattr(password_hashing, "PASSWORD_HASH_MAX_PENDING", 1)
+    task = asyncio.create_task(password_hashing.hash_password("secret"))
+    await asyncio.to_thread(started.wait, 5)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    # 취소된 요청의 bcrypt는 아직 실행 중이므로 새 요청은 받지 않는다
+    assert password_hashing._pending == 1
+    with pytest.raises(HTTPException):
+        await password_hashing.hash_password("secret")
+
+    release.set()
+    await asyncio.to_thread(password_hashing.shutdown_hash_pool)
+    assert password_hashing._pending == 0
+
+
+async def test_runs_on_dedicated_threads(monkeypatch):
+    names = []
+
+    def _hash(password):
+        names.append(threading.current_thread().name)
+        return "hashed"
+
+    monkeypatch.setattr(auth, "get_password_hash", _hash)
+    await password_hashing.hash_password("secret")
+    assert names[0].startswith("password-hash")
+
+
+def test_verify_and_update_rehashes_on_cost_change(monkeypatch):
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("secret")
+    ok, new_hash = auth.verify_and_update_password("secret", old_hash)
+    assert ok is True
+    assert new_hash is not None and new_hash.startswith(f"$2b${auth.BCRYPT_ROUNDS:02d}$")
+    assert auth.verify_and_update_password("secret", new_hash) == (True, None)
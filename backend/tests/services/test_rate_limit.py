@@ -0,0 +1,153 @@
+"""Unit tests for services/rate_limit.py — token buckets and the ASGI middleware."""
+
+import ipaddress
+import re
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI, Form
+from fastapi.testclient import TestClient
+
+import auth
+from services import rate_limit
+
+
+def _app(rules):
+    app = FastAPI()
+
+    @app.post("/users/token")
+    def login(username: str = Form(...)):
+        return {"username": username}
+
+    @app.post("/users/forgot-password")
+    def forgot_password(payload: dict):
+        return payload
+
+    @app.post("/activities/upload")
+    def upload():
+        return {"ok": True}
+
+    @app.get("/activities")
+    def list_activities():
+        return []
+
+    app.add_middleware(rate_limit.RateLimitMiddleware, rules=rules, limiter=rate_limit.MemoryLimiter())
+    return TestClient(app)
+
+
+def _rule(name, path, limit, window, per="ip", field=None):
+    return rate_limit.Rule(name, "POST", re.compile(path), limit, window, per, field)
+
+
+class TestMemoryLimiter:
+    async def test_allows_burst_then_refills(self):
+        limiter = rate_limit.MemoryLimiter()
+        with patch("services.rate_limit.time.monotonic", return_value=100.0):
+            assert [await limiter.hit("k", 2, 10) for _ in range(3)] == [0, 0, pytest.approx(5.0)]
+        with patch("services.rate_limit.time.monotonic", return_value=105.0):
+            assert await limiter.hit("k", 2, 10) == 0
+            assert await limiter.hit("other", 2, 10) == 0
+
+    async def test_evicts_least_recently_used_keys(self):
+        limiter = rate_limit.MemoryLimiter(max_keys=1)
+        await limiter.hit("a", 1, 60)
+        await limiter.hit("b", 1, 60)
+        assert await limiter.hit("a", 1, 60) == 0  # a의 버킷이 정리되어 다시 가득 참
+
+
+class TestRedisLimiter:
+    async def test_fails_open_when_redis_unavailable(self):
+        # redis 패키지 없이 스크립트 호출만 바꿔 끼운다
+        limiter = object.__new__(rate_limit.RedisLimiter)
+        limiter._errors = (OSError,)
+
+        async def _unreachable(keys, args):
+            raise ConnectionRefusedError("redis down")
+
+        limiter._script = _unreachable
+        assert await limiter.hit("ratelimit:login:ip:1.2.3.4", 10, 60) == 0
+
+
+class TestMiddleware:
+    def test_returns_429_with_retry_after(self):
+        client = _app([_rule("login", r"/users/token", 2, 60)])
+        assert client.post("/users/token", data={"username": "a@test.com"}).status_code == 200
+        assert client.post("/users/token", data={"username": "a@test.com"}).status_code == 200
+
+        resp = client.post("/users/token", data={"username": "a@test.com"})
+        assert resp.status_code == 429
+        assert resp.headers["Retry-After"] == "30"
+
+    def test_unmatched_routes_are_not_limited(self):
+        client = _app([_rule("login", r"/users/token", 1, 60)])
+        for _ in range(3):
+            assert client.get("/activities").status_code == 200
+
+    def test_user_rule_keys_by_token_subject(self):
+        client = _app([_rule("upload", r"/activities/upload", 1, 60, per="user")])
+        alice = {"Authorization": f"Bearer {auth.create_access_token(data={'sub': 'alice@test.com'})}"}
+        bob = {"Authorization": f"Bearer {auth.create_access_token(data={'sub': 'bob@test.com'})}"}
+
+        assert client.post("/activities/upload", headers=alice).status_code == 200
+        assert client.post("/activities/upload", headers=alice).status_code == 429
+        assert client.post("/activities/upload", headers=bob).status_code == 200
+        # 토큰이 잘못되면 IP 버킷
+        assert client.post("/activities/upload", headers={"Authorization": "Bearer bad"}).status_code == 200
+
+    def test_account_rule_keys_by_form_field_across_ips(self):
+        rules = [
+            _rule("login", r"/users/token", 10, 60),
+            _rule("login_account", r"/users/token", 1, 60, per="account", field="username"),
+        ]
+        client = _app(rules)
+        resp = client.post("/users/token", data={"username": "Alice@test.com"})
+        assert resp.json() == {"username": "Alice@test.com"}  # 읽은 본문이 앱에 그대로 전달됨
+
+        with patch("services.rate_limit.client_ip", return_value="198.51.100.7"):
+            assert client.post("/users/token", data={"username": "alice@test.com "}).status_code == 429
+            assert client.post("/users/token", data={"username": "bob@test.com"}).status_code == 200
+
+    def test_account_rule_reads_json_and_skips_missing_field(self):
+        client = _app([_rule("forgot_password_account", r"/users/forgot-password", 1, 60, per="account", field="email")])
+        assert client.post("/users/forgot-password", json={"email": "a@test.com"}).status_code == 200
+        assert client.post("/users/forgot-password", json={"email": "a@test.com"}).status_code == 429
+        # 계정을 알 수 없으면 계정 버킷은 건너뛴다
+        assert client.post("/users/forgot-password", json={}).status_code == 200
+        assert client.post("/users/forgot-password", json={}).status_code == 200
+
+    def test_shared_bucket_name(self):
+        rules = [_rule("upload", r"/users/token", 1, 60), _rule("upload", r"/activities/upload", 1, 60)]
+        client = _app(rules)
+        assert client.post("/users/token", data={"username": "a@test.com"}).status_code == 200
+        assert client.post("/activities/upload").status_code == 429
+
+    def test_default_rules_cover_expensive_routes(self):
+        paths = {
+            ("POST", "/users/token"), ("POST", "/users/"), ("POST", "/users/forgot-password"),
+            ("POST", "/activities/upload"), ("POST", "/races/12/upload-tcx"),
+        }
+        middleware = rate_limit.RateLimitMiddleware(app=None, limiter=rate_limit.MemoryLimiter())
+        for method, path in paths:
+            assert middleware._match({"method": method, "path": path})
+        assert middleware._match({"method": "POST", "path": "/users/token/refresh"}) == []
+
+    def test_default_rules_add_account_buckets_to_login_and_password_reset(self):
+        middleware = rate_limit.RateLimitMiddleware(app=None, limiter=rate_limit.MemoryLimiter())
+        for path in ("/users/token", "/users/forgot-password", "/users/reset-password"):
+            pers = {rule.per for rule in middleware._match({"method": "POST", "path": path})}
+            assert pers == {"ip", "account"}
+
+
+class TestClientIp:
+    def _scope(self, peer, real_ip=None):
+        headers = [(b"x-real-ip", real_ip.encode())] if real_ip else []
+        return {"client": (peer, 1234), "headers": headers}
+
+    def test_ignores_forwarded_header_from_untrusted_peer(self, monkeypatch):
+        monkeypatch.setattr(rate_limit, "RATE_LIMIT_TRUSTED_PROXIES", [])
+        assert rate_limit.client_ip(self._scope("203.0.113.5", "1.2.3.4")) == "203.0.113.5"
+
+    def test_uses_real_ip_from_trusted_proxy(self, monkeypatch):
+        monkeypatch.setattr(rate_limit, "RATE_LIMIT_TRUSTED_PROXIES", [ipaddress.ip_network("172.16.0.0/12")])
+        assert rate_limit.client_ip(self._scope("172.18.0.3", "1.2.3.4")) == "1.2.3.4"
+        assert rate_limit.client_ip(self._scope("203.0.113.5", "1.2.3.4")) == "203.0.113.5"
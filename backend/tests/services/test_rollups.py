@@ -0,0 +1,120 @@
+"""Unit tests for services/rollups.py."""
+
+from datetime import date, datetime
+
+import pytest
+
+import models
+from services import backfills, rollups
+from tests.fixtures.sample_data import make_activity, make_user
+
+
+def _rollups(db_session, user) -> dict:
+    rows = db_session.query(models.TrainingRollup).filter(models.TrainingRollup.user_id == user.id)
+    return {(r.period_type, r.period_start): r for r in rows}
+
+
+def _snapshot(db_session, user) -> dict:
+    return {
+        key: {c: getattr(row, c) for c in rollups._METRIC_COLUMNS}
+        for key, row in _rollups(db_session, user).items()
+    }
+
+
+class TestPeriodStart:
+    @pytest.mark.parametrize("period_type, expected", [
+        ("day", date(2024, 1, 17)),
+        ("week", date(2024, 1, 15)),  # Monday
+        ("month", date(2024, 1, 1)),
+        ("year", date(2024, 1, 1)),
+    ])
+    def test_period_start(self, period_type, expected):
+        assert rollups.period_start(period_type, date(2024, 1, 17)) == expected
+
+    def test_unknown_period(self):
+        with pytest.raises(ValueError):
+            rollups.period_start("decade", date(2024, 1, 17))
+
+
+class TestApplyActivity:
+    def test_increments_every_period(self, db_session, test_user):
+        make_activity(db_session, test_user, start_time=datetime(2024, 1, 17, 7, 0),
+                      total_distance=5000, total_time=1500, avg_pace=300, avg_hr=150)
+        make_activity(db_session, test_user, start_time=datetime(2024, 1, 18, 7, 0),
+                      total_distance=3000, total_time=1000, avg_pace=0, avg_hr=None,
+                      is_treadmill=True)
+
+        rows = _rollups(db_session, test_user)
+        assert len(rows) == 2 + 1 + 1 + 1  # 2일, 같은 주/월/연
+        week = rows[("week", date(2024, 1, 15))]
+        assert week.total_distance == 8000
+        assert week.total_time == 2500
+        assert week.activity_count == 2
+        assert (week.pace_sum, week.pace_count) == (300, 1)
+        assert (week.hr_sum, week.hr_count) == (150, 1)
+        assert week.treadmill_count == 1
+        assert rows[("day", date(2024, 1, 18))].activity_count == 1
+
+    def test_remove_deletes_empty_periods(self, db_session, test_user):
+        keep = make_activity(db_session, test_user, start_time=datetime(2024, 1, 17, 7, 0))
+        gone = make_activity(db_session, test_user, start_time=datetime(2024, 1, 18, 7, 0),
+                             total_distance=3000)
+
+        rollups.apply_activity(db_session, gone, sign=-1)
+        db_session.commit()
+
+        rows = _rollups(db_session, test_user)
+        assert ("day", date(2024, 1, 18)) not in rows
+        assert rows[("month", date(2024, 1, 1))].total_distance == keep.total_distance
+        assert rows[("month", date(2024, 1, 1))].activity_count == 1
+
+
+class TestRebuild:
+    def test_rebuild_matches_incremental(self, db_session, test_user):
+        for start_time, distance in (
+            (datetime(2023, 12, 31, 7, 0), 21097),  # 2024-01-01(월)과 다른 연도, 다른 주
+            (datetime(2024, 1, 1, 7, 0), 5000),
+            (datetime(2024, 1, 7, 7, 0), 8000),
+            (datetime(2024, 1, 8, 7, 0), 10000),
+        ):
+            make_activity(db_session, test_user, start_time=start_time, total_distance=distance)
+        incremental = _snapshot(db_session, test_user)
+
+        assert rollups.rebuild_user(db_session, test_user.id) == len(incremental)
+        db_session.expire_all()
+        assert _snapshot(db_session, test_user) == incremental
+
+    def test_rebuild_all_fixes_drift(self, db_session, test_user):
+        make_activity(db_session, test_user, start_time=datetime(2024, 1, 17, 7, 0))
+        db_session.query(models.TrainingRollup).update({"activity_count": 99})
+        db_session.commit()
+
+        assert rollups.rebuild_all(db_session) == 1
+        db_session.expire_all()
+        assert {r.activity_count for r in _rollups(db_session, test_user).values()} == {1}
+
+    def test_backfill_only_users_without_rollups(self, db_session, test_user):
+        make_activity(db_session, test_user)
+        other = make_user(db_session, email="rollup-other@test.com")
+        make_activity(db_session, other)
+        db_session.query(models.TrainingRollup).filter(
+            models.TrainingRollup.user_id == other.id
+        ).delete()
+        db_session.commit()
+
+        assert backfills.backfill_training_rollups(db_session) == 1
+        assert len(_rollups(db_session, other)) == 4
+
+
+class TestCacheWarning:
+    def test_warns_without_shared_cache(self, monkeypatch, caplog):
+        monkeypatch.setattr(rollups.cache, "CACHE_URL", "")
+        with caplog.at_level("WARNING", logger="services.rollups"):
+            rollups.warn_if_cache_not_shared()
+        assert "DASHBOARD_CACHE_TTL" in caplog.text
+
+    def test_silent_with_shared_cache(self, monkeypatch, caplog):
+        monkeypatch.setattr(rollups.cache, "CACHE_URL", "redis://cache:6379/0")
+        with caplog.at_level("WARNING", logger="services.rollups"):
+            rollups.warn_if_cache_not_shared()
+        assert caplog.text == ""
@@ -5,6 +5,7 @@ from unittest.mock import MagicMock
 
 import pytest
 from jose import jwt
+from sqlalchemy import inspect
 
 import auth
 import models
@@ -45,34 +46,84 @@ class TestCreateAccessToken:
 
 
 class TestGetCurrentUser:
-    @pytest.mark.asyncio
-    async def test_valid_token_returns_user(self, db_session, test_user):
+    def test_valid_token_returns_user(self, db_session, test_user):
         token = auth.create_access_token(data={"sub": test_user.email})
-        user = await auth.get_current_user(token=token, db=db_session)
+        user = auth.get_current_user(token=token, db=db_session)
         assert user.email == test_user.email
 
-    @pytest.mark.asyncio
-    async def test_invalid_token_raises_401(self, db_session):
+    def test_invalid_token_raises_401(self, db_session):
         from fastapi import HTTPException
 
         with pytest.raises(HTTPException) as exc_info:
-            await auth.get_current_user(token="invalid.token.here", db=db_session)
+            auth.get_current_user(token="invalid.token.here", db=db_session)
         assert exc_info.value.status_code == 401
 
-    @pytest.mark.asyncio
-    async def test_no_sub_claim_raises_401(self, db_session):
+    def test_no_sub_claim_raises_401(self, db_session):
         from fastapi import HTTPException
 
         token = jwt.encode({"data": "no-sub"}, auth.SECRET_KEY, algorithm=auth.ALGORITHM)
         with pytest.raises(HTTPException) as exc_info:
-            await auth.get_current_user(token=token, db=db_session)
+            auth.get_current_user(token=token, db=db_session)
         assert exc_info.value.status_code == 401
 
-    @pytest.mark.asyncio
-    async def test_user_not_in_db_raises_401(self, db_session):
+    def test_user_not_in_db_raises_401(self, db_session):
         from fastapi import HTTPException
 
         token = auth.create_access_token(data={"sub": "nonexistent@test.com"})
         with pytest.raises(HTTPException) as exc_info:
-            await auth.get_current_user(token=token, db=db_session)
+            auth.get_current_user(token=token, db=db_session)
         assert exc_info.value.status_code == 401
+
+
+class TestGetCurrentUserAsync:
+    async def test_valid_token_returns_detached_user(self, async_db_session, test_user):
+        token = auth.create_access_token(data={"sub": test_user.email})
+        user = await auth.get_current_user_async(token=token, db=async_db_session)
+        assert user.id == test_user.id
+        assert inspect(user).detached
+
+    async def test_user_not_in_db_raises_401(self, async_db_session):
+        from fastapi import HTTPException
+
+        token = auth.create_access_token(data={"sub": "nonexistent@test.com"})
+        with pytest.raises(HTTPException) as exc_info:
+            await auth.get_current_user_async(token=token, db=async_db_session)
+        assert exc_info.value.status_code == 401
+
+    async def test_shares_cache_with_sync_dependency(self, db_session, async_db_session, test_user, assert_query_count):
+        token = auth.create_access_token(data={"sub": test_user.email})
+        auth.get_current_user(token=token, db=db_session)
+
+        with assert_query_count(0):
+            user = await auth.get_current_user_async(token=token, db=async_db_session)
+        assert user.email == test_user.email
+
+
+class TestUserCache:
+    def test_second_lookup_skips_db(self, db_session, test_user, assert_query_count):
+        token = auth.create_access_token(data={"sub": test_user.email})
+        auth.get_current_user(token=token, db=db_session)
+
+        with assert_query_count(0):
+            user = auth.get_current_user(token=token, db=db_session)
+        assert user.id == test_user.id
+        assert user.nickname == test_user.nickname
+
+    def test_returns_detached_copy_per_call(self, db_session, test_user):
+        token = auth.create_access_token(data={"sub": test_user.email})
+        first = auth.get_current_user(token=token, db=db_session)
+        second = auth.get_current_user(token=token, db=db_session)
+
+        assert first is not second
+        assert first is not test_user
+        assert inspect(first).detached
+
+    def test_invalidate_reloads_from_db(self, db_session, test_user):
+        token = auth.create_access_token(data={"sub": test_user.email})
+        auth.get_current_user(token=token, db=db_session)
+
+        test_user.nickname = "Changed"
+        db_session.commit()
+        auth.invalidate_user(test_user.email)
+
+        assert auth.get_current_user(token=token, db=db_session).nickname == "Changed"
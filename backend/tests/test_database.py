@@ -0,0 +1,106 @@
+"""Async routes on a real async driver (aiosqlite).
+
+The shared test app runs async routes over the sync SQLite driver, where an
+implicit lazy load still works. Here the same routes run on an AsyncSession
+bound to aiosqlite, so any I/O outside an await fails with MissingGreenlet.
+"""
+
+import httpx
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+import auth
+import models
+from database import Base, get_async_db
+from tests.conftest import _create_test_app
+from tests.fixtures.sample_data import make_race, make_user
+from tests.fixtures.sample_tcx import make_tcx
+
+
+@pytest.fixture()
+async def async_session_factory():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture()
+async def async_user(async_session_factory):
+    async with async_session_factory() as db:
+        return await db.run_sync(make_user)
+
+
+@pytest.fixture()
+async def async_client(async_session_factory, async_user):
+    async def _get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app = _create_test_app()
+    app.dependency_overrides[get_async_db] = _get_async_db
+    # async 라우트는 get_current_user_async로 같은 aiosqlite 세션에서 사용자를 읽는다
+    token = auth.create_access_token(data={"sub": async_user.email})
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test", headers={"Authorization": f"Bearer {token}"},
+    ) as client:
+        yield client
+
+
+async def test_upload_tcx(async_client, async_session_factory, async_user):
+    resp = await async_client.post(
+        "/activities/upload",
+        files={"file": ("test.tcx", make_tcx(), "application/xml")},
+    )
+    assert resp.status_code == 200
+    assert resp.json()[0]["user_id"] == async_user.id
+
+    async with async_session_factory() as db:
+        assert await db.scalar(select(func.count(models.Activity.id))) == 1
+        assert await db.scalar(select(func.count(models.ActivitySeries.activity_id))) == 1
+        assert await db.scalar(select(func.count()).select_from(models.TrainingRollup)) == 4
+
+
+async def test_upload_tcx_duplicate(async_client):
+    files = {"file": ("test.tcx", make_tcx(), "application/xml")}
+    assert (await async_client.post("/activities/upload", files=files)).status_code == 200
+    resp = await async_client.post("/activities/upload", files=files)
+    assert resp.status_code == 409
+
+
+async def test_upload_race_tcx(async_client, async_session_factory, async_user):
+    async with async_session_factory() as db:
+        race = await db.run_sync(make_race, async_user)
+
+    resp = await async_client.post(
+        f"/races/{race.id}/upload-tcx",
+        files={"file": ("race.tcx", make_tcx(), "application/xml")},
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["activity_id"] is not None
+    assert data["activity"]["id"] == data["activity_id"]
+    assert data["images"] == []
+
+
+async def test_login_and_change_password(async_client, async_session_factory, async_user):
+    resp = await async_client.post("/users/token", data={
+        "username": async_user.email, "password": "TestPass123!",
+    })
+    assert resp.status_code == 200
+    assert resp.json()["refresh_token"]
+
+    resp = await async_client.put("/users/me/password", json={
+        "current_password": "TestPass123!", "new_password": "NewPass456!",
+    })
+    assert resp.status_code == 200
+
+    async with async_session_factory() as db:
+        user = await db.get(models.User, async_user.id)
+        assert auth.verify_password("NewPass456!", user.hashed_password)
+        refresh = await db.scalar(select(models.RefreshToken))
+        assert refresh.revoked_at is not None
@@ -1,8 +1,11 @@
 """Unit tests for email_service.py."""
 
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
+
+import pytest
 
 import email_service
+from tests.fixtures.smtp_server import SMTPStandIn
 
 
 class TestIsSmtpConfigured:
@@ -21,56 +24,109 @@ class TestIsSmtpConfigured:
         assert email_service._is_smtp_configured() is False
 
 
-class TestSendPasswordResetEmail:
-    def test_smtp_not_configured_skips(self, monkeypatch):
-        monkeypatch.setattr(email_service, "SMTP_HOST", "")
-        # Should not raise
-        email_service.send_password_reset_email("user@test.com", "token123")
-
-    def test_smtp_configured_calls_sendmail(self, monkeypatch):
-        monkeypatch.setattr(email_service, "SMTP_HOST", "smtp.test.com")
-        monkeypatch.setattr(email_service, "SMTP_PORT", 587)
-        monkeypatch.setattr(email_service, "SMTP_USERNAME", "user")
-        monkeypatch.setattr(email_service, "SMTP_PASSWORD", "pass")
-        monkeypatch.setattr(email_service, "SMTP_FROM_EMAIL", "from@test.com")
-        monkeypatch.setattr(email_service, "FRONTEND_URL", "http://localhost:3000")
-
-        mock_smtp_instance = MagicMock()
-        mock_smtp_cls = MagicMock(return_value=mock_smtp_instance)
-        mock_smtp_instance.__enter__ = MagicMock(return_value=mock_smtp_instance)
-        mock_smtp_instance.__exit__ = MagicMock(return_value=False)
-
-        with patch("email_service.smtplib.SMTP", mock_smtp_cls):
-            email_service.send_password_reset_email("user@test.com", "token123")
+@pytest.fixture()
+def smtp_stand_in(monkeypatch):
+    """Point email_service at a local SMTP stand-in with a fresh sender thread."""
+    server = SMTPStandIn().start()
+    monkeypatch.setattr(email_service, "SMTP_HOST", server.host)
+    monkeypatch.setattr(email_service, "SMTP_PORT", server.port)
+    monkeypatch.setattr(email_service, "SMTP_USERNAME", "user")
+    monkeypatch.setattr(email_service, "SMTP_PASSWORD", "pass")
+    monkeypatch.setattr(email_service, "SMTP_FROM_EMAIL", "from@test.com")
+    monkeypatch.setattr(email_service, "SMTP_STARTTLS", False)
+    monkeypatch.setattr(email_service, "FRONTEND_URL", "http://localhost:3000")
+    monkeypatch.setattr(email_service, "EMAIL_RETRY_BASE_SECONDS", 0.01)
+    monkeypatch.setattr(email_service, "_sender", None)
+    yield server
+    email_service.stop_mail_sender()
+    server.stop()
 
-        mock_smtp_instance.sendmail.assert_called_once()
-        args = mock_smtp_instance.sendmail.call_args
-        assert args[0][0] == "from@test.com"
-        assert args[0][1] == ["user@test.com"]
 
-    def test_email_body_contains_reset_link(self, monkeypatch):
-        from email import message_from_string
+def _flush():
+    assert email_service.get_mail_sender().flush(timeout=5)
 
-        monkeypatch.setattr(email_service, "SMTP_HOST", "smtp.test.com")
-        monkeypatch.setattr(email_service, "SMTP_PORT", 587)
-        monkeypatch.setattr(email_service, "SMTP_USERNAME", "user")
-        monkeypatch.setattr(email_service, "SMTP_PASSWORD", "pass")
-        monkeypatch.setattr(email_service, "SMTP_FROM_EMAIL", "from@test.com")
-        monkeypatch.setattr(email_service, "FRONTEND_URL", "http://localhost:3000")
 
-        mock_smtp_instance = MagicMock()
-        mock_smtp_cls = MagicMock(return_value=mock_smtp_instance)
-        mock_smtp_instance.__enter__ = MagicMock(return_value=mock_smtp_instance)
-        mock_smtp_instance.__exit__ = MagicMock(return_value=False)
-
-        with patch("email_service.smtplib.SMTP", mock_smtp_cls):
-            email_service.send_password_reset_email("user@test.com", "mytoken")
-
-        raw = mock_smtp_instance.sendmail.call_args[0][2]
-        msg = message_from_string(raw)
-        # Walk MIME parts and decode the HTML body
+class TestSendPasswordResetEmail:
+    def test_smtp_not_configured_skips(self, monkeypatch):
+        monkeypatch.setattr(email_service, "SMTP_HOST", "")
+        monkeypatch.setattr(email_service, "_sender", None)
+        # Should not raise, and should not start a sender thread
+        email_service.send_password_reset_email("user@test.com", "token123")
+        assert email_service._sender is None
+
+    def test_enqueues_without_touching_smtp(self, smtp_stand_in):
+        with patch("email_service.smtplib.SMTP") as mock_smtp_cls:
+            sender = email_service.MailSender()  # 시작하지 않은 송신기 — 큐에만 쌓인다
+            with patch("email_service.get_mail_sender", return_value=sender):
+                email_service.send_password_reset_email("user@test.com", "token123")
+        mock_smtp_cls.assert_not_called()
+        assert sender._queue.qsize() == 1
+
+    def test_delivers_reset_link(self, smtp_stand_in):
+        email_service.send_password_reset_email("user@test.com", "mytoken")
+        _flush()
+
+        sender, recipients, _ = smtp_stand_in.messages[0]
+        assert (sender, recipients) == ("from@test.com", ["user@test.com"])
         body_text = ""
-        for part in msg.walk():
+        for part in smtp_stand_in.parsed().walk():
             if part.get_content_type() == "text/html":
                 body_text = part.get_payload(decode=True).decode("utf-8")
         assert "http://localhost:3000/reset-password?token=mytoken" in body_text
+
+
+class TestMailSender:
+    def test_unexpected_error_does_not_stop_sender(self, smtp_stand_in):
+        sender = email_service.get_mail_sender()
+        real_connect = sender._connect
+        failures = [RuntimeError("boom")]
+
+        def _flaky_connect():
+            if failures:
+                raise failures.pop()
+            return real_connect()
+
+        with patch.object(sender, "_connect", side_effect=_flaky_connect):
+            sender.enqueue("first@test.com", "Subject: 1\r\n\r\nfirst")
+            _flush()
+            sender.enqueue("second@test.com", "Subject: 2\r\n\r\nsecond")
+            _flush()
+
+        assert [recipients for _, recipients, _ in smtp_stand_in.messages] == [["second@test.com"]]
+        assert sender._thread.is_alive()
+
+    def test_reuses_one_connection_for_burst(self, smtp_stand_in):
+        for i in range(5):
+            email_service.send_password_reset_email(f"user{i}@test.com", f"t{i}")
+        _flush()
+        assert len(smtp_stand_in.messages) == 5
+        assert smtp_stand_in.connections == 1
+
+    def test_reconnects_after_server_disconnect(self, smtp_stand_in):
+        email_service.send_password_reset_email("a@test.com", "t1")
+        _flush()
+        smtp_stand_in.disconnect_all()
+
+        email_service.send_password_reset_email("b@test.com", "t2")
+        _flush()
+        assert [m[1] for m in smtp_stand_in.messages] == [["a@test.com"], ["b@test.com"]]
+        assert smtp_stand_in.connections == 2
+
+    def test_retries_temporary_failure(self, smtp_stand_in):
+        smtp_stand_in.fail_next = 2
+        email_service.send_password_reset_email("user@test.com", "t1")
+        _flush()
+        assert len(smtp_stand_in.messages) == 1
+
+    def test_gives_up_after_max_attempts(self, smtp_stand_in, monkeypatch):
+        monkeypatch.setattr(email_service, "EMAIL_MAX_ATTEMPTS", 2)
+        smtp_stand_in.fail_next = 2
+        email_service.send_password_reset_email("user@test.com", "t1")
+        _flush()
+        assert smtp_stand_in.messages == []
+
+    def test_full_queue_rejects(self, monkeypatch):
+        monkeypatch.setattr(email_service, "EMAIL_QUEUE_MAX", 1)
+        sender = email_service.MailSender()
+        assert sender.enqueue("a@test.com", "msg") is True
+        assert sender.enqueue("b@test.com", "msg") is False
@@ -0,0 +1,39 @@
+"""Unit tests for payload_codec.py and the compressed Activity.tcx_data column."""
+
+import models
+import payload_codec
+import tcx_parser
+from tests.fixtures.sample_data import make_activity
+from tests.fixtures.sample_tcx import make_tcx
+
+
+class TestPayloadCodec:
+    def test_round_trip(self):
+        text = tcx_parser.create_lightweight_tcx(make_tcx(trackpoints_per_lap=600))
+        data = payload_codec.compress_text(text)
+        assert payload_codec.decompress_text(data) == text
+        assert len(data) < len(text.encode("utf-8")) / 4
+
+    def test_non_ascii(self):
+        assert payload_codec.decompress_text(payload_codec.compress_text("서울 마라톤")) == "서울 마라톤"
+
+    def test_none_passthrough(self):
+        assert payload_codec.compress_text(None) is None
+        assert payload_codec.decompress_text(None) is None
+
+
+class TestActivityTcxData:
+    def test_stored_compressed(self, db_session, test_user):
+        text = tcx_parser.create_lightweight_tcx(make_tcx())
+        activity = make_activity(db_session, test_user, tcx_data=text)
+
+        assert activity.tcx_blob == payload_codec.compress_text(text)
+        db_session.expire(activity)
+        assert activity.tcx_data == text
+
+    def test_query_expression_uses_blob(self, db_session, test_user):
+        make_activity(db_session, test_user, tcx_data=None)
+        with_tcx = make_activity(db_session, test_user, tcx_data="<x/>")
+
+        found = db_session.query(models.Activity).filter(models.Activity.tcx_data.isnot(None)).all()
+        assert [a.id for a in found] == [with_tcx.id]
@@ -0,0 +1,126 @@
+"""EXPLAIN checks — every hot per-user query must be served by its composite index.
+
+Runs the real endpoints / background jobs, captures the SELECTs they issue and
+asks SQLite for the query plan of each one.
+"""
+
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import event
+
+from services.llm.graph import evaluate_activity
+from services.llm.plan_graph import generate_plan
+from tests.fixtures.sample_data import make_activity, make_plan, make_race
+from tests.fixtures.sample_tcx import make_tcx
+from tests.fixtures.sessions import NoCloseSession
+
+ACTIVITY_INDEX = "ix_activities_user_id_start_time"
+RACE_INDEX = "ix_races_user_id_status_race_date"
+PLAN_INDEX = "ix_plans_user_id_status_created_at"
+
+
+@pytest.fixture()
+def per_user_selects(test_engine):
+    """(table, statement, parameters) for every SELECT filtered by <table>.user_id."""
+    queries: list[tuple[str, str, tuple]] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith("SELECT"):
+            return
+        for table in ("activities", "races", "plans"):
+            if f"{table}.user_id = ?" in statement:
+                queries.append((table, statement, parameters))
+
+    event.listen(test_engine, "before_cursor_execute", _record)
+    yield queries
+    event.remove(test_engine, "before_cursor_execute", _record)
+
+
+def _query_plans(db_session, queries, table: str) -> list[str]:
+    plans = []
+    for query_table, statement, parameters in queries:
+        if query_table != table:
+            continue
+        rows = db_session.connection().exec_driver_sql(
+            "EXPLAIN QUERY PLAN " + statement, parameters,
+        ).all()
+        plans.append(" | ".join(row[-1] for row in rows))
+    assert plans, f"no per-user query on {table} was captured"
+    return plans
+
+
+def _assert_uses_index(db_session, queries, table: str, index: str) -> None:
+    for plan in _query_plans(db_session, queries, table):
+        assert f"INDEX {index}" in plan, plan
+
+
+class TestActivityQueries:
+    def test_upload_duplicate_check(self, authenticated_client, db_session, test_user,
+                                    per_user_selects):
+        resp = authenticated_client.post(
+            "/activities/upload",
+            files={"file": ("test.tcx", make_tcx(), "application/xml")},
+        )
+        assert resp.status_code == 200
+        _assert_uses_index(db_session, per_user_selects, "activities", ACTIVITY_INDEX)
+
+    def test_race_upload_duplicate_check(self, authenticated_client, db_session, test_user,
+                                         per_user_selects):
+        race = make_race(db_session, test_user)
+        resp = authenticated_client.post(
+            f"/races/{race.id}/upload-tcx",
+            files={"file": ("race.tcx", make_tcx(), "application/xml")},
+        )
+        assert resp.status_code == 200
+        _assert_uses_index(db_session, per_user_selects, "activities", ACTIVITY_INDEX)
+
+    def test_list_first_and_cursor_pages(self, authenticated_client, db_session, test_user,
+                                         per_user_selects):
+        for day in range(1, 4):
+            make_activity(db_session, test_user, start_time=datetime(2024, 1, day, 7, 0))
+        first = authenticated_client.get("/activities/?limit=2")
+        authenticated_client.get("/activities/", params={"cursor": first.headers["X-Next-Cursor"]})
+        _assert_uses_index(db_session, per_user_selects, "activities", ACTIVITY_INDEX)
+
+    def test_dashboard_month_and_recent(self, authenticated_client, db_session, test_user,
+                                        per_user_selects):
+        authenticated_client.get("/dashboard/")
+        _assert_uses_index(db_session, per_user_selects, "activities", ACTIVITY_INDEX)
+        _assert_uses_index(db_session, per_user_selects, "races", RACE_INDEX)
+
+    def test_llm_recent_activities(self, db_session, test_user, per_user_selects):
+        activity = make_activity(db_session, test_user)
+        mock_llm = MagicMock()
+        mock_llm.invoke.return_value = MagicMock(content="ok")
+        with (
+            patch("services.llm.graph.SessionLocal", return_value=NoCloseSession(db_session)),
+            patch("services.llm.graph.get_llm", return_value=mock_llm),
+        ):
+            evaluate_activity(activity.id)
+        _assert_uses_index(db_session, per_user_selects, "activities", ACTIVITY_INDEX)
+
+
+class TestRaceAndPlanQueries:
+    def test_race_list_by_status(self, authenticated_client, db_session, test_user,
+                                 per_user_selects):
+        authenticated_client.get("/races/?status=예정")
+        _assert_uses_index(db_session, per_user_selects, "races", RACE_INDEX)
+
+    def test_active_plan(self, authenticated_client, db_session, test_user, per_user_selects):
+        make_plan(db_session, test_user)
+        authenticated_client.get("/plans/active")
+        _assert_uses_index(db_session, per_user_selects, "plans", PLAN_INDEX)
+
+    def test_plan_generation_context(self, db_session, test_user, per_user_selects):
+        plan = make_plan(db_session, test_user)
+        mock_llm = MagicMock()
+        mock_llm.invoke.return_value = MagicMock(content='{"sessions": []}')
+        with (
+            patch("services.llm.plan_graph.SessionLocal", return_value=NoCloseSession(db_session)),
+            patch("services.llm.plan_graph.get_llm", return_value=mock_llm),
+        ):
+            generate_plan(plan.id)
+        _assert_uses_index(db_session, per_user_selects, "activities", ACTIVITY_INDEX)
+        _assert_uses_index(db_session, per_user_selects, "races", RACE_INDEX)
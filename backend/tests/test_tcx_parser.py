@@ -1,5 +1,7 @@
 """Unit tests for tcx_parser.py — TCX XML parsing functions."""
 
+import io
+
 import pytest
 from lxml import etree
 
@@ -117,3 +119,140 @@ class TestParseLapsFromTcx:
         assert len(laps) == 1
         assert laps[0]["distance"] == 1000
         assert laps[0]["time"] == 300
+
+
+class TestIngestTcx:
+    def test_matches_separate_parsers(self):
+        content = make_tcx(
+            laps=[
+                {"distance": 1000, "time": 300, "hr": 150, "max_hr": 165, "cadence": 88},
+                {"distance": 1000, "time": 310, "hr": 155, "max_hr": 170, "cadence": 90},
+            ],
+            trackpoints_per_lap=300,
+        )
+        result = tcx_parser.ingest_tcx(content)
+        assert result.activities == tcx_parser.parse_tcx(content)
+        assert result.is_treadmill == tcx_parser.detect_treadmill(content)
+        assert result.lightweight_tcx == tcx_parser.create_lightweight_tcx(content)
+
+    def test_treadmill_detected_before_positions_stripped(self):
+        result = tcx_parser.ingest_tcx(make_tcx(has_position=True))
+        assert result.is_treadmill is False
+        assert "Position" not in result.lightweight_tcx
+
+    def test_samples_trackpoints_every_minute(self):
+        content = make_tcx(trackpoints_per_lap=181, trackpoint_interval=1)
+        result = tcx_parser.ingest_tcx(content)
+        tree = etree.fromstring(result.lightweight_tcx.encode("utf-8"))
+        ns = {"ns": "http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2"}
+        # 0s, 60s, 120s, 180s
+        assert len(tree.xpath("//ns:Trackpoint", namespaces=ns)) == 4
+
+    def test_invalid_xml_raises(self):
+        with pytest.raises(etree.XMLSyntaxError):
+            tcx_parser.ingest_tcx(b"not xml")
+
+    def test_series_follows_sampled_trackpoints(self):
+        content = make_tcx(trackpoints_per_lap=181, trackpoint_interval=1)
+        result = tcx_parser.ingest_tcx(content)
+
+        assert len(result.series) == 1
+        series = result.series[0]
+        assert series["time_offset"] == [0, 60, 120, 180]
+        assert series["distance"] == [0.0, 180.0, 360.0, 540.0]
+        assert series["heart_rate"] == [140.0, 140.0, 140.0, 140.0]
+        assert series["cadence"] == [85.0, 85.0, 85.0, 85.0]
+        assert series["altitude"] == [None] * 4
+        # 경량 TCX에서는 제거되지만 시계열에는 위경도가 남는다
+        assert series["latitude"] == [37.5] * 4
+        assert series["longitude"] == [127.0] * 4
+
+    def test_series_without_position(self):
+        result = tcx_parser.ingest_tcx(make_tcx(has_position=False, trackpoints_per_lap=3))
+        assert result.series[0]["latitude"] == [None]
+
+
+class TestTcxStreamParser:
+    def test_chunked_feed_matches_dom_parsers(self):
+        content = make_tcx(
+            laps=[
+                {"distance": 1000, "time": 300, "hr": 150, "max_hr": 165, "cadence": 88},
+                {"distance": 1200, "time": 330, "hr": 158},
+            ],
+            trackpoints_per_lap=200,
+        )
+        parser = tcx_parser.TcxStreamParser()
+        for i in range(0, len(content), 512):
+            parser.feed(content[i:i + 512])
+        result = parser.close()
+
+        assert result.activities == tcx_parser.parse_tcx(content)
+        assert result.is_treadmill == tcx_parser.detect_treadmill(content)
+        assert result.lightweight_tcx == tcx_parser.create_lightweight_tcx(content)
+
+    def test_track_without_first_time_is_left_untouched(self):
+        xml = b"""<?xml version="1.0" encoding="UTF-8"?>
+<TrainingCenterDatabase xmlns="http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2">
+  <Activities>
+    <Activity Sport="Running">
+      <Id>2024-01-15T10:00:00Z</Id>
+      <Lap StartTime="2024-01-15T10:00:00Z">
+        <TotalTimeSeconds>300</TotalTimeSeconds>
+        <DistanceMeters>1000</DistanceMeters>
+        <Track>
+          <Trackpoint><Position><LatitudeDegrees>1</LatitudeDegrees></Position></Trackpoint>
+          <Trackpoint><Time>2024-01-15T10:00:01Z</Time></Trackpoint>
+        </Track>
+      </Lap>
+    </Activity>
+  </Activities>
+</TrainingCenterDatabase>"""
+        result = tcx_parser.ingest_tcx(xml)
+        assert result.lightweight_tcx == tcx_parser.create_lightweight_tcx(xml)
+
+    def test_parse_tcx_stream_from_file(self, tmp_path):
+        content = make_tcx(trackpoints_per_lap=120)
+        path = tmp_path / "run.tcx"
+        path.write_bytes(content)
+        assert tcx_parser.parse_tcx_stream(path) == tcx_parser.parse_tcx(content)
+
+    def test_summary_only_mode_skips_lightweight(self):
+        result = tcx_parser.ingest_tcx_stream(io.BytesIO(make_tcx()), lightweight=False)
+        assert result.lightweight_tcx == ""
+        assert len(result.activities) == 1
+
+    def test_skips_activity_without_id(self):
+        xml = b"""<?xml version="1.0" encoding="UTF-8"?>
+<TrainingCenterDatabase xmlns="http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2">
+  <Activities>
+    <Activity Sport="Running">
+      <Lap StartTime="2024-01-15T10:00:00Z"><Track/></Lap>
+    </Activity>
+  </Activities>
+</TrainingCenterDatabase>"""
+        assert tcx_parser.parse_tcx_stream(io.BytesIO(xml)) == []
+
+
+
+class TestTcxTimeUs:
+    @pytest.mark.parametrize("text", [
+        "2024-01-15T10:00:00Z",
+        "2024-01-15T10:00:00.000Z",
+        "2024-01-15T10:00:59.999Z",
+        "2024-01-15T10:00:00.123456Z",
+        "2024-01-15T19:00:00+09:00",
+        "2024-01-15 10:00:00",
+    ])
+    def test_matches_dateutil(self, text):
+        import dateutil.parser
+        from datetime import timezone
+
+        expected = dateutil.parser.parse(text)
+        if expected.tzinfo is None:
+            expected = expected.replace(tzinfo=timezone.utc)
+        assert tcx_parser._tcx_time_us(text) == int(round(expected.timestamp() * 1_000_000))
+
+    def test_sampling_boundary_uses_microseconds(self):
+        start = tcx_parser._tcx_time_us("2024-01-15T10:00:00.500Z")
+        assert tcx_parser._tcx_time_us("2024-01-15T10:01:00.499Z") - start < 60_000_000
+        assert tcx_parser._tcx_time_us("2024-01-15T10:01:00.500Z") - start == 60_000_000
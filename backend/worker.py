@@ -0,0 +1,55 @@
+"""LLM 작업 워커 — llm_jobs 큐를 처리하는 별도 프로세스.
+
+    python worker.py
+
+웹 서버(main.py)와 같은 DB를 쓰며 여러 개를 띄워도 된다 (작업은 SKIP LOCKED로
+나뉜다). SIGTERM/SIGINT를 받으면 새 작업을 가져가지 않고 실행 중인 작업이 끝나면
+종료한다. 테이블 생성/마이그레이션은 웹 서버 시작 시 수행되며, 그 전이나 DB가 잠시
+끊긴 동안에는 로그를 남기고 백오프 후 다시 시도한다.
+"""
+
+import logging
+import os
+import signal
+import socket
+import threading
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# main.py와 같은 규칙: 로컬 개발은 .env.local, Docker는 docker-compose의 environment
+_env_local = Path(__file__).resolve().parent.parent / ".env.local"
+load_dotenv(_env_local, override=False)
+
+from services import jobs  # noqa: E402
+from services.llm import models as llm_models  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    stop = threading.Event()
+
+    def _request_stop(signum, _frame):
+        logger.info("LLM worker: %s 수신, 종료 준비", signal.Signals(signum).name)
+        stop.set()
+
+    signal.signal(signal.SIGTERM, _request_stop)
+    signal.signal(signal.SIGINT, _request_stop)
+
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    logger.info("LLM worker %s 시작 (동시 실행 %d)", worker_id, jobs.LLM_WORKER_CONCURRENCY)
+    try:
+        jobs.run_worker(worker_id, stop)
+    finally:
+        # 재사용하던 LLM 클라이언트의 커넥션 풀과 Langfuse 버퍼 정리
+        llm_models.shutdown()
+    logger.info("LLM worker %s 종료", worker_id)
+
+
+if __name__ == "__main__":
+    main()
@@ -35,7 +35,11 @@ $SSH_CMD "cp $REMOTE_DIR/.env.prd $REMOTE_DIR/.env"
 
 # 3. Docker Compose build & up
 echo "[3/3] Building and starting containers..."
-$SSH_CMD "cd $REMOTE_DIR && docker compose --env-file .env up --build -d"
+$SSH_CMD "cd $REMOTE_DIR && docker compose --env-file .env up --build -d --wait"
+
+# 기존 행 백필 (스키마 변경 후 한 번 — 이미 처리된 행은 건너뛴다)
+echo "Running backfills..."
+$SSH_CMD "cd $REMOTE_DIR && docker compose --env-file .env exec -T backend python -m services.backfills"
 
 # 4. 상태 확인
 echo "[4/3] Checking status..."
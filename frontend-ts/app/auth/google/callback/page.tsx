@@ -17,7 +17,7 @@ function GoogleCallbackHandler() {
     const error = searchParams.get('error');
 
     if (token && !error) {
-      setToken(token);
+      setToken(token, searchParams.get('refresh_token'));
       router.replace('/dashboard');
     } else {
       router.replace('/login?error=google_auth_failed');
@@ -27,7 +27,7 @@ export default function LoginPage() {
     setError('');
     try {
       const data = await login(email, password);
-      setToken(data.access_token);
+      setToken(data.access_token, data.refresh_token);
       router.push('/dashboard');
     } catch {
       setError('로그인에 실패했습니다.');
@@ -103,7 +103,7 @@ export default function RegisterPage() {
       await register(email, nickname, birthYear!, birthMonth!, gender, password);
       try {
         const data = await login(email, password);
-        setToken(data.access_token);
+        setToken(data.access_token, data.refresh_token);
         router.push('/dashboard');
       } catch {
         router.push('/login?registered=1');
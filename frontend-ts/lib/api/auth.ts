@@ -14,6 +14,10 @@ export const login = async (
   return response.data;
 };
 
+export const revokeRefreshToken = async (refreshToken: string): Promise<void> => {
+  await client.post('/users/token/revoke', { refresh_token: refreshToken });
+};
+
 export const register = async (
   email: string,
   nickname: string,
@@ -1,4 +1,4 @@
-import axios from "axios";
+import axios, { InternalAxiosRequestConfig } from "axios";
 
 const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
@@ -19,11 +19,61 @@ client.interceptors.request.use(
   (error) => Promise.reject(error)
 );
 
+// 리프레시 토큰은 한 번만 쓸 수 있으므로, 여러 요청이 동시에 401을 받아도
+// 갱신 요청은 하나만 보내고 모두 그 결과를 기다린다. 토큰은 탭끼리 공유하는
+// localStorage에 있으므로 Web Locks로 다른 탭과도 순서를 맞추고, 락을 얻은 뒤
+// 다른 탭이 이미 회전했으면 그 결과를 쓴다 (같은 토큰을 두 번 보내면 재사용으로
+// 간주되어 모든 로그인이 폐기된다)
+let refreshing: Promise<string | null> | null = null;
+
+const withRefreshLock = (fn: () => Promise<string | null>): Promise<string | null> =>
+  typeof navigator !== "undefined" && navigator.locks
+    ? navigator.locks.request("auth-token-refresh", fn)
+    : fn();
+
+const refreshAccessToken = (): Promise<string | null> => {
+  if (!refreshing) {
+    const seenRefreshToken = localStorage.getItem("refresh_token");
+    refreshing = withRefreshLock(async () => {
+      const refreshToken = localStorage.getItem("refresh_token");
+      if (!refreshToken) {
+        return null;
+      }
+      if (refreshToken !== seenRefreshToken) {
+        return localStorage.getItem("token");
+      }
+      try {
+        const response = await axios.post(`${API_URL}/users/token/refresh`, {
+          refresh_token: refreshToken,
+        });
+        localStorage.setItem("token", response.data.access_token);
+        localStorage.setItem("refresh_token", response.data.refresh_token);
+        return response.data.access_token as string;
+      } catch {
+        localStorage.removeItem("refresh_token");
+        return null;
+      }
+    }).finally(() => {
+      refreshing = null;
+    });
+  }
+  return refreshing;
+};
+
+type RetriableConfig = InternalAxiosRequestConfig & { _retried?: boolean };
+
 client.interceptors.response.use(
   (response) => response,
-  (error) => {
+  async (error) => {
     if (error.response && error.response.status === 401) {
       if (typeof window !== "undefined") {
+        const original = error.config as RetriableConfig | undefined;
+        if (original && !original._retried && !original.url?.startsWith("/users/token")) {
+          original._retried = true;
+          if (await refreshAccessToken()) {
+            return client(original);
+          }
+        }
         window.dispatchEvent(new Event("auth-error"));
       }
     }
@@ -1,7 +1,10 @@
 import client from "./client";
 import { DashboardData } from "../types";
 
-export const getDashboardData = async (): Promise<DashboardData> => {
-  const response = await client.get("/dashboard/");
+export const getDashboardData = async (
+  year?: number,
+  month?: number,
+): Promise<DashboardData> => {
+  const response = await client.get("/dashboard/", { params: { year, month } });
   return response.data;
 };
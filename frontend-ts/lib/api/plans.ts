@@ -25,6 +25,10 @@ export const deletePlan = async (id: number): Promise<void> => {
   await client.delete(`/plans/${id}`);
 };
 
+export const regeneratePlan = async (id: number, bypassCache = false): Promise<void> => {
+  await client.post(`/plans/${id}/regenerate`, null, { params: { bypass_cache: bypassCache } });
+};
+
 export const getPlanSessions = async (planId: number): Promise<PlanSessionBrief[]> => {
   const response = await client.get(`/plans/${planId}/sessions`);
   return response.data;
@@ -9,11 +9,12 @@ import {
   ReactNode,
 } from "react";
 import React from "react";
+import { revokeRefreshToken } from "../api/auth";
 
 interface AuthContextType {
   token: string | null;
   isAuthenticated: boolean;
-  setToken: (token: string) => void;
+  setToken: (token: string, refreshToken?: string | null) => void;
   logout: () => void;
 }
 
@@ -28,13 +29,27 @@ export function AuthProvider({ children }: { children: ReactNode }) {
     setMounted(true);
   }, []);
 
-  const setToken = useCallback((newToken: string) => {
-    localStorage.setItem("token", newToken);
-    setTokenState(newToken);
-  }, []);
+  const setToken = useCallback(
+    (newToken: string, refreshToken?: string | null) => {
+      localStorage.setItem("token", newToken);
+      if (refreshToken) {
+        localStorage.setItem("refresh_token", refreshToken);
+      } else {
+        localStorage.removeItem("refresh_token");
+      }
+      setTokenState(newToken);
+    },
+    []
+  );
 
   const logout = useCallback(() => {
+    const refreshToken = localStorage.getItem("refresh_token");
+    if (refreshToken) {
+      // 서버에서도 폐기해 로그아웃한 리프레시 토큰을 다시 쓸 수 없게 한다 (실패해도 로그아웃은 진행)
+      revokeRefreshToken(refreshToken).catch(() => {});
+    }
     localStorage.removeItem("token");
+    localStorage.removeItem("refresh_token");
     setTokenState(null);
   }, []);
 
@@ -31,6 +31,7 @@ export interface ActivityDetail extends Activity {
 export interface Token {
   access_token: string;
   token_type: string;
+  refresh_token?: string | null;
 }
 
 export interface User {
@@ -171,8 +172,21 @@ export interface RecentActivity {
   avg_hr: number | null;
 }
 
+export interface PeriodTotal {
+  period_start: string;
+  distance_km: number;
+  total_time: number;
+  activity_count: number;
+  avg_pace: number | null;
+  avg_hr: number | null;
+  treadmill_ratio: number;
+}
+
 export interface DashboardData {
   upcoming_races: Race[];
   monthly_running: MonthlyRunningDay[];
   recent_activities: RecentActivity[];
+  weekly_total: PeriodTotal | null;
+  monthly_total: PeriodTotal | null;
+  yearly_total: PeriodTotal | null;
 }